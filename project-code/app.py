@@ -23,13 +23,18 @@ APP_BUILD_DATE = "2026-01-16"
 import os
 import sys
 import json
+import time
+import asyncio
 import hashlib
+import tempfile
 import threading
 import subprocess
+import collections
+import multiprocessing
 import concurrent.futures
 from pathlib import Path
 from datetime import datetime
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple, Callable
 from dataclasses import dataclass, field
 from enum import Enum
 
@@ -37,40 +42,80 @@ import customtkinter as ctk
 from tkinter import filedialog, messagebox
 import tkinter as tk
 
+# 快速JSON（可选，用于状态文件）
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
 
 # ========== 进程检查 ==========
 APP_NAME = "PDF-MD-TOOLS"
 LOCK_FILE = Path(os.environ.get('TEMP', '.')) / "pdf_md_tools.lock"
 
 
+def _is_pid_alive(pid: int) -> bool:
+    """检查PID对应的进程是否是仍在运行的本程序（不启动子进程）"""
+    if sys.platform == "win32":
+        import ctypes
+        from ctypes import wintypes
+        
+        PROCESS_QUERY_LIMITED_INFORMATION = 0x1000
+        ERROR_ACCESS_DENIED = 5
+        kernel32 = ctypes.WinDLL("kernel32", use_last_error=True)
+        kernel32.OpenProcess.restype = wintypes.HANDLE
+        
+        handle = kernel32.OpenProcess(PROCESS_QUERY_LIMITED_INFORMATION, False, pid)
+        if not handle:
+            # 无权限访问说明进程存在，其他错误（如ERROR_INVALID_PARAMETER）说明进程不存在
+            return ctypes.get_last_error() == ERROR_ACCESS_DENIED
+        try:
+            buf = ctypes.create_unicode_buffer(1024)
+            size = wintypes.DWORD(len(buf))
+            if not kernel32.QueryFullProcessImageNameW(handle, 0, buf, ctypes.byref(size)):
+                return True
+            # PID可能已被其他程序复用，按进程名再确认
+            name = os.path.basename(buf.value).lower()
+            return "python" in name or "pdf" in name
+        finally:
+            kernel32.CloseHandle(handle)
+    
+    try:
+        os.kill(pid, 0)
+    except PermissionError:
+        return True
+    except (OSError, OverflowError):
+        return False
+    return True
+
+
 def check_existing_process() -> bool:
-    """检查是否有老进程存在（Windows专用）"""
+    """检查是否有老进程存在"""
     if not LOCK_FILE.exists():
         return False
     
     try:
         with open(LOCK_FILE, 'r') as f:
-            old_pid = int(f.read().strip())
+            content = f.read().strip()
+        
+        # 锁文件内容损坏，视为无老进程
+        if not content.isdigit():
+            LOCK_FILE.unlink(missing_ok=True)
+            return False
+        old_pid = int(content)
         
         # 检查当前PID是否与锁文件中的相同（同一进程）
         if old_pid == os.getpid():
             return False
         
-        # Windows: 使用tasklist检查进程是否存在
-        result = subprocess.run(
-            ['tasklist', '/FI', f'PID eq {old_pid}', '/NH', '/FO', 'CSV'],
-            capture_output=True, text=True, 
-            creationflags=subprocess.CREATE_NO_WINDOW
-        )
-        
-        # 如果输出包含PID，说明进程存在
-        if str(old_pid) in result.stdout:
+        if _is_pid_alive(old_pid):
             return True
         else:
             # 进程不存在，清理锁文件
             LOCK_FILE.unlink(missing_ok=True)
             return False
-    except:
+    except OSError:
         return False
 
 
@@ -84,10 +129,10 @@ def kill_existing_process() -> bool:
             old_pid = int(f.read().strip())
         
         subprocess.run(['taskkill', '/F', '/PID', str(old_pid)], 
-                      capture_output=True, creationflags=subprocess.CREATE_NO_WINDOW)
+                      capture_output=True, creationflags=getattr(subprocess, "CREATE_NO_WINDOW", 0))
         LOCK_FILE.unlink(missing_ok=True)
         return True
-    except:
+    except (ValueError, OSError):
         return False
 
 
@@ -103,7 +148,7 @@ def remove_lock_file():
 
 # 导入PDF处理模块
 from pdf_parser.extractor import extract_pdf_content, PDFContent
-from md_generator.converter import convert_to_markdown
+from md_generator.converter import convert_to_markdown_stream
 
 # OCR支持（可选）
 try:
@@ -120,6 +165,7 @@ try:
     from office_parser import (
         extract_office_content, 
         office_content_to_markdown,
+        stream_office_markdown,
         get_supported_extensions as get_office_extensions,
         check_dependencies as check_office_deps
     )
@@ -156,46 +202,396 @@ class FileItem:
     progress: int = 0
     error_msg: str = ""
     images_count: int = 0
+    _hash: str = field(default="", init=False, repr=False, compare=False)
     
     def get_hash(self) -> str:
-        """获取文件哈希"""
-        md5 = hashlib.md5()
-        md5.update(str(self.pdf_path).encode())
-        md5.update(str(self.size).encode())
-        return md5.hexdigest()[:16]
+        """获取文件标识键（路径+大小，无需计算哈希；首次计算后缓存）"""
+        if not self._hash:
+            self._hash = f"{self.pdf_path.as_posix()}|{self.size}"
+        return self._hash
+
+
+def _is_legacy_key(key: str) -> bool:
+    """是否为旧版16位十六进制MD5键"""
+    return len(key) == 16 and all(c in "0123456789abcdef" for c in key)
+
+
+def _legacy_hash(key: str) -> str:
+    """由新版标识键计算旧版（v2.3及之前）的MD5键，用于迁移状态文件"""
+    path, _, size = key.rpartition("|")
+    md5 = hashlib.md5()
+    md5.update(str(Path(path)).encode())
+    md5.update(size.encode())
+    return md5.hexdigest()[:16]
 
 
 class ConversionState:
     """转换状态管理（断点续传）"""
     
-    def __init__(self, state_file: Path):
+    # 两次落盘之间的最小间隔（秒）
+    FLUSH_INTERVAL = 2.0
+    
+    def __init__(self, state_file: Path, log: Optional[Callable[[str, str], None]] = None):
+        """
+        Args:
+            state_file: 状态文件路径
+            log: 日志函数 (message, level)，落盘失败时调用
+        """
         self.state_file = state_file
+        self._log = log
         self.converted: Dict[str, str] = {}
+        self._legacy: Dict[str, str] = {}  # 旧版MD5键，命中时迁移为新键
+        self._sizes: Dict[str, int] = {}   # 已转换文件路径 → 记录的文件大小
+        self._dirty = False
+        self._last_save = time.monotonic()
         self.load()
     
     def load(self):
         if self.state_file.exists():
             try:
-                with open(self.state_file, 'r', encoding='utf-8') as f:
-                    self.converted = json.load(f)
-            except:
+                if HAS_ORJSON:
+                    self.converted = orjson.loads(self.state_file.read_bytes())
+                else:
+                    with open(self.state_file, 'r', encoding='utf-8') as f:
+                        self.converted = json.load(f)
+            except (ValueError, OSError):
                 self.converted = {}
+            
+            # 分离旧版16位MD5键
+            for key in [k for k in self.converted if _is_legacy_key(k)]:
+                self._legacy[key] = self.converted.pop(key)
+            
+            for key in self.converted:
+                self._index(key)
+    
+    def _index(self, key: str):
+        """记录标识键中的路径和大小"""
+        path, sep, size = key.rpartition("|")
+        if sep and size.isdigit():
+            self._sizes[path] = int(size)
+    
+    def converted_size(self, path: Path) -> Optional[int]:
+        """返回已转换文件记录的大小，未转换返回None（无需访问文件系统）"""
+        return self._sizes.get(path.as_posix())
     
     def save(self):
-        with open(self.state_file, 'w', encoding='utf-8') as f:
-            json.dump(self.converted, f, ensure_ascii=False, indent=2)
+        """原子写入状态文件（先写临时文件再替换）"""
+        fd, tmp_path = tempfile.mkstemp(
+            dir=str(self.state_file.parent), prefix=".state_", suffix=".tmp"
+        )
+        try:
+            data = {**self._legacy, **self.converted}
+            with os.fdopen(fd, 'wb') as f:
+                if HAS_ORJSON:
+                    f.write(orjson.dumps(data))
+                else:
+                    # 紧凑格式 + 默认ensure_ascii，走json的C编码器
+                    f.write(json.dumps(data, separators=(",", ":")).encode('ascii'))
+            os.replace(tmp_path, self.state_file)
+        except BaseException:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
+        self._dirty = False
+        self._last_save = time.monotonic()
+    
+    def flush(self, force: bool = False) -> bool:
+        """
+        有未保存的变更时落盘；非强制时按FLUSH_INTERVAL节流
+        
+        写入失败（如文件被杀毒软件占用）时只记录日志并保留未保存标记，下次flush重试
+        
+        Returns:
+            是否已无未保存的变更
+        """
+        if not self._dirty:
+            return True
+        if force or time.monotonic() - self._last_save > self.FLUSH_INTERVAL:
+            try:
+                self.save()
+            except OSError as e:
+                # 推迟下次重试，避免每个文件都重试一次
+                self._last_save = time.monotonic()
+                if self._log:
+                    self._log(f"保存转换状态失败: {e}", "WARNING")
+                return False
+        return not self._dirty
     
     def is_converted(self, file_hash: str) -> bool:
-        return file_hash in self.converted
+        if file_hash in self.converted:
+            return True
+        if self._legacy and "|" in file_hash:
+            old_key = _legacy_hash(file_hash)
+            if old_key in self._legacy:
+                self.converted[file_hash] = self._legacy.pop(old_key)
+                self._index(file_hash)
+                self._dirty = True
+                return True
+        return False
     
     def mark_converted(self, file_hash: str, output_path: str):
+        """记录已转换文件（只修改内存，由flush()批量落盘）"""
         self.converted[file_hash] = output_path
-        self.save()
+        self._index(file_hash)
+        self._dirty = True
+
+
+def _walk_files(root: Path, ext_types: Dict[str, str]):
+    """
+    遍历目录树，查找指定扩展名的文件
+    
+    基于os.scandir：目录项类型来自目录读取结果，无需为每一项单独stat或创建Path对象。
+    
+    Args:
+        root: 根目录
+        ext_types: 扩展名（小写，含点号）→ 文件类型
+    
+    Yields:
+        (DirEntry, file_type)
+    """
+    stack = [str(root)]
+    while stack:
+        try:
+            it = os.scandir(stack.pop())
+        except OSError:
+            continue
+        with it:
+            for entry in it:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                        continue
+                    file_type = ext_types.get(os.path.splitext(entry.name)[1].lower())
+                    if file_type and entry.is_file(follow_symlinks=False):
+                        yield entry, file_type
+                except OSError:
+                    continue
+
+
+def _probe_file_size(entry: os.DirEntry) -> Optional[int]:
+    """获取文件大小（Windows上DirEntry已缓存，无需额外系统调用），无法访问时返回None"""
+    try:
+        return entry.stat(follow_symlinks=False).st_size
+    except OSError:
+        return None
+
+
+# ========== 单文件转换（进程池任务） ==========
+
+# 已确认可写的图片目录（集中输出时所有文件共用同一目录）
+_checked_dirs: set = set()
+
+
+def convert_one(
+    file_path: Path,
+    file_type: str,
+    md_name: str,
+    output_dir: Path,
+    images_subdir: str,
+    extract_images: bool = True,
+    image_dpi: int = 150,
+    overwrite: bool = True,
+    enable_ocr: bool = True,
+    pdf_bytes: Optional[bytes] = None,
+    conversion_time: Optional[str] = None,
+) -> Tuple[Optional[str], int, Optional[str]]:
+    """
+    转换单个文件（模块级纯函数，可在子进程中执行）
+    
+    Args:
+        file_path: 源文件路径
+        file_type: 文件类型（pdf, docx, pptx, ...）
+        md_name: 目标MD文件名
+        output_dir: MD输出目录
+        images_subdir: 图片子目录名（相对output_dir）
+        extract_images: 是否提取图片
+        image_dpi: 图片DPI
+        overwrite: 是否覆盖已存在的MD文件
+        enable_ocr: 是否对扫描版PDF启用OCR
+        pdf_bytes: 已读入内存的PDF数据（可选，提供时不再从磁盘读取）
+        conversion_time: 写入文档头的转换时间（批量转换时共用，默认取当前时间）
+    
+    Returns:
+        (md_path, images_count, error): 成功时error为None，失败时md_path为None
+    """
+    try:
+        images_dir = output_dir / images_subdir
+        
+        # 检查输出目录是否可写（每个进程内同一目录只检查一次）
+        if images_dir not in _checked_dirs:
+            try:
+                images_dir.mkdir(parents=True, exist_ok=True)
+                # 测试写入权限
+                test_file = images_dir / ".test_write"
+                test_file.write_text("test")
+                test_file.unlink()
+            except (OSError, PermissionError):
+                raise Exception(f"输出目录不可写：{output_dir}。请检查目录权限或选择其他目录。")
+            _checked_dirs.add(images_dir)
+        
+        if file_type.lower() == "pdf":
+            # PDF处理 - 根据OCR设置选择提取方法
+            if enable_ocr and HAS_OCR_SUPPORT and is_ocr_available():
+                pdf_content = extract_pdf_content_with_ocr(
+                    pdf_path=file_path,
+                    output_dir=output_dir,
+                    images_subdir=images_subdir,
+                    extract_images=extract_images,
+                    image_dpi=image_dpi,
+                    enable_ocr=True,
+                    ocr_lang="chi_sim+eng",
+                    pdf_bytes=pdf_bytes
+                )
+            else:
+                pdf_content = extract_pdf_content(
+                    pdf_path=file_path,
+                    output_dir=output_dir,
+                    images_subdir=images_subdir,
+                    extract_images=extract_images,
+                    image_dpi=image_dpi,
+                    pdf_bytes=pdf_bytes
+                )
+            # 逐页生成Markdown，边生成边写入
+            chunks = convert_to_markdown_stream(pdf_content, file_path, images_subdir, conversion_time)
+            total_images = pdf_content.total_images
+        else:
+            # Office文档处理
+            if not HAS_OFFICE_SUPPORT:
+                raise Exception("未安装Office文档支持库，请运行: pip install python-docx python-pptx openpyxl")
+            if os.path.getsize(file_path) > STREAM_OFFICE_MIN_SIZE:
+                # 大文档边解析边生成Markdown，不在内存中保存全部文本块
+                office_content, chunks = stream_office_markdown(
+                    file_path, output_dir, images_subdir, extract_images, conversion_time
+                )
+            else:
+                office_content = extract_office_content(
+                    file_path=file_path,
+                    output_dir=output_dir,
+                    images_subdir=images_subdir,
+                    extract_images=extract_images
+                )
+                chunks = None  # 打开输出文件后直接写入，不在内存中拼出完整文本
+            total_images = office_content.total_images
+        
+        # 先写入同目录的临时文件，完整生成后再替换为目标文件：
+        # 生成过程出错时不会留下截断的MD文件，覆盖模式下原文件保持不变
+        output_path = output_dir / md_name
+        tmp_path, f = _create_temp_file(output_path)
+        reserved = False
+        try:
+            with f:
+                if chunks is None:
+                    office_content_to_markdown(office_content, file_path, images_subdir, conversion_time, out=f)
+                else:
+                    f.writelines(chunks)
+            if not overwrite:
+                output_path = _reserve_unique_path(output_path, file_path.stem)
+                reserved = True
+            os.replace(tmp_path, output_path)
+        except BaseException:
+            for path in ([tmp_path, output_path] if reserved else [tmp_path]):
+                try:
+                    os.unlink(path)
+                except OSError:
+                    pass
+            raise
+        return str(output_path), total_images, None
+    except Exception as e:
+        return None, 0, str(e)
+
+
+_EXCL_FLAGS = os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, "O_BINARY", 0)
+
+
+def _create_temp_file(output_path: Path):
+    """
+    在输出文件所在目录独占创建临时文件（同一文件系统，完成后可用 os.replace 原子替换）
+    
+    Returns:
+        (临时文件路径, 已打开的文本文件对象)
+    """
+    counter = 0
+    while True:
+        tmp_path = output_path.with_name(f".{output_path.name}.{os.getpid()}_{counter}.tmp")
+        try:
+            fd = os.open(str(tmp_path), _EXCL_FLAGS, 0o644)
+            break
+        except FileExistsError:
+            counter += 1
+    return tmp_path, os.fdopen(fd, 'w', encoding='utf-8', buffering=1024 * 1024)
+
+
+def _reserve_unique_path(output_path: Path, base_name: str) -> Path:
+    """
+    独占创建空的输出文件占位，同名文件已存在时依次尝试 base_name_1.md、base_name_2.md ...
+    
+    使用 O_EXCL 由系统原子判断是否存在，无冲突时只需一次 open
+    
+    Returns:
+        实际路径
+    """
+    counter = 0
+    while True:
+        try:
+            os.close(os.open(str(output_path), _EXCL_FLAGS, 0o644))
+            return output_path
+        except FileExistsError:
+            counter += 1
+            output_path = output_path.with_name(f"{base_name}_{counter}.md")
+
+
+# 超过此大小的Office文档流式生成Markdown（不使用解析结果缓存）
+STREAM_OFFICE_MIN_SIZE = 20 * 1024 * 1024
+
+# 不超过此大小的PDF一次读入内存后从内存打开，更大的文件按路径打开以免占用双倍内存
+MAX_IN_MEMORY_PDF = 100 * 1024 * 1024
+
+# 子进程中的转换选项（由_init_worker设置）
+_worker_options: Dict = {}
+
+
+def _init_worker(options: Dict):
+    """进程池子进程初始化：保存转换选项并预加载解析模块"""
+    global _worker_options
+    _worker_options = dict(options)
+    
+    # 预先导入解析库，避免首个任务承担导入耗时
+    import fitz  # noqa: F401
+    import pdf_parser.extractor  # noqa: F401
+    import md_generator.converter  # noqa: F401
+    if HAS_OFFICE_SUPPORT:
+        import office_parser  # noqa: F401
+
+
+def _worker_convert(file_path: Path, file_type: str, md_name: str,
+                    output_dir: Path, images_subdir: str) -> Tuple[Optional[str], int, Optional[str]]:
+    """子进程任务入口：使用初始化时的选项调用convert_one"""
+    pdf_bytes = None
+    if file_type.lower() == "pdf":
+        # 读入内存后由PyMuPDF从内存随机访问，避免解析时的大量小块读取
+        try:
+            if os.path.getsize(file_path) <= MAX_IN_MEMORY_PDF:
+                pdf_bytes = Path(file_path).read_bytes()
+        except OSError:
+            pdf_bytes = None  # 读取失败时按路径打开，由解析器报告错误
+    return convert_one(file_path, file_type, md_name, output_dir, images_subdir,
+                       pdf_bytes=pdf_bytes, **_worker_options)
 
 
 class PDFtoMDApp(ctk.CTk):
     """文档转MD桌面应用 - 左右分栏布局"""
     
+    UI_DRAIN_INTERVAL = 50  # UI队列处理间隔（毫秒）
+    UI_DRAIN_BATCH = 64     # 每次最多处理的更新数
+    SCAN_WORKERS = 16       # 扫描时获取文件信息的线程数
+    SCAN_BATCH = 50         # 扫描时每批提交到UI的文件行数
+    ROW_POOL_SIZE = 40      # 文件列表行控件数量（超出的文件滚动显示）
+    ROW_HEIGHT = 30         # 文件列表行高（像素，用于估算可见行数）
+    LOG_FLUSH_INTERVAL = 100  # 日志写入控件的间隔（毫秒）
+    LOG_MAX_LINES = 5000      # 日志控件保留的最大行数
+    
     def __init__(self):
         super().__init__()
         
@@ -213,16 +609,34 @@ class PDFtoMDApp(ctk.CTk):
         self.should_stop = False
         self.conversion_state: Optional[ConversionState] = None
         
+        # 后台事件循环：扫描和转换的调度都在此线程中进行
+        self._loop = asyncio.new_event_loop()
+        self._stop_event: Optional[asyncio.Event] = None
+        threading.Thread(target=self._loop.run_forever, daemon=True).start()
+        
+        # 文件列表虚拟化：只创建固定数量的行控件，滚动时按索引重绘
         self.pdf_rows: List[Dict] = []
         self.md_rows: List[Dict] = []
+        self._row_count = 0       # 已加入列表的文件数
+        self._list_offset = 0     # 第一行显示的文件索引
+        self._visible_rows = 1    # 当前可显示的行数
+        
+        # 状态计数（随状态变化增量维护，避免每次刷新都遍历file_items）
+        self._counts: Dict[ConvertStatus, int] = {status: 0 for status in ConvertStatus}
+        self._total_images = 0
+        
+        # 后台线程 → UI线程的更新队列（由_drain_ui定时批量处理）
+        self._ui_queue: collections.deque = collections.deque()
+        self._pending_rows: Dict[int, FileItem] = {}  # 同一行只保留最新一次更新
         self.log_messages: List[str] = []
+        self._pending_log: List[str] = []  # 待写入日志控件的行
         
         # 转换选项
         self.extract_images = True  # 提取嵌入图片
         self.image_dpi = 150
         self.overwrite_mode = True  # 覆盖模式（默认开启）
         self.output_mode = "centralized"  # 输出模式: "centralized"(集中输出) 或 "inplace"(就地输出)
-        self.max_workers = min(4, os.cpu_count() or 2)  # 并行线程数
+        self.max_workers = min(4, os.cpu_count() or 2)  # 并行进程数
         self.enable_ocr = True  # OCR识别扫描版PDF
         
         # 格式选择（默认全选）
@@ -237,6 +651,8 @@ class PDFtoMDApp(ctk.CTk):
         }
         
         self._create_ui()
+        self.after(self.UI_DRAIN_INTERVAL, self._drain_ui)
+        self.after(self.LOG_FLUSH_INTERVAL, self._flush_log)
         
         # 窗口关闭时删除锁文件
         self.protocol("WM_DELETE_WINDOW", self._on_closing)
@@ -249,11 +665,18 @@ class PDFtoMDApp(ctk.CTk):
         self.grid_rowconfigure(3, weight=1)
         self.grid_rowconfigure(4, weight=0)
         
+        # 首屏只创建操作栏和文件列表，其余区域在首次事件循环后创建
+        self._deferred_ui_ready = False
         self._create_top_frame()
         self._create_main_frame()
+        self.after(0, self._create_deferred_ui)
+    
+    def _create_deferred_ui(self):
+        """创建非首屏区域（结果栏、日志栏、状态栏）"""
         self._create_result_frame()
         self._create_log_frame()
         self._create_status_bar()
+        self._deferred_ui_ready = True
     
     def _create_top_frame(self):
         """创建顶部区域"""
@@ -408,6 +831,16 @@ class PDFtoMDApp(ctk.CTk):
         )
         self.ocr_help_btn.pack(side="left", padx=2)
         
+        # 并行进程数（内存较小的机器可调低）
+        ctk.CTkLabel(ctrl_frame, text="并行数:", font=("", 11)).pack(side="left", padx=(10, 2))
+        cpu_count = os.cpu_count() or 2
+        self.workers_menu = ctk.CTkOptionMenu(
+            ctrl_frame, values=[str(n) for n in range(1, cpu_count + 1)],
+            command=self._update_workers, width=60
+        )
+        self.workers_menu.set(str(self.max_workers))
+        self.workers_menu.pack(side="left", padx=2)
+        
         # 版本标签
         version_label = ctk.CTkLabel(
             ctrl_frame, text=f"v{APP_VERSION}", font=("", 10), text_color="#6b7280"
@@ -419,6 +852,11 @@ class PDFtoMDApp(ctk.CTk):
         )
         self.stats_label.pack(side="right", padx=20)
     
+    def _update_workers(self, value: str):
+        """更新并行进程数（下次开始转换时生效）"""
+        self.max_workers = int(value)
+        self._log(f"⚙️ 并行进程数: {self.max_workers}", "INFO")
+    
     def _select_all_formats(self):
         """全选所有格式"""
         for var in self.format_vars.values():
@@ -550,31 +988,66 @@ https://github.com/UB-Mannheim/tesseract/wiki
         left_label = ctk.CTkLabel(main_frame, text="📄 源文档文件", font=("", 14, "bold"))
         left_label.grid(row=0, column=0, padx=10, pady=5, sticky="w")
         
-        self.pdf_frame = ctk.CTkScrollableFrame(main_frame)
+        self.pdf_frame = ctk.CTkFrame(main_frame)
         self.pdf_frame.grid(row=1, column=0, padx=5, pady=5, sticky="nsew")
         self.pdf_frame.grid_columnconfigure(0, weight=1)
+        self.pdf_frame.grid_propagate(False)
         
         self._create_list_header(self.pdf_frame, "源文件")
         
         right_label = ctk.CTkLabel(main_frame, text="📝 生成MD文件", font=("", 14, "bold"))
         right_label.grid(row=0, column=1, padx=10, pady=5, sticky="w")
         
-        self.md_frame = ctk.CTkScrollableFrame(main_frame)
+        self.md_frame = ctk.CTkFrame(main_frame)
         self.md_frame.grid(row=1, column=1, padx=5, pady=5, sticky="nsew")
         self.md_frame.grid_columnconfigure(0, weight=1)
+        self.md_frame.grid_propagate(False)
         
         self._create_list_header(self.md_frame, "MD")
-    
-    def _create_list_header(self, parent, file_type: str):
-        """创建列表表头"""
-        header = ctk.CTkFrame(parent, fg_color=("#e5e7eb", "#374151"), corner_radius=5)
-        header.grid(row=0, column=0, sticky="ew", pady=(0, 5))
-        header.grid_columnconfigure(1, weight=1)
         
-        ctk.CTkLabel(header, text="#", width=40, font=("", 11, "bold")).grid(row=0, column=0, padx=5, pady=5)
-        ctk.CTkLabel(header, text=f"{file_type}文件名", font=("", 11, "bold"), anchor="w").grid(row=0, column=1, padx=5, pady=5, sticky="w")
-        ctk.CTkLabel(header, text="状态", width=70, font=("", 11, "bold")).grid(row=0, column=2, padx=5, pady=5)
-        ctk.CTkLabel(header, text="进度", width=100, font=("", 11, "bold")).grid(row=0, column=3, padx=5, pady=5)
+        # 左右两栏共用一个滚动条，保持行对齐
+        self.list_scrollbar = ctk.CTkScrollbar(main_frame, command=self._on_list_scroll)
+        self.list_scrollbar.grid(row=1, column=2, padx=(0, 5), pady=5, sticky="ns")
+        
+        self._create_row_pool()
+        
+        self.pdf_frame.bind("<Configure>", self._on_list_configure)
+        self.bind_all("<MouseWheel>", self._on_list_mousewheel, add="+")
+        self.bind_all("<Button-4>", self._on_list_mousewheel, add="+")
+        self.bind_all("<Button-5>", self._on_list_mousewheel, add="+")
+    
+    def _create_row_pool(self):
+        """预先创建固定数量的行控件"""
+        for slot in range(self.ROW_POOL_SIZE):
+            # PDF列表行
+            pdf_row = ctk.CTkFrame(self.pdf_frame, fg_color="transparent")
+            pdf_row.grid_columnconfigure(1, weight=1)
+            pdf_num = ctk.CTkLabel(pdf_row, text="", width=40, font=("", 11))
+            pdf_num.grid(row=0, column=0, padx=5)
+            pdf_name = ctk.CTkLabel(pdf_row, text="", font=("", 11), anchor="w")
+            pdf_name.grid(row=0, column=1, padx=5, sticky="w")
+            pdf_status = ctk.CTkLabel(pdf_row, text="", width=70, font=("", 10))
+            pdf_status.grid(row=0, column=2, padx=5)
+            pdf_progress = ctk.CTkProgressBar(pdf_row, width=80, height=12)
+            pdf_progress.grid(row=0, column=3, padx=5)
+            
+            self.pdf_rows.append({'frame': pdf_row, 'num': pdf_num, 'name': pdf_name,
+                                  'status': pdf_status, 'progress': pdf_progress})
+            
+            # MD列表行
+            md_row = ctk.CTkFrame(self.md_frame, fg_color="transparent")
+            md_row.grid_columnconfigure(1, weight=1)
+            md_num = ctk.CTkLabel(md_row, text="", width=40, font=("", 11))
+            md_num.grid(row=0, column=0, padx=5)
+            md_name = ctk.CTkLabel(md_row, text="", font=("", 11), anchor="w")
+            md_name.grid(row=0, column=1, padx=5, sticky="w")
+            md_status = ctk.CTkLabel(md_row, text="", width=70, font=("", 10))
+            md_status.grid(row=0, column=2, padx=5)
+            md_progress = ctk.CTkProgressBar(md_row, width=80, height=12)
+            md_progress.grid(row=0, column=3, padx=5)
+            
+            self.md_rows.append({'frame': md_row, 'num': md_num, 'name': md_name,
+                                 'status': md_status, 'progress': md_progress})
     
     def _create_result_frame(self):
         """创建转换结果详情栏"""
@@ -691,6 +1164,45 @@ https://github.com/UB-Mannheim/tesseract/wiki
         )
         self.status_label.pack(side="right", padx=10)
     
+    def _post_row(self, idx: int, file_item: FileItem):
+        """（任意线程）请求刷新文件行"""
+        self._pending_rows[idx] = file_item
+    
+    def _post_log(self, message: str, level: str = "INFO"):
+        """（任意线程）请求添加日志"""
+        self._ui_queue.append((self._log, (message, level), None))
+    
+    def _post_call(self, func, *args, **kwargs):
+        """（任意线程）请求在UI线程中调用函数，按提交顺序执行"""
+        self._ui_queue.append((func, args, kwargs or None))
+    
+    def _drain_ui(self):
+        """批量处理后台线程提交的UI更新"""
+        rows_changed = False
+        for _ in range(self.UI_DRAIN_BATCH):
+            try:
+                idx, file_item = self._pending_rows.popitem()
+            except KeyError:
+                break
+            self._update_file_row(idx, file_item)
+            rows_changed = True
+        
+        if rows_changed:
+            self._update_stats()
+            self._update_result_counts()
+        
+        for _ in range(self.UI_DRAIN_BATCH):
+            try:
+                func, args, kwargs = self._ui_queue.popleft()
+            except IndexError:
+                break
+            if kwargs:
+                func(*args, **kwargs)
+            else:
+                func(*args)
+        
+        self.after(self.UI_DRAIN_INTERVAL, self._drain_ui)
+    
     def _log(self, message: str, level: str = "INFO"):
         """添加日志"""
         timestamp = datetime.now().strftime("%H:%M:%S")
@@ -699,13 +1211,32 @@ https://github.com/UB-Mannheim/tesseract/wiki
         log_line = f"[{timestamp}] {icon} {message}\n"
         
         self.log_messages.append(log_line)
-        self.log_text.configure(state=tk.NORMAL)
-        self.log_text.insert(tk.END, log_line)
-        self.log_text.see(tk.END)
-        self.log_text.configure(state=tk.DISABLED)
+        if len(self.log_messages) > self.LOG_MAX_LINES * 2:
+            del self.log_messages[:-self.LOG_MAX_LINES]
+        # 写入日志控件由_flush_log定时批量完成
+        self._pending_log.append(log_line)
+    
+    def _flush_log(self, reschedule: bool = True):
+        """将缓冲的日志一次性写入日志控件"""
+        if self._pending_log and self._deferred_ui_ready:
+            chunk = "".join(self._pending_log)
+            self._pending_log.clear()
+            
+            self.log_text.configure(state=tk.NORMAL)
+            self.log_text.insert(tk.END, chunk)
+            # 超过行数上限时删除最早的日志
+            line_count = int(self.log_text.index("end-1c").split(".")[0])
+            if line_count > self.LOG_MAX_LINES:
+                self.log_text.delete("1.0", f"{line_count - self.LOG_MAX_LINES + 1}.0")
+            self.log_text.see(tk.END)
+            self.log_text.configure(state=tk.DISABLED)
+        
+        if reschedule:
+            self.after(self.LOG_FLUSH_INTERVAL, self._flush_log)
     
     def _copy_log(self):
         """复制日志到剪贴板"""
+        self._flush_log(reschedule=False)
         self.log_text.configure(state=tk.NORMAL)
         content = self.log_text.get("1.0", tk.END)
         self.log_text.configure(state=tk.DISABLED)
@@ -721,6 +1252,7 @@ https://github.com/UB-Mannheim/tesseract/wiki
             initialfilename=f"pdf_md_log_{datetime.now().strftime('%Y%m%d_%H%M%S')}.txt"
         )
         if file_path:
+            self._flush_log(reschedule=False)
             self.log_text.configure(state=tk.NORMAL)
             content = self.log_text.get("1.0", tk.END)
             self.log_text.configure(state=tk.DISABLED)
@@ -730,6 +1262,7 @@ https://github.com/UB-Mannheim/tesseract/wiki
     
     def _clear_log(self):
         """清空日志"""
+        self._pending_log.clear()
         self.log_text.configure(state=tk.NORMAL)
         self.log_text.delete("1.0", tk.END)
         self.log_text.configure(state=tk.DISABLED)
@@ -753,7 +1286,7 @@ https://github.com/UB-Mannheim/tesseract/wiki
             self.target_entry.delete(0, tk.END)
             self.target_entry.insert(0, dir_path)
             state_file = self.target_dir / ".conversion_state.json"
-            self.conversion_state = ConversionState(state_file)
+            self.conversion_state = ConversionState(state_file, log=self._post_log)
             self._update_status("✅ 已选择目标目录")
             self._log(f"选择目标目录: {dir_path}", "INFO")
     
@@ -790,8 +1323,7 @@ https://github.com/UB-Mannheim/tesseract/wiki
         self._clear_list()
         self._log("开始扫描文档文件...", "INFO")
         
-        thread = threading.Thread(target=self._scan_thread, daemon=True)
-        thread.start()
+        self._run_async(self._scan_task())
     
     def _scan_thread(self):
         """扫描线程"""
@@ -799,35 +1331,48 @@ https://github.com/UB-Mannheim/tesseract/wiki
             # 获取启用的格式
             enabled_formats = [fmt for fmt, enabled in self.format_filters.items() if enabled]
             if not enabled_formats:
-                self.after(0, lambda: self._log("⚠️ 请至少选择一种文件格式", "WARNING"))
-                self.after(0, lambda: self.scan_btn.configure(state="normal", text="🔍 扫描文档"))
+                self._post_log("⚠️ 请至少选择一种文件格式", "WARNING")
+                self._post_call(self.scan_btn.configure, state="normal", text="🔍 扫描文档")
                 return
             
-            # 扫描所有支持的文件格式
-            all_files = []
+            # 扫描所有支持的文件格式（扩展名 → 文件类型）
+            ext_types = {}
             
-            # 扫描PDF文件（如果启用）
+            # PDF文件（如果启用）
             if "pdf" in enabled_formats:
-                pdf_files = list(self.source_dir.rglob("*.pdf"))
-                all_files.extend([(p, "pdf") for p in pdf_files])
+                ext_types[".pdf"] = "pdf"
             
-            # 扫描Office文件（如果支持且启用）
+            # Office文件（如果支持且启用）
             if HAS_OFFICE_SUPPORT:
                 for ext in OFFICE_EXTENSIONS:
                     file_type = ext[1:]  # 去掉点号
                     if file_type in enabled_formats:
-                        office_files = list(self.source_dir.rglob(f"*{ext}"))
-                        all_files.extend([(p, file_type) for p in office_files])
+                        ext_types[ext] = file_type
+            
+            # 一次遍历目录树匹配所有扩展名
+            all_files = list(_walk_files(self.source_dir, ext_types))
             
             skipped = 0
             type_counts = {"pdf": 0, "docx": 0, "doc": 0, "pptx": 0, "ppt": 0, "xlsx": 0, "xls": 0}
+            batch: List[FileItem] = []
             
-            for path, file_type in all_files:
-                try:
-                    if not path.exists():
+            # 已转换的文件直接使用状态文件中记录的大小，不再stat
+            paths = [Path(entry.path) for entry, _ in all_files]
+            if self.conversion_state:
+                known_sizes = [self.conversion_state.converted_size(path) for path in paths]
+            else:
+                known_sizes = [None] * len(paths)
+            
+            # 多线程获取其余文件大小（stat为I/O等待，网络盘/机械盘上并行收益明显）
+            with concurrent.futures.ThreadPoolExecutor(max_workers=self.SCAN_WORKERS) as pool:
+                sizes = pool.map(_probe_file_size, [
+                    entry for (entry, _), known in zip(all_files, known_sizes) if known is None
+                ])
+                for (entry, file_type), path, known in zip(all_files, paths, known_sizes):
+                    file_size = known if known is not None else next(sizes)
+                    if file_size is None:
                         skipped += 1
                         continue
-                    file_size = path.stat().st_size
                     file_item = FileItem(
                         pdf_path=path, pdf_name=path.name,
                         md_name=path.stem + ".md", size=file_size,
@@ -838,27 +1383,33 @@ https://github.com/UB-Mannheim/tesseract/wiki
                         file_item.progress = 100
                     self.file_items.append(file_item)
                     type_counts[file_type] = type_counts.get(file_type, 0) + 1
-                    self.after(0, lambda f=file_item: self._add_file_row(f))
-                except (OSError, PermissionError):
-                    skipped += 1
-                    continue
+                    
+                    # 分批提交到UI线程创建行
+                    batch.append(file_item)
+                    if len(batch) >= self.SCAN_BATCH:
+                        self._post_call(self._add_file_rows, batch)
+                        batch = []
+            
+            if batch:
+                self._post_call(self._add_file_rows, batch)
             
             if skipped > 0:
-                self.after(0, lambda c=skipped: self._log(f"跳过 {c} 个无法访问的文件", "WARNING"))
+                self._post_log(f"跳过 {skipped} 个无法访问的文件", "WARNING")
             
             # 记录各类型文件数量
             type_info = ", ".join([f"{t.upper()}: {c}" for t, c in type_counts.items() if c > 0])
             if type_info:
-                self.after(0, lambda info=type_info: self._log(f"文件类型统计: {info}", "INFO"))
+                self._post_log(f"文件类型统计: {type_info}", "INFO")
             
-            self.after(0, self._scan_finished)
+            self._post_call(self._scan_finished)
         except Exception as e:
-            self.after(0, lambda err=str(e): self._log(f"扫描错误: {err}", "ERROR"))
-            self.after(0, lambda: self.scan_btn.configure(state="normal", text="🔍 扫描文档"))
+            self._post_log(f"扫描错误: {e}", "ERROR")
+            self._post_call(self.scan_btn.configure, state="normal", text="🔍 扫描文档")
     
     def _scan_finished(self):
         """扫描完成"""
         self.scan_btn.configure(state="normal", text="🔍 扫描文档")
+        self._recount()
         self._update_stats()
         self._update_result_counts()
         
@@ -870,55 +1421,99 @@ https://github.com/UB-Mannheim/tesseract/wiki
             self._update_status("⚠️ 未找到支持的文档文件")
             self._log("未找到支持的文档文件（PDF/Word/PPT/Excel）", "WARNING")
     
+    def _add_file_rows(self, file_items: List[FileItem]):
+        """批量添加文件行"""
+        self._row_count += len(file_items)
+        self._refresh_list()
+    
     def _add_file_row(self, file_item: FileItem):
         """添加文件行"""
-        idx = len(self.pdf_rows)
-        
-        # PDF列表行
-        pdf_row = ctk.CTkFrame(self.pdf_frame, fg_color="transparent")
-        pdf_row.grid(row=idx+1, column=0, sticky="ew", pady=1)
-        pdf_row.grid_columnconfigure(1, weight=1)
-        
-        ctk.CTkLabel(pdf_row, text=str(idx+1), width=40, font=("", 11)).grid(row=0, column=0, padx=5)
-        ctk.CTkLabel(pdf_row, text=file_item.pdf_name, font=("", 11), anchor="w").grid(row=0, column=1, padx=5, sticky="w")
-        pdf_status = ctk.CTkLabel(pdf_row, text=file_item.status.value, width=70, font=("", 10),
-                                   text_color=self._get_status_color(file_item.status))
-        pdf_status.grid(row=0, column=2, padx=5)
-        pdf_progress = ctk.CTkProgressBar(pdf_row, width=80, height=12)
-        pdf_progress.grid(row=0, column=3, padx=5)
-        pdf_progress.set(file_item.progress / 100)
-        
-        self.pdf_rows.append({'frame': pdf_row, 'status': pdf_status, 'progress': pdf_progress})
-        
-        # MD列表行
-        md_row = ctk.CTkFrame(self.md_frame, fg_color="transparent")
-        md_row.grid(row=idx+1, column=0, sticky="ew", pady=1)
-        md_row.grid_columnconfigure(1, weight=1)
-        
-        ctk.CTkLabel(md_row, text=str(idx+1), width=40, font=("", 11)).grid(row=0, column=0, padx=5)
-        initial_color = "#9ca3af" if file_item.status == ConvertStatus.PENDING else "#ffffff"
-        md_name_label = ctk.CTkLabel(md_row, text=file_item.md_name, font=("", 11), anchor="w", text_color=initial_color)
-        md_name_label.grid(row=0, column=1, padx=5, sticky="w")
+        self._add_file_rows([file_item])
+    
+    def _update_file_row(self, idx: int, file_item: FileItem):
+        """更新文件行（不在可见区域内时无需处理）"""
+        slot = idx - self._list_offset
+        if 0 <= slot < self._visible_rows and idx < self._row_count:
+            self._render_row(slot, idx, file_item)
+    
+    def _render_row(self, slot: int, idx: int, file_item: FileItem):
+        """将文件数据绘制到指定行控件"""
+        status_color = self._get_status_color(file_item.status)
+        
+        pdf_row = self.pdf_rows[slot]
+        pdf_row['num'].configure(text=str(idx + 1))
+        pdf_row['name'].configure(text=file_item.pdf_name)
+        pdf_row['status'].configure(text=file_item.status.value, text_color=status_color)
+        pdf_row['progress'].set(file_item.progress / 100)
+        
+        md_row = self.md_rows[slot]
+        md_color = "#ffffff" if file_item.status != ConvertStatus.PENDING else "#9ca3af"
         md_status_text = "—" if file_item.status == ConvertStatus.PENDING else file_item.status.value
-        md_status = ctk.CTkLabel(md_row, text=md_status_text, width=70, font=("", 10),
-                                  text_color=self._get_status_color(file_item.status))
-        md_status.grid(row=0, column=2, padx=5)
-        md_progress = ctk.CTkProgressBar(md_row, width=80, height=12)
-        md_progress.grid(row=0, column=3, padx=5)
-        md_progress.set(file_item.progress / 100)
+        md_row['num'].configure(text=str(idx + 1))
+        md_row['name'].configure(text=file_item.md_name, text_color=md_color)
+        md_row['status'].configure(text=md_status_text, text_color=status_color)
+        md_row['progress'].set(file_item.progress / 100)
+    
+    def _refresh_list(self):
+        """按当前滚动位置重绘可见行"""
+        max_offset = max(0, self._row_count - self._visible_rows)
+        self._list_offset = min(max(0, self._list_offset), max_offset)
+        
+        for slot in range(self.ROW_POOL_SIZE):
+            idx = self._list_offset + slot
+            pdf_frame = self.pdf_rows[slot]['frame']
+            md_frame = self.md_rows[slot]['frame']
+            if slot < self._visible_rows and idx < self._row_count:
+                self._render_row(slot, idx, self.file_items[idx])
+                pdf_frame.grid(row=slot + 1, column=0, sticky="ew", pady=1)
+                md_frame.grid(row=slot + 1, column=0, sticky="ew", pady=1)
+            else:
+                pdf_frame.grid_remove()
+                md_frame.grid_remove()
         
-        self.md_rows.append({'frame': md_row, 'name': md_name_label, 'status': md_status, 'progress': md_progress})
+        if self._row_count > 0:
+            first = self._list_offset / self._row_count
+            last = min(1.0, (self._list_offset + self._visible_rows) / self._row_count)
+        else:
+            first, last = 0.0, 1.0
+        self.list_scrollbar.set(first, last)
     
-    def _update_file_row(self, idx: int, file_item: FileItem):
-        """更新文件行"""
-        if idx < len(self.pdf_rows):
-            self.pdf_rows[idx]['status'].configure(text=file_item.status.value, text_color=self._get_status_color(file_item.status))
-            self.pdf_rows[idx]['progress'].set(file_item.progress / 100)
-            
-            md_color = "#ffffff" if file_item.status != ConvertStatus.PENDING else "#9ca3af"
-            self.md_rows[idx]['name'].configure(text_color=md_color)
-            self.md_rows[idx]['status'].configure(text=file_item.status.value, text_color=self._get_status_color(file_item.status))
-            self.md_rows[idx]['progress'].set(file_item.progress / 100)
+    def _scroll_list_to(self, offset: int):
+        """滚动到指定文件索引"""
+        if offset != self._list_offset:
+            self._list_offset = offset
+            self._refresh_list()
+    
+    def _on_list_scroll(self, action: str, value, unit: str = None):
+        """滚动条回调"""
+        if action == "moveto":
+            self._scroll_list_to(int(float(value) * self._row_count))
+        elif action == "scroll":
+            step = self._visible_rows if unit == "pages" else 1
+            self._scroll_list_to(self._list_offset + int(value) * step)
+    
+    def _on_list_configure(self, event):
+        """列表区域大小变化时重新计算可见行数"""
+        visible = max(1, min(self.ROW_POOL_SIZE, (event.height - self.ROW_HEIGHT) // self.ROW_HEIGHT))
+        if visible != self._visible_rows:
+            self._visible_rows = visible
+            self._refresh_list()
+    
+    def _on_list_mousewheel(self, event):
+        """鼠标滚轮滚动文件列表"""
+        widget_path = str(event.widget)
+        if not any(widget_path == str(frame) or widget_path.startswith(str(frame) + ".")
+                   for frame in (self.pdf_frame, self.md_frame)):
+            return
+        if event.num == 4:
+            delta = -3
+        elif event.num == 5:
+            delta = 3
+        elif sys.platform == "darwin":
+            delta = -event.delta
+        else:
+            delta = -3 if event.delta > 0 else 3
+        self._scroll_list_to(self._list_offset + delta)
     
     def _get_status_color(self, status: ConvertStatus) -> str:
         """获取状态颜色"""
@@ -928,36 +1523,51 @@ https://github.com/UB-Mannheim/tesseract/wiki
             ConvertStatus.SKIPPED: "#a855f7"
         }.get(status, "#9ca3af")
     
+    def _recount(self):
+        """根据file_items重建状态计数"""
+        self._counts = {status: 0 for status in ConvertStatus}
+        self._total_images = 0
+        for f in self.file_items:
+            self._counts[f.status] += 1
+            self._total_images += f.images_count
+    
+    def _set_status(self, file_item: FileItem, status: ConvertStatus):
+        """修改文件状态并同步计数"""
+        self._counts[file_item.status] -= 1
+        self._counts[status] += 1
+        file_item.status = status
+    
+    def _add_images(self, count: int):
+        """累加图片计数"""
+        self._total_images += count
+    
     def _update_stats(self):
         """更新统计"""
         total = len(self.file_items)
-        completed = sum(1 for f in self.file_items if f.status == ConvertStatus.COMPLETED)
-        skipped = sum(1 for f in self.file_items if f.status == ConvertStatus.SKIPPED)
-        errors = sum(1 for f in self.file_items if f.status == ConvertStatus.ERROR)
-        pending = sum(1 for f in self.file_items if f.status == ConvertStatus.PENDING)
+        completed = self._counts[ConvertStatus.COMPLETED]
+        skipped = self._counts[ConvertStatus.SKIPPED]
+        errors = self._counts[ConvertStatus.ERROR]
+        pending = self._counts[ConvertStatus.PENDING]
         
         self.stats_label.configure(text=f"文件: {total} | 待转换: {pending} | 已完成: {completed + skipped} | 错误: {errors}")
-        if total > 0:
+        if total > 0 and self._deferred_ui_ready:
             self.total_progress.set((completed + skipped) / total)
             self.progress_label.configure(text=f"{int((completed + skipped) / total * 100)}%")
     
     def _update_result_counts(self):
         """更新结果统计"""
-        completed = sum(1 for f in self.file_items if f.status == ConvertStatus.COMPLETED)
-        skipped = sum(1 for f in self.file_items if f.status == ConvertStatus.SKIPPED)
-        errors = sum(1 for f in self.file_items if f.status == ConvertStatus.ERROR)
-        pending = sum(1 for f in self.file_items if f.status == ConvertStatus.PENDING)
-        total_images = sum(f.images_count for f in self.file_items)
-        
-        self.success_count_label.configure(text=str(completed))
-        self.skip_count_label.configure(text=str(skipped))
-        self.error_count_label.configure(text=str(errors))
-        self.pending_count_label.configure(text=str(pending))
-        self.images_count_label.configure(text=str(total_images))
+        if not self._deferred_ui_ready:
+            return
+        self.success_count_label.configure(text=str(self._counts[ConvertStatus.COMPLETED]))
+        self.skip_count_label.configure(text=str(self._counts[ConvertStatus.SKIPPED]))
+        self.error_count_label.configure(text=str(self._counts[ConvertStatus.ERROR]))
+        self.pending_count_label.configure(text=str(self._counts[ConvertStatus.PENDING]))
+        self.images_count_label.configure(text=str(self._total_images))
     
     def _update_status(self, message: str):
         """更新状态"""
-        self.status_label.configure(text=message)
+        if self._deferred_ui_ready:
+            self.status_label.configure(text=message)
     
     def _start_conversion(self):
         """开始转换"""
@@ -968,32 +1578,38 @@ https://github.com/UB-Mannheim/tesseract/wiki
                 return
             self.target_dir.mkdir(parents=True, exist_ok=True)
             if not self.conversion_state:
-                self.conversion_state = ConversionState(self.target_dir / ".conversion_state.json")
+                self.conversion_state = ConversionState(self.target_dir / ".conversion_state.json",
+                                                        log=self._post_log)
         
         self.is_converting = True
         self.should_stop = False
         self.convert_btn.configure(state="disabled")
         self.stop_btn.configure(state="normal")
         self.scan_btn.configure(state="disabled")
+        # 转换期间按索引访问文件列表，不允许清空
+        self.clear_btn.configure(state="disabled")
         
         self._update_status("🔄 正在转换...")
         self._log("开始转换（深度提取：文本+图片+图表）...", "INFO")
         
-        thread = threading.Thread(target=self._conversion_thread, daemon=True)
-        thread.start()
+        self._run_async(self._conversion_task())
     
-    def _conversion_thread(self):
-        """转换线程"""
+    def _get_output_location(self, file_item: FileItem) -> Tuple[Path, str]:
+        """获取输出目录和图片子目录名"""
+        if self.output_mode == "inplace":
+            # 就地输出模式：输出到源文件所在目录
+            return file_item.pdf_path.parent, f"{file_item.pdf_path.stem}_images"
+        # 集中输出模式：输出到目标目录
+        return self.target_dir, "images"
+    
+    def _collect_pending(self) -> List[int]:
+        """在主进程中完成跳过判断，返回真正需要转换的文件索引"""
+        pending = []
         for idx, file_item in enumerate(self.file_items):
-            if self.should_stop:
-                self.after(0, lambda: self._update_status("⏹️ 转换已停止"))
-                self.after(0, lambda: self._log("用户停止转换", "WARNING"))
-                break
-            
             if file_item.status in [ConvertStatus.COMPLETED, ConvertStatus.SKIPPED]:
                 # 覆盖模式下重置状态
                 if self.overwrite_mode:
-                    file_item.status = ConvertStatus.PENDING
+                    self._set_status(file_item, ConvertStatus.PENDING)
                     file_item.progress = 0
                 else:
                     continue
@@ -1001,163 +1617,128 @@ https://github.com/UB-Mannheim/tesseract/wiki
             file_hash = file_item.get_hash()
             # 覆盖模式下不跳过已转换文件
             if not self.overwrite_mode and self.conversion_state and self.conversion_state.is_converted(file_hash):
-                file_item.status = ConvertStatus.SKIPPED
+                self._set_status(file_item, ConvertStatus.SKIPPED)
                 file_item.progress = 100
-                self.after(0, lambda i=idx, f=file_item: self._update_file_row(i, f))
-                self.after(0, self._update_stats)
-                self.after(0, self._update_result_counts)
-                self.after(0, lambda name=file_item.pdf_name: self._log(f"跳过已转换: {name}", "INFO"))
+                self._post_row(idx, file_item)
+                self._post_log(f"跳过已转换: {file_item.pdf_name}", "INFO")
                 continue
             
-            file_item.status = ConvertStatus.CONVERTING
-            file_item.progress = 10
-            self.after(0, lambda i=idx, f=file_item: self._update_file_row(i, f))
-            self.after(0, lambda name=file_item.pdf_name: self._log(f"开始转换: {name}", "INFO"))
-            
-            try:
-                images_count = self._convert_single_file(file_item, idx)
-                file_item.status = ConvertStatus.COMPLETED
-                file_item.progress = 100
-                file_item.images_count = images_count
-                
-                if self.conversion_state:
-                    self.conversion_state.mark_converted(file_hash, str(self.target_dir / file_item.md_name))
-                
-                self.after(0, lambda name=file_item.pdf_name, md=file_item.md_name, imgs=images_count:
-                          self._log(f"转换成功: {name} → {md} ({imgs}张图片)", "SUCCESS"))
-            except Exception as e:
-                file_item.status = ConvertStatus.ERROR
-                file_item.error_msg = str(e)
-                self.after(0, lambda name=file_item.pdf_name, err=str(e): self._log(f"转换失败: {name} - {err}", "ERROR"))
-                self.should_stop = True
-                self.after(0, lambda msg=str(e), name=file_item.pdf_name:
-                          messagebox.showerror("转换错误", f"文件: {name}\n错误: {msg}"))
-            
-            self.after(0, lambda i=idx, f=file_item: self._update_file_row(i, f))
-            self.after(0, self._update_stats)
-            self.after(0, self._update_result_counts)
-        
-        self.is_converting = False
-        self.after(0, self._conversion_finished)
+            pending.append(idx)
+        return pending
     
-    def _convert_single_file(self, file_item: FileItem, idx: int) -> int:
-        """转换单个文件，返回图片数量"""
-        file_item.progress = 20
-        self.after(0, lambda i=idx, f=file_item: self._update_file_row(i, f))
-        
-        # 确定输出目录和图片目录
-        if self.output_mode == "inplace":
-            # 就地输出模式：输出到源文件所在目录
-            output_dir = file_item.pdf_path.parent
-            images_dir = output_dir / f"{file_item.pdf_path.stem}_images"
-        else:
-            # 集中输出模式：输出到目标目录
-            output_dir = self.target_dir
-            images_dir = self.target_dir / "images"
-        
-        # 检查输出目录是否可写
+    async def _conversion_task(self):
+        """转换协程：无论转换是否出错，结束时都恢复界面状态"""
         try:
-            images_dir.mkdir(parents=True, exist_ok=True)
-            # 测试写入权限
-            test_file = images_dir / ".test_write"
-            test_file.write_text("test")
-            test_file.unlink()
-        except (OSError, PermissionError) as e:
-            raise Exception(f"输出目录不可写：{output_dir}。请检查目录权限或选择其他目录。")
-        
-        # 根据文件类型选择处理方式
-        file_type = file_item.file_type.lower()
-        
-        if file_type == "pdf":
-            # PDF处理 - 根据OCR设置选择提取方法
-            if self.enable_ocr and HAS_OCR_SUPPORT and is_ocr_available():
-                # 使用带OCR的提取方法
-                def ocr_progress(msg, current, total):
-                    if total > 0:
-                        file_item.progress = 20 + int(40 * current / total)
-                        self.after(0, lambda i=idx, f=file_item: self._update_file_row(i, f))
+            await self._convert_pending()
+        except Exception as e:
+            self._post_log(f"转换中断: {e}", "ERROR")
+        finally:
+            self.is_converting = False
+            self._post_call(self._conversion_finished)
+    
+    async def _convert_pending(self):
+        """在后台事件循环中调度进程池并行转换"""
+        loop = asyncio.get_running_loop()
+        self._stop_event = asyncio.Event()
+        if self.should_stop:
+            self._stop_event.set()
+        
+        pending = self._collect_pending()
+        
+        # 转换选项在进程启动时传给子进程一次，之后每个任务只传文件信息
+        worker_options = {
+            "extract_images": self.extract_images,
+            "image_dpi": self.image_dpi,
+            "overwrite": self.overwrite_mode,
+            "enable_ocr": self.enable_ocr,
+            # 同一批次的文件共用一个转换时间
+            "conversion_time": datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        }
+        # 同时运行的任务数不超过进程数，便于及时响应停止
+        semaphore = asyncio.Semaphore(self.max_workers)
+        
+        async def convert_item(idx: int):
+            async with semaphore:
+                if self._stop_event.is_set():
+                    return
+                file_item = self.file_items[idx]
+                self._set_status(file_item, ConvertStatus.CONVERTING)
+                file_item.progress = 10
+                self._post_row(idx, file_item)
+                self._post_log(f"开始转换: {file_item.pdf_name}", "INFO")
                 
-                pdf_content = extract_pdf_content_with_ocr(
-                    pdf_path=file_item.pdf_path,
-                    output_dir=images_dir.parent,
-                    images_subdir=images_dir.name,
-                    extract_images=self.extract_images,
-                    image_dpi=self.image_dpi,
-                    enable_ocr=True,
-                    ocr_lang="chi_sim+eng",
-                    progress_callback=ocr_progress
-                )
-            else:
-                # 普通提取方法
-                pdf_content = extract_pdf_content(
-                    pdf_path=file_item.pdf_path,
-                    output_dir=images_dir.parent,
-                    images_subdir=images_dir.name,
-                    extract_images=self.extract_images,
-                    image_dpi=self.image_dpi
-                )
-            
-            file_item.progress = 60
-            self.after(0, lambda i=idx, f=file_item: self._update_file_row(i, f))
-            
-            # 转换为Markdown
-            if self.output_mode == "inplace":
-                images_subdir = f"{file_item.pdf_path.stem}_images"
-            else:
-                images_subdir = "images"
+                output_dir, images_subdir = self._get_output_location(file_item)
+                try:
+                    result = await loop.run_in_executor(
+                        executor, _worker_convert,
+                        file_item.pdf_path, file_item.file_type, file_item.md_name,
+                        output_dir, images_subdir
+                    )
+                except Exception as e:
+                    result = (None, 0, str(e))
+                self._handle_result(idx, *result)
+        
+        # 统一使用spawn启动子进程：本进程有Tk和事件循环等多个线程，fork可能继承被占用的锁导致子进程死锁
+        with concurrent.futures.ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(worker_options,)
+        ) as executor:
+            await asyncio.gather(*(convert_item(idx) for idx in pending))
+        
+        if self._stop_event.is_set():
+            self._post_call(self._update_status, "⏹️ 转换已停止")
+            self._post_log("用户停止转换", "WARNING")
+        
+        if self.conversion_state:
+            self.conversion_state.flush(force=True)
+    
+    def _handle_result(self, idx: int, md_path: Optional[str], images_count: int, error: Optional[str]):
+        """处理单个文件的转换结果（在事件循环线程中执行）"""
+        file_item = self.file_items[idx]
+        if error is None:
+            self._set_status(file_item, ConvertStatus.COMPLETED)
+            file_item.progress = 100
+            self._add_images(images_count - file_item.images_count)
+            file_item.images_count = images_count
+            file_item.md_name = Path(md_path).name
             
-            markdown = convert_to_markdown(pdf_content, file_item.pdf_path, images_subdir)
-            total_images = pdf_content.total_images
+            # 状态文件只在主进程中写入，避免多进程争用
+            if self.conversion_state:
+                self.conversion_state.mark_converted(file_item.get_hash(), md_path)
+                self.conversion_state.flush()
             
+            self._post_log(f"转换成功: {file_item.pdf_name} → {file_item.md_name} ({images_count}张图片)", "SUCCESS")
         else:
-            # Office文档处理
-            if not HAS_OFFICE_SUPPORT:
-                raise Exception("未安装Office文档支持库，请运行: pip install python-docx python-pptx openpyxl")
-            
-            if self.output_mode == "inplace":
-                images_subdir = f"{file_item.pdf_path.stem}_images"
-            else:
-                images_subdir = "images"
-            
-            office_content = extract_office_content(
-                file_path=file_item.pdf_path,
-                output_dir=images_dir.parent,
-                images_subdir=images_subdir,
-                extract_images=self.extract_images
-            )
-            
-            file_item.progress = 60
-            self.after(0, lambda i=idx, f=file_item: self._update_file_row(i, f))
-            
-            markdown = office_content_to_markdown(office_content, file_item.pdf_path, images_subdir)
-            total_images = office_content.total_images
-        
-        file_item.progress = 80
-        self.after(0, lambda i=idx, f=file_item: self._update_file_row(i, f))
-        
-        # 保存文件（覆盖模式直接覆盖）
-        output_path = output_dir / file_item.md_name
-        if not self.overwrite_mode:
-            counter = 1
-            base_name = file_item.pdf_path.stem
-            while output_path.exists():
-                file_item.md_name = f"{base_name}_{counter}.md"
-                output_path = output_dir / file_item.md_name
-                counter += 1
+            self._set_status(file_item, ConvertStatus.ERROR)
+            file_item.error_msg = error
+            self._post_log(f"转换失败: {file_item.pdf_name} - {error}", "ERROR")
+            self.should_stop = True
+            self._stop_event.set()
+            self._post_call(messagebox.showerror, "转换错误", f"文件: {file_item.pdf_name}\n错误: {error}")
         
-        output_path.write_text(markdown, encoding='utf-8')
-        return total_images
+        self._post_row(idx, file_item)
+    
+    async def _scan_task(self):
+        """扫描协程：目录遍历为阻塞I/O，放到线程池执行"""
+        await asyncio.get_running_loop().run_in_executor(None, self._scan_thread)
+    
+    def _run_async(self, coro):
+        """在后台事件循环中执行协程"""
+        return asyncio.run_coroutine_threadsafe(coro, self._loop)
     
     def _conversion_finished(self):
         """转换完成"""
         self.convert_btn.configure(state="normal")
         self.stop_btn.configure(state="disabled")
         self.scan_btn.configure(state="normal")
+        self.clear_btn.configure(state="normal")
         
-        errors = sum(1 for f in self.file_items if f.status == ConvertStatus.ERROR)
-        completed = sum(1 for f in self.file_items if f.status == ConvertStatus.COMPLETED)
-        skipped = sum(1 for f in self.file_items if f.status == ConvertStatus.SKIPPED)
-        total_images = sum(f.images_count for f in self.file_items)
+        errors = self._counts[ConvertStatus.ERROR]
+        completed = self._counts[ConvertStatus.COMPLETED]
+        skipped = self._counts[ConvertStatus.SKIPPED]
+        total_images = self._total_images
         
         if errors > 0:
             self._update_status(f"⚠️ 转换完成，{errors} 个文件出错")
@@ -1170,19 +1751,19 @@ https://github.com/UB-Mannheim/tesseract/wiki
     def _stop_conversion(self):
         """停止转换"""
         self.should_stop = True
+        if self._stop_event is not None:
+            self._loop.call_soon_threadsafe(self._stop_event.set)
         self._update_status("⏳ 正在停止...")
         self._log("正在停止转换...", "WARNING")
     
     def _clear_list(self):
         """清空列表"""
-        for row in self.pdf_rows:
-            row['frame'].destroy()
-        for row in self.md_rows:
-            row['frame'].destroy()
-        
-        self.pdf_rows.clear()
-        self.md_rows.clear()
         self.file_items.clear()
+        self._pending_rows.clear()
+        self._row_count = 0
+        self._list_offset = 0
+        self._refresh_list()
+        self._recount()
         
         self._update_stats()
         self._update_result_counts()
@@ -1196,6 +1777,11 @@ https://github.com/UB-Mannheim/tesseract/wiki
             if not messagebox.askyesno("确认", "转换正在进行中，确定要退出吗？"):
                 return
             self.should_stop = True
+            if self._stop_event is not None:
+                self._loop.call_soon_threadsafe(self._stop_event.set)
+        
+        if self.conversion_state:
+            self.conversion_state.flush(force=True)
         
         remove_lock_file()
         self.destroy()
@@ -1235,4 +1821,6 @@ def main():
 
 
 if __name__ == "__main__":
+    # 打包为exe后，进程池子进程需要此调用
+    multiprocessing.freeze_support()
     main()
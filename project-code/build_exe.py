@@ -27,9 +27,22 @@ def clean_build():
                 path.unlink()
     print("✅ 清理完成")
 
+def report_pillow_build():
+    """显示打包使用的Pillow版本（Pillow-SIMD 的版本号带 .postN 后缀）"""
+    try:
+        import PIL
+    except ImportError:
+        print("⚠️ 未安装Pillow，OCR功能将不可用")
+        return
+    if ".post" in PIL.__version__:
+        print(f"🖼️ 图像库: Pillow-SIMD {PIL.__version__}")
+    else:
+        print(f"🖼️ 图像库: Pillow {PIL.__version__}（可改用 pillow-simd 加速OCR图像处理）")
+
 def build_exe():
     """构建EXE"""
     print(f"🔧 正在构建 {APP_NAME} v{APP_VERSION}...")
+    report_pillow_build()
     
     # PyInstaller参数
     cmd = [
@@ -46,10 +59,8 @@ def build_exe():
         "--add-data", "ocr_engine;ocr_engine",
         # 隐藏导入（只包含必要的）
         "--hidden-import", "customtkinter",
-        "--hidden-import", "PIL",
+        "--hidden-import", "PIL",  # Pillow 与 Pillow-SIMD 的模块名均为 PIL
         "--hidden-import", "fitz",
-        "--hidden-import", "pdfplumber",
-        "--hidden-import", "pdfminer",
         # Office文档支持
         "--hidden-import", "docx",
         "--hidden-import", "pptx",
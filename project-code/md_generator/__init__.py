@@ -2,7 +2,7 @@
 📝 Markdown生成模块
 """
 
-from .converter import convert_to_markdown
+from .converter import convert_to_markdown, convert_to_markdown_stream
 from .formatter import format_markdown
 
-__all__ = ["convert_to_markdown", "format_markdown"]
+__all__ = ["convert_to_markdown", "convert_to_markdown_stream", "format_markdown"]
@@ -7,19 +7,33 @@
 - 复杂页面图片嵌入
 """
 
+import re
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Iterator
 from datetime import datetime
-from urllib.parse import quote# 导入PDF解析结果类型
+from urllib.parse import quote
+
+# 导入PDF解析结果类型
 import sys
 sys.path.insert(0, str(Path(__file__).parent.parent))
 from pdf_parser.extractor import PDFContent, PageContent, ExtractedImage
 
 
+# 预编译正则
+_RE_SUP = re.compile(r'\^(\d+|\{[^}]+\})')  # 上标
+_RE_SUB = re.compile(r'_(\d+|\{[^}]+\})')    # 下标
+_RE_NUM = re.compile(r'^\d+[\.\)]\s*')        # 行首编号
+_RE_NEEDS_QUOTE = re.compile(r'[^A-Za-z0-9_.~/-]')  # quote() 会转义的字符
+
+# 原有列表符号（均为单字符）
+_BULLETS = frozenset("•·-*●○■□")
+
+
 def convert_to_markdown(
     pdf_content: PDFContent,
     pdf_path: Path,
-    images_subdir: str = "images"
+    images_subdir: str = "images",
+    conversion_time: Optional[str] = None
 ) -> str:
     """
     将PDF内容转换为Markdown
@@ -28,47 +42,66 @@ def convert_to_markdown(
         pdf_content: 提取的PDF内容
         pdf_path: 原始PDF路径
         images_subdir: 图片子目录名
+        conversion_time: 转换时间文本（批量转换时共用，默认取当前时间）
     
     Returns:
         Markdown文本
     """
-    lines = []
+    return "".join(convert_to_markdown_stream(pdf_content, pdf_path, images_subdir, conversion_time))
+
+
+def convert_to_markdown_stream(
+    pdf_content: PDFContent,
+    pdf_path: Path,
+    images_subdir: str = "images",
+    conversion_time: Optional[str] = None
+) -> Iterator[str]:
+    """
+    将PDF内容逐段转换为Markdown（文档头 + 逐页内容），适合直接写入文件
+    
+    Args:
+        pdf_content: 提取的PDF内容
+        pdf_path: 原始PDF路径
+        images_subdir: 图片子目录名
+        conversion_time: 转换时间文本（批量转换时共用，默认取当前时间）
+    
+    Yields:
+        Markdown文本片段，按顺序拼接即为完整文档
+    """
+    meta = pdf_content.metadata
     
-    # 文档头
-    title = pdf_content.metadata.get("title") or pdf_path.stem
-    lines.append(f"# {title}")
-    lines.append("")
-    
-    # 元信息（包含源文件追溯信息）
-    lines.append("> **源文件名**: " + pdf_path.name)
-    lines.append(f"> **源文件绝对路径**: `{pdf_path.absolute()}`")
-    if pdf_content.metadata.get("author"):
-        lines.append(f"> **作者**: {pdf_content.metadata['author']}")
-    if pdf_content.metadata.get("title"):
-        lines.append(f"> **PDF标题**: {pdf_content.metadata['title']}")
-    if pdf_content.metadata.get("subject"):
-        lines.append(f"> **主题**: {pdf_content.metadata['subject']}")
-    if pdf_content.metadata.get("creator"):
-        lines.append(f"> **创建程序**: {pdf_content.metadata['creator']}")
-    lines.append(f"> **页数**: {pdf_content.metadata.get('page_count', len(pdf_content.pages))}")
+    # 文档头（路径和文件大小各只查询一次）
+    title = meta.get("title") or pdf_path.stem
+    abs_path = pdf_path.absolute()
     try:
-        file_size = pdf_path.stat().st_size / 1024
-        lines.append(f"> **文件大小**: {file_size:.1f} KB")
-    except (OSError, FileNotFoundError):
-        pass  # 文件不存在时跳过
-    lines.append(f"> **转换时间**: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-    if pdf_content.total_images > 0:
-        lines.append(f"> **提取图片**: {pdf_content.total_images} 张")
-    lines.append("")
-    lines.append("---")
-    lines.append("")
+        size_kb = pdf_path.stat().st_size / 1024
+        size_line = f"> **文件大小**: {size_kb:.1f} KB\n"
+    except OSError:
+        size_line = ""  # 文件不存在时跳过
+    
+    # 元信息（包含源文件追溯信息），一次性拼接
+    header = (
+        f"# {title}\n"
+        f"\n"
+        f"> **源文件名**: {pdf_path.name}\n"
+        f"> **源文件绝对路径**: `{abs_path}`\n"
+        + (f"> **作者**: {meta['author']}\n" if meta.get("author") else "")
+        + (f"> **PDF标题**: {meta['title']}\n" if meta.get("title") else "")
+        + (f"> **主题**: {meta['subject']}\n" if meta.get("subject") else "")
+        + (f"> **创建程序**: {meta['creator']}\n" if meta.get("creator") else "")
+        + f"> **页数**: {meta.get('page_count', len(pdf_content.pages))}\n"
+        + size_line
+        + f"> **转换时间**: {conversion_time or datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n"
+        + (f"> **提取图片**: {pdf_content.total_images} 张\n" if pdf_content.total_images > 0 else "")
+        + "\n---\n"
+    )
+    
+    yield header
     
     # 逐页转换
     for page in pdf_content.pages:
-        page_md = _convert_page(page, pdf_path.stem, images_subdir)
-        lines.append(page_md)
-    
-    return "\n".join(lines)
+        yield "\n"
+        yield _convert_page(page, pdf_path.stem, images_subdir)
 
 
 def _convert_page(
@@ -77,39 +110,38 @@ def _convert_page(
     images_subdir: str
 ) -> str:
     """转换单页内容"""
-    lines = []
+    # 每个片段自带结尾空行，最后统一去掉末尾多余的换行
+    parts = []
     
     # 如果有整页渲染图片（复杂图表页面）
     if page.page_image:
-        lines.append(f"<!-- 页面 {page.page_num} 包含复杂图形，已渲染为图片 -->")
-        lines.append(f"![页面 {page.page_num}]({images_subdir}/{page.page_image})")
-        lines.append("")
+        parts.append(
+            f"<!-- 页面 {page.page_num} 包含复杂图形，已渲染为图片 -->\n"
+            f"![页面 {page.page_num}]({images_subdir}/{page.page_image})\n\n"
+        )
     
     # 转换文本块
     for block in page.text_blocks:
         block_md = _convert_text_block(block)
         if block_md:
-            lines.append(block_md)
-            lines.append("")
+            parts.append(f"{block_md}\n\n")
     
     # 插入提取的图片
     if page.images and not page.page_image:
         for img in page.images:
             img_filename = img.get_filename(base_name)
-            # URL编码图片文件名，处理中文和特殊字符
-            encoded_filename = quote(img_filename)
+            # URL编码图片文件名，处理中文和特殊字符（纯安全字符时无需编码）
+            encoded_filename = quote(img_filename) if _RE_NEEDS_QUOTE.search(img_filename) else img_filename
             alt_text = f"图片 {img.page_num}-{img.image_index}"
             if img.width and img.height:
                 alt_text += f" ({img.width}x{img.height})"
-            lines.append(f"![{alt_text}]({images_subdir}/{encoded_filename})")
-            lines.append("")
+            parts.append(f"![{alt_text}]({images_subdir}/{encoded_filename})\n\n")
     
     # 页面分隔
     if page.page_num < 100:  # 避免太多分隔线
-        lines.append(f"<!-- 第 {page.page_num} 页结束 -->")
-        lines.append("")
+        parts.append(f"<!-- 第 {page.page_num} 页结束 -->\n\n")
     
-    return "\n".join(lines)
+    return "".join(parts)[:-1]
 
 
 def _convert_text_block(block: Dict[str, Any]) -> str:
@@ -145,6 +177,8 @@ def _convert_code_block(content: str) -> str:
 
 def _convert_blockquote(content: str) -> str:
     """转换引用块"""
+    if "\n" not in content:
+        return f"> {content.lstrip('>》「『 ')}"
     lines = content.split("\n")
     quoted_lines = []
     for line in lines:
@@ -156,23 +190,19 @@ def _convert_blockquote(content: str) -> str:
 
 def _convert_paragraph(content: str) -> str:
     """转换段落，检测数学公式"""
-    import re
-    
     # 检测行内数学公式（简单启发式）
     # 例如：x^2, E=mc^2, ∑, ∫, α, β 等
-    math_patterns = [
-        (r'\^(\d+|\{[^}]+\})', r'$^{\1}$'),  # 上标
-        (r'_(\d+|\{[^}]+\})', r'$_{\1}$'),   # 下标
-    ]
-    
-    for pattern, replacement in math_patterns:
-        content = re.sub(pattern, replacement, content)
-    
+    content = _RE_SUP.sub(r'$^{\1}$', content)
+    content = _RE_SUB.sub(r'$_{\1}$', content)
     return content
 
 
 def _clean_content(content: str) -> str:
     """清理文本内容"""
+    # 单行内容只需去掉行尾空白
+    if "\n" not in content:
+        return content.rstrip()
+    
     # 移除多余空行
     lines = content.split("\n")
     cleaned_lines = []
@@ -209,11 +239,9 @@ def _convert_list_items(content: str) -> str:
         if not line:
             continue
         
-        # 移除原有的列表符号
-        for prefix in ["•", "·", "-", "*", "●", "○", "■", "□"]:
-            if line.startswith(prefix):
-                line = line[len(prefix):].strip()
-                break
+        # 移除原有的列表符号（只去掉一个）
+        if line[0] in _BULLETS:
+            line = line[1:].lstrip()
         
         result.append(f"- {line}")
     
@@ -232,8 +260,7 @@ def _convert_numbered_list(content: str) -> str:
             continue
         
         # 移除原有的编号
-        import re
-        line = re.sub(r'^\d+[\.\)]\s*', '', line)
+        line = _RE_NUM.sub('', line)
         
         result.append(f"{counter}. {line}")
         counter += 1
@@ -5,6 +5,13 @@
 import re
 
 
+# 预编译正则
+_RE_BLANK = re.compile(r'\n{3,}')
+_RE_TRAIL = re.compile(r'[ \t]+$', re.MULTILINE)
+_RE_HEAD = re.compile(r'^(#+)([^\s#])', re.MULTILINE)
+_RE_LIST = re.compile(r'^(\s*[-*+])([^\s])', re.MULTILINE)
+
+
 def format_markdown(text: str) -> str:
     """格式化Markdown文本"""
     text = _normalize_whitespace(text)
@@ -15,18 +22,18 @@ def format_markdown(text: str) -> str:
 
 def _normalize_whitespace(text: str) -> str:
     """规范化空白字符"""
-    text = re.sub(r'\n{3,}', '\n\n', text)
-    text = re.sub(r'[ \t]+$', '', text, flags=re.MULTILINE)
+    text = _RE_BLANK.sub('\n\n', text)
+    text = _RE_TRAIL.sub('', text)
     return text
 
 
 def _fix_headings(text: str) -> str:
     """修复标题格式"""
-    text = re.sub(r'^(#+)([^\s#])', r'\1 \2', text, flags=re.MULTILINE)
+    text = _RE_HEAD.sub(r'\1 \2', text)
     return text
 
 
 def _fix_lists(text: str) -> str:
     """修复列表格式"""
-    text = re.sub(r'^(\s*[-*+])([^\s])', r'\1 \2', text, flags=re.MULTILINE)
+    text = _RE_LIST.sub(r'\1 \2', text)
     return text
@@ -17,17 +17,22 @@
 
 import os
 import io
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
 from typing import Optional, List, Dict, Any, Tuple
 from dataclasses import dataclass
 
 # 尝试导入依赖
 try:
+    import PIL
     from PIL import Image
     HAS_PIL = True
+    PIL_VERSION = PIL.__version__
 except ImportError:
     HAS_PIL = False
     Image = None
+    PIL_VERSION = ""
 
 try:
     import pytesseract
@@ -44,6 +49,25 @@ except ImportError:
     fitz = None
 
 
+# 小于此像素数的图片不做OCR（图标、缩略图等）
+MIN_OCR_PIXELS = 10_000
+# 灰度最大值与最小值之差低于此值视为空白图片
+MIN_OCR_CONTRAST = 20
+
+# 像素格式: Pixmap 通道数 -> PIL 模式
+_PIX_MODES = {1: "L", 3: "RGB", 4: "RGBA"}
+
+# 每个进程至少分到的页数；页数更少时串行识别（进程启动和导入OCR库的开销更大）
+OCR_PAGES_PER_WORKER = 4
+# 并行识别页面的最大进程数
+OCR_MAX_WORKERS = min(4, os.cpu_count() or 1)
+
+
+def _pixmap_to_image(pix: "fitz.Pixmap") -> "Image.Image":
+    """直接用 Pixmap 原始像素构建 PIL Image，省去 PNG 编码/解码"""
+    return Image.frombytes(_PIX_MODES.get(pix.n, "RGB"), (pix.width, pix.height), pix.samples)
+
+
 # OCR 可用性检查
 def is_ocr_available() -> bool:
     """检查 OCR 功能是否可用"""
@@ -87,6 +111,44 @@ class OCRResult:
         return len(self.text.strip()) > 0 and self.confidence > 30
 
 
+def _text_from_data(data: Dict[str, List[Any]]) -> str:
+    """
+    由 image_to_data 的结果重建文本
+    
+    同一行的词以空格连接，行之间换行，段落（块）之间空一行，
+    与 image_to_string 的版面保持一致
+    """
+    paragraphs = []
+    lines = []
+    words = []
+    line_key = para_key = None
+    
+    for i, word in enumerate(data['text']):
+        if not word or not word.strip():
+            continue
+        
+        block = data['block_num'][i]
+        new_para = (block, data['par_num'][i])
+        new_line = new_para + (data['line_num'][i],)
+        
+        if new_line != line_key and words:
+            lines.append(" ".join(words))
+            words = []
+        if new_para != para_key and lines:
+            paragraphs.append("\n".join(lines))
+            lines = []
+        
+        words.append(word.strip())
+        line_key, para_key = new_line, new_para
+    
+    if words:
+        lines.append(" ".join(words))
+    if lines:
+        paragraphs.append("\n".join(lines))
+    
+    return "\n\n".join(paragraphs)
+
+
 def ocr_image(
     image: "Image.Image",
     lang: str = "chi_sim+eng",
@@ -109,6 +171,15 @@ def ocr_image(
     if image is None:
         return OCRResult(text="")
     
+    # 过小或近乎纯色的图片不可能有可识别文字，跳过Tesseract
+    width, height = image.size
+    if width * height < MIN_OCR_PIXELS:
+        return OCRResult(text="", language=lang)
+    gray = image if image.mode == "L" else image.convert("L")
+    low, high = gray.getextrema()
+    if high - low < MIN_OCR_CONTRAST:
+        return OCRResult(text="", language=lang)
+    
     try:
         # 获取详细数据用于计算置信度
         data = pytesseract.image_to_data(
@@ -122,11 +193,11 @@ def ocr_image(
         confidences = [int(c) for c in data['conf'] if int(c) > 0]
         avg_confidence = sum(confidences) / len(confidences) if confidences else 0
         
-        # 提取文本
-        text = pytesseract.image_to_string(image, lang=lang, config=config)
+        # 从同一份数据重建文本，避免再调用一次 image_to_string
+        text = _text_from_data(data)
         
         return OCRResult(
-            text=text.strip(),
+            text=text,
             confidence=avg_confidence,
             language=lang
         )
@@ -160,6 +231,60 @@ def ocr_image_bytes(
         return OCRResult(text=f"[图片解析错误: {str(e)}]")
 
 
+class PdfOcrSession:
+    """
+    在整个文件处理期间保持PDF打开的OCR会话
+    
+    逐页调用 ocr_page 时只解析一次文档结构，避免每页重新打开PDF。
+    
+    用法:
+        with PdfOcrSession(pdf_path) as session:
+            result = session.ocr_page(0)
+    
+    调用方已打开文档时通过 doc 传入，会话直接使用该文档，关闭会话时不关闭它
+    """
+    
+    def __init__(self, pdf_path: Path, doc: Optional["fitz.Document"] = None):
+        self.pdf_path = Path(pdf_path)
+        self.doc = doc
+        self._owns_doc = doc is None
+    
+    def open(self) -> "PdfOcrSession":
+        """打开PDF文档"""
+        if self.doc is None:
+            self.doc = fitz.open(str(self.pdf_path))
+        return self
+    
+    def close(self):
+        """关闭PDF文档（外部传入的文档由调用方关闭）"""
+        if self.doc is not None:
+            if self._owns_doc:
+                self.doc.close()
+            self.doc = None
+            self._owns_doc = True  # 再次 open() 时按路径打开的文档归会话所有
+    
+    def __enter__(self) -> "PdfOcrSession":
+        return self.open()
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+    
+    def ocr_page(
+        self,
+        page_num: int,
+        lang: str = "chi_sim+eng",
+        dpi: int = 300
+    ) -> OCRResult:
+        """识别指定页面（页码从0开始）"""
+        if page_num >= len(self.doc):
+            return OCRResult(text="[页码超出范围]", page_num=page_num)
+        
+        try:
+            return _ocr_doc_page(self.doc, page_num, lang, dpi)
+        except Exception as e:
+            return OCRResult(text=f"[PDF处理错误: {str(e)}]", page_num=page_num)
+
+
 def ocr_pdf_page(
     pdf_path: Path,
     page_num: int,
@@ -185,49 +310,79 @@ def ocr_pdf_page(
         return OCRResult(text="[OCR不可用]", page_num=page_num)
     
     try:
-        doc = fitz.open(str(pdf_path))
-        if page_num >= len(doc):
-            doc.close()
-            return OCRResult(text="[页码超出范围]", page_num=page_num)
-        
-        page = doc[page_num]
-        
-        # 渲染页面为图片
-        mat = fitz.Matrix(dpi / 72, dpi / 72)
-        pix = page.get_pixmap(matrix=mat)
-        
-        # 转换为PIL Image
-        img_data = pix.tobytes("png")
-        image = Image.open(io.BytesIO(img_data))
-        
-        doc.close()
-        
-        # OCR识别
-        result = ocr_image(image, lang)
-        result.page_num = page_num
-        return result
-        
+        with PdfOcrSession(pdf_path) as session:
+            return session.ocr_page(page_num, lang, dpi)
     except Exception as e:
         return OCRResult(text=f"[PDF处理错误: {str(e)}]", page_num=page_num)
 
 
+# 子进程内缓存的OCR会话（每个进程只打开一次PDF）
+_worker_session = None
+
+
+def _init_ocr_worker(pdf_path: str):
+    """OCR子进程初始化：预先打开PDF文档"""
+    global _worker_session
+    # 多进程并行时每个Tesseract只用一个线程，避免总线程数超过CPU核心数
+    os.environ.setdefault("OMP_THREAD_LIMIT", "1")
+    _worker_session = PdfOcrSession(pdf_path).open()
+
+
+def _ocr_worker_count(page_count: int, max_workers: Optional[int]) -> int:
+    """决定并行识别页面的进程数（1 表示串行）"""
+    if max_workers is None:
+        # 已在子进程中（如批量转换的进程池按文件并行）时不再嵌套进程池
+        if multiprocessing.parent_process() is not None:
+            return 1
+        max_workers = OCR_MAX_WORKERS
+    return max(1, min(max_workers, page_count // OCR_PAGES_PER_WORKER))
+
+
+def _ocr_one_page(pdf_path: str, page_num: int, lang: str, dpi: int) -> OCRResult:
+    """在子进程中识别单页（顶层函数，可被pickle）"""
+    if _worker_session is None or str(_worker_session.pdf_path) != str(Path(pdf_path)):
+        if _worker_session is not None:
+            _worker_session.close()
+        _init_ocr_worker(pdf_path)
+    return _worker_session.ocr_page(page_num, lang, dpi)
+
+
+def _ocr_doc_page(doc: "fitz.Document", page_num: int, lang: str, dpi: int) -> OCRResult:
+    """渲染已打开文档的指定页并识别"""
+    page = doc[page_num]
+    
+    # 渲染为灰度页面（Tesseract内部本就转灰度，每像素1字节）
+    mat = fitz.Matrix(dpi / 72, dpi / 72)
+    pix = page.get_pixmap(matrix=mat, colorspace=fitz.csGRAY, alpha=False)
+    
+    # 转换并OCR
+    image = _pixmap_to_image(pix)
+    pix = None
+    
+    result = ocr_image(image, lang)
+    result.page_num = page_num
+    return result
+
+
 def ocr_pdf_full(
     pdf_path: Path,
     lang: str = "chi_sim+eng",
     dpi: int = 300,
-    progress_callback: Optional[callable] = None
+    progress_callback: Optional[callable] = None,
+    max_workers: Optional[int] = None
 ) -> List[OCRResult]:
     """
-    对整个PDF进行OCR识别
+    对整个PDF进行OCR识别（页数较多时按页分发到多个进程并行识别）
     
     Args:
         pdf_path: PDF文件路径
         lang: 语言代码
         dpi: 渲染DPI
-        progress_callback: 进度回调函数 callback(current, total)
+        progress_callback: 进度回调函数 callback(已完成页数, total)
+        max_workers: 最大进程数（默认 OCR_MAX_WORKERS；在子进程中默认串行）
     
     Returns:
-        List[OCRResult]: 每页的识别结果
+        List[OCRResult]: 每页的识别结果（按页码排序）
     """
     if not HAS_FITZ:
         return [OCRResult(text="[需要安装PyMuPDF]")]
@@ -235,31 +390,37 @@ def ocr_pdf_full(
     if not is_ocr_available():
         return [OCRResult(text="[OCR不可用: 请安装Tesseract-OCR]")]
     
-    results = []
-    
     try:
-        doc = fitz.open(str(pdf_path))
-        total_pages = len(doc)
-        
-        for page_num in range(total_pages):
-            if progress_callback:
-                progress_callback(page_num + 1, total_pages)
-            
-            page = doc[page_num]
-            
-            # 渲染页面
-            mat = fitz.Matrix(dpi / 72, dpi / 72)
-            pix = page.get_pixmap(matrix=mat)
-            
-            # 转换并OCR
-            img_data = pix.tobytes("png")
-            image = Image.open(io.BytesIO(img_data))
+        pdf_path = str(pdf_path)
+        with PdfOcrSession(pdf_path) as session:
+            total_pages = len(session.doc)
+            workers = _ocr_worker_count(total_pages, max_workers)
             
-            result = ocr_image(image, lang)
-            result.page_num = page_num
-            results.append(result)
+            # 页数较少或单进程时直接在当前会话中识别
+            if workers <= 1:
+                results = []
+                for page_num in range(total_pages):
+                    results.append(session.ocr_page(page_num, lang, dpi))
+                    if progress_callback:
+                        progress_callback(page_num + 1, total_pages)
+                return results
         
-        doc.close()
+        results = []
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_ocr_worker,
+            initargs=(pdf_path,)
+        ) as executor:
+            futures = [
+                executor.submit(_ocr_one_page, pdf_path, page_num, lang, dpi)
+                for page_num in range(total_pages)
+            ]
+            for done, future in enumerate(as_completed(futures), 1):
+                results.append(future.result())
+                if progress_callback:
+                    progress_callback(done, total_pages)
+        
+        results.sort(key=lambda r: r.page_num)
         return results
         
     except Exception as e:
@@ -281,24 +442,43 @@ def is_scanned_pdf(pdf_path: Path, sample_pages: int = 3) -> bool:
         return False
     
     try:
-        doc = fitz.open(str(pdf_path))
-        total_pages = len(doc)
-        
-        # 采样检查
-        check_pages = min(sample_pages, total_pages)
+        with fitz.open(str(pdf_path)) as doc:
+            return is_scanned_doc(doc, sample_pages)
+    except Exception:
+        return False
+
+
+def is_scanned_doc(doc: "fitz.Document", sample_pages: int = 3) -> bool:
+    """
+    检测已打开的PDF文档是否为扫描版（调用方已打开文档时不必再打开一次）
+    
+    Args:
+        doc: 已打开的PDF文档
+        sample_pages: 采样页数
+    
+    Returns:
+        bool: True表示是扫描版PDF
+    """
+    try:
+        # 采样检查：有文字的页数达到一半即不是扫描版
+        check_pages = min(sample_pages, len(doc))
+        need = (check_pages + 1) // 2
         text_found = 0
         
         for i in range(check_pages):
-            page = doc[i]
-            text = page.get_text().strip()
+            # 结论已确定时提前结束，剩余页不再提取文字
+            if text_found >= need:
+                return False
+            if text_found + (check_pages - i) < need:
+                return True
+            
+            text = doc[i].get_text().strip()
             if len(text) > 50:  # 有足够文字
                 text_found += 1
         
-        doc.close()
-        
         # 如果大多数页面没有文字，认为是扫描版
-        return text_found < check_pages * 0.5
-        
+        return text_found < need
+    
     except Exception:
         return False
 
@@ -316,6 +496,7 @@ def get_ocr_status() -> Dict[str, Any]:
         "tesseract_version": "",
         "languages": [],
         "has_chinese": False,
+        "pil_version": PIL_VERSION,  # Pillow-SIMD 的版本号带 .postN 后缀
         "message": ""
     }
     
@@ -349,9 +530,11 @@ __all__ = [
     'OCRResult',
     'ocr_image',
     'ocr_image_bytes',
+    'PdfOcrSession',
     'ocr_pdf_page',
     'ocr_pdf_full',
     'is_scanned_pdf',
+    'is_scanned_doc',
     'get_ocr_status',
     'HAS_TESSERACT',
     'HAS_PIL',
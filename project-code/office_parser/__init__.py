@@ -16,55 +16,119 @@
 """
 
 import os
+import sys
+import posixpath
+import atexit
+import threading
+import multiprocessing
 import io
+import functools
+import contextlib
+import gc
+import hashlib
+import importlib.util
+import pickle
+import re
 import tempfile
+import time
 import shutil
+import struct
+import zipfile
+import zlib
+import xml.etree.ElementTree as ElementTree
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
 from pathlib import Path
-from typing import List, Dict, Any, Optional, Tuple
-from dataclasses import dataclass, field
+from typing import List, Dict, Any, Optional, Tuple, Callable, Iterator, IO
+from dataclasses import dataclass, field, fields
 from datetime import datetime
+from urllib.parse import quote
+
+# Office文档处理库按需导入：模块加载时只用 find_spec 检查是否安装（不执行导入），
+# 第一次解析对应格式时才真正导入（python-pptx/openpyxl 会连带导入 lxml 和大量模式类，开销明显）
+def _module_available(name: str) -> bool:
+    """检查模块是否已安装（不导入模块）"""
+    try:
+        return importlib.util.find_spec(name) is not None
+    except (ImportError, ValueError):
+        return False
+
+
+HAS_DOCX = _module_available("docx")
+HAS_PPTX = _module_available("pptx")
+HAS_OPENPYXL = _module_available("openpyxl")
+HAS_PIL = _module_available("PIL")
+HAS_RTF = _module_available("striprtf")
+
+DocxDocument = None
+DOCX_RT = None
+Presentation = None
+MSO_SHAPE_TYPE = None
+load_workbook = None
+Image = None
+rtf_to_text = None
+
+
+@functools.lru_cache(maxsize=None)
+def _init_docx() -> bool:
+    """延迟导入 python-docx"""
+    global DocxDocument, DOCX_RT
+    try:
+        from docx import Document as _Document
+        from docx.opc.constants import RELATIONSHIP_TYPE as _RT
+    except ImportError:
+        return False
+    DocxDocument, DOCX_RT = _Document, _RT
+    return True
+
+
+@functools.lru_cache(maxsize=None)
+def _init_pptx() -> bool:
+    """延迟导入 python-pptx"""
+    global Presentation, MSO_SHAPE_TYPE
+    try:
+        from pptx import Presentation as _Presentation
+        from pptx.enum.shapes import MSO_SHAPE_TYPE as _MSO_SHAPE_TYPE
+    except ImportError:
+        return False
+    Presentation, MSO_SHAPE_TYPE = _Presentation, _MSO_SHAPE_TYPE
+    return True
+
+
+@functools.lru_cache(maxsize=None)
+def _init_openpyxl() -> bool:
+    """延迟导入 openpyxl"""
+    global load_workbook
+    try:
+        from openpyxl import load_workbook as _load_workbook
+    except ImportError:
+        return False
+    load_workbook = _load_workbook
+    return True
+
+
+@functools.lru_cache(maxsize=None)
+def _init_pil() -> bool:
+    """延迟导入 PIL（仅在文件头无法直接解析图片尺寸时使用）"""
+    global Image
+    try:
+        from PIL import Image as _Image
+    except ImportError:
+        return False
+    Image = _Image
+    return True
+
+
+@functools.lru_cache(maxsize=None)
+def _init_rtf() -> bool:
+    """延迟导入 striprtf"""
+    global rtf_to_text
+    try:
+        from striprtf.striprtf import rtf_to_text as _rtf_to_text
+    except ImportError:
+        return False
+    rtf_to_text = _rtf_to_text
+    return True
 
-# 尝试导入Office文档处理库
-try:
-    from docx import Document as DocxDocument
-    from docx.shared import Inches
-    from docx.oxml.ns import qn
-    HAS_DOCX = True
-except ImportError:
-    HAS_DOCX = False
-    DocxDocument = None
-
-try:
-    from pptx import Presentation
-    from pptx.util import Inches as PptxInches
-    from pptx.enum.shapes import MSO_SHAPE_TYPE
-    HAS_PPTX = True
-except ImportError:
-    HAS_PPTX = False
-    Presentation = None
-    MSO_SHAPE_TYPE = None
-
-try:
-    from openpyxl import load_workbook
-    from openpyxl.drawing.image import Image as OpenpyxlImage
-    HAS_OPENPYXL = True
-except ImportError:
-    HAS_OPENPYXL = False
-    load_workbook = None
-
-try:
-    from PIL import Image
-    HAS_PIL = True
-except ImportError:
-    HAS_PIL = False
-
-# RTF解析
-try:
-    from striprtf.striprtf import rtf_to_text
-    HAS_RTF = True
-except ImportError:
-    HAS_RTF = False
-    rtf_to_text = None
 
 # Windows COM自动化（用于旧格式转换）
 HAS_WIN32COM = False
@@ -87,21 +151,244 @@ def _init_win32com():
         return False
 
 
-@dataclass
+# 暂停垃圾回收的嵌套层数（解析函数可能互相调用或在多个线程中同时运行）
+_gc_pause_depth = 0
+_gc_pause_lock = threading.Lock()
+_gc_was_enabled = False
+
+
+@contextlib.contextmanager
+def _gc_paused():
+    """
+    解析期间暂停循环垃圾回收
+    
+    解析会产生大量存活到最后的文本块字典，分代回收会反复遍历它们；
+    这些对象不构成引用环，暂停回收不会造成泄漏。最外层退出时恢复原状态。
+    """
+    global _gc_pause_depth, _gc_was_enabled
+    with _gc_pause_lock:
+        if _gc_pause_depth == 0:
+            _gc_was_enabled = gc.isenabled()
+            gc.disable()
+        _gc_pause_depth += 1
+    try:
+        yield
+    finally:
+        with _gc_pause_lock:
+            _gc_pause_depth -= 1
+            if _gc_pause_depth == 0 and _gc_was_enabled:
+                gc.enable()
+
+
+def _slotted_dataclass(cls):
+    """
+    生成带 __slots__ 的 dataclass（实例不再附带 __dict__）
+    
+    Python 3.10+ 直接使用 dataclass(slots=True)；3.9 上按相同方式
+    在生成 dataclass 后以 __slots__ 重建类（默认值已保存在 __init__ 中）
+    """
+    if sys.version_info >= (3, 10):
+        return dataclass(slots=True)(cls)
+    cls = dataclass(cls)
+    names = tuple(f.name for f in fields(cls))
+    namespace = {k: v for k, v in cls.__dict__.items()
+                 if k not in names and k not in ("__dict__", "__weakref__")}
+    namespace["__slots__"] = names
+    return type(cls)(cls.__name__, cls.__bases__, namespace)
+
+
+@_slotted_dataclass
 class ExtractedImage:
-    """提取的图片"""
-    image_data: bytes
+    """提取的图片（图片数据直接写入 image_path，不保存在对象中）"""
     image_ext: str
     index: int
     width: int = 0
     height: int = 0
+    image_path: Optional[Path] = None
     
     def get_filename(self, base_name: str) -> str:
         """生成图片文件名"""
         return f"{base_name}_img{self.index}.{self.image_ext}"
 
 
-@dataclass
+# JPEG 帧起始标记（SOF0-SOF15，排除 DHT/JPG/DAC）
+_JPEG_SOF_MARKERS = frozenset(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+
+
+def _sniff_image_ext(data: bytes) -> Optional[str]:
+    """根据文件头魔数判断图片扩展名，无法识别时返回 None"""
+    head = data[:4]
+    if head == b"\x89PNG":
+        return "png"
+    if head[:3] == b"\xff\xd8\xff":
+        return "jpg"
+    if head == b"GIF8":
+        return "gif"
+    if head[:2] == b"BM":
+        return "bmp"
+    if head in (b"II*\x00", b"MM\x00*"):
+        return "tiff"
+    if head == b"RIFF" and data[8:12] == b"WEBP":
+        return "webp"
+    if head == b"\xd7\xcd\xc6\x9a":
+        return "wmf"
+    if head == b"\x01\x00\x00\x00" and data[40:44] == b" EMF":
+        return "emf"
+    return None
+
+
+def _quick_image_size(data: bytes) -> Optional[Tuple[int, int]]:
+    """
+    直接从文件头读取 PNG/GIF/JPEG 的尺寸（不经过 PIL 的格式探测）
+    
+    Returns:
+        (width, height)；无法识别的格式返回 None
+    """
+    if data[:8] == b"\x89PNG\r\n\x1a\n" and data[12:16] == b"IHDR" and len(data) >= 24:
+        return struct.unpack_from(">II", data, 16)
+    if data[:6] in (b"GIF87a", b"GIF89a") and len(data) >= 10:
+        return struct.unpack_from("<HH", data, 6)
+    if data[:2] == b"\xff\xd8":
+        # 逐段跳过 APPn/DQT 等标记段，直到帧起始段
+        i, n = 2, len(data)
+        while i + 9 <= n:
+            if data[i] != 0xFF:
+                return None
+            marker = data[i + 1]
+            if marker == 0xFF:  # 填充字节
+                i += 1
+                continue
+            if marker == 0x01 or 0xD0 <= marker <= 0xD8:  # 无长度的独立标记
+                i += 2
+                continue
+            if marker in _JPEG_SOF_MARKERS:
+                height, width = struct.unpack_from(">HH", data, i + 5)
+                return width, height
+            i += 2 + struct.unpack_from(">H", data, i + 2)[0]
+    return None
+
+
+# 超过此大小的图片直接用文件描述符写入（跳过 BufferedWriter 的额外复制）
+LARGE_IMAGE_SIZE = 1024 * 1024
+
+
+def _write_image_bytes(img_path: Path, data: bytes):
+    """
+    写入图片文件
+    
+    小图片使用普通文件对象；大图片用 os.write 直接写入原始文件描述符，
+    写完后提示系统不必在页缓存中保留（之后不会再读回这些图片）
+    """
+    if len(data) < LARGE_IMAGE_SIZE:
+        with open(img_path, "wb") as f:
+            f.write(data)
+        return
+    
+    fd = os.open(str(img_path), os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, "O_BINARY", 0), 0o644)
+    try:
+        view = memoryview(data)
+        while view:
+            view = view[os.write(fd, view):]
+        if hasattr(os, "posix_fadvise"):
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+    finally:
+        os.close(fd)
+
+
+def _save_image(image_data: bytes, img_path: Path, measure: bool = True) -> Tuple[int, int]:
+    """
+    将图片数据直接写入文件并返回尺寸
+    
+    尺寸只解析图片文件头获得，不解码像素，也不复制图片数据
+    
+    Returns:
+        (width, height): 无法识别或 measure=False 时为 (0, 0)
+    """
+    _write_image_bytes(img_path, image_data)
+    
+    if not measure:
+        return 0, 0
+    size = _quick_image_size(image_data)
+    if size is not None:
+        return size
+    # 其他格式（BMP、TIFF 等）交给 PIL 识别
+    if _init_pil():
+        try:
+            with Image.open(io.BytesIO(image_data)) as img:
+                return img.size
+        except (OSError, ValueError, Image.DecompressionBombError):  # 含 UnidentifiedImageError
+            pass
+    return 0, 0
+
+
+def _copy_zip_member(archive: zipfile.ZipFile, member: str, img_path: Path) -> Tuple[int, int]:
+    """将压缩包中的图片原样分块解压到文件（不经过内存中的完整副本）"""
+    with archive.open(member) as src, open(img_path, "wb") as dst:
+        shutil.copyfileobj(src, dst, 64 * 1024)
+    return 0, 0
+
+
+# 写图片文件时可能出现的错误（磁盘写入失败、压缩包成员缺失或损坏）
+_IMAGE_WRITE_ERRORS = (OSError, EOFError, KeyError, zipfile.BadZipFile, zlib.error)
+
+# 后台写图片文件的线程数
+IMAGE_SAVE_WORKERS = min(4, os.cpu_count() or 1)
+
+
+class _ImageSaver:
+    """
+    在后台线程中写入图片文件
+    
+    文档结构仍按顺序遍历（保证图片编号确定），图片的磁盘写入和尺寸解析
+    与后续遍历并行进行；退出时等待全部写完，移除写入失败的图片，
+    并把 content.total_images 设为实际写出的图片数。
+    流式模式（传入 sink）下图片块已交给 sink 输出，写入失败时只从 images 中移除。
+    """
+    
+    def __init__(self, content: "OfficeContent", measure: bool = True,
+                 sink: Optional[Callable[[Dict[str, Any]], None]] = None):
+        self.content = content
+        self.measure = measure
+        self.sink = sink
+        self._pending = []
+        self._executor = ThreadPoolExecutor(max_workers=IMAGE_SAVE_WORKERS)
+    
+    def submit(self, extracted_img: "ExtractedImage", image_data: bytes, img_path: Path,
+               block: Optional[Dict[str, Any]] = None):
+        """登记图片并提交写入；block 为引用该图片的文本块（写入失败时一并移除）"""
+        self._track(self._executor.submit(_save_image, image_data, img_path, self.measure),
+                    extracted_img, block)
+    
+    def submit_member(self, extracted_img: "ExtractedImage", archive: zipfile.ZipFile,
+                      member: str, img_path: Path):
+        """登记图片并提交从压缩包直接解压到文件"""
+        self._track(self._executor.submit(_copy_zip_member, archive, member, img_path),
+                    extracted_img, None)
+    
+    def _track(self, future, extracted_img: "ExtractedImage", block: Optional[Dict[str, Any]]):
+        self.content.images.append(extracted_img)
+        if block is not None:
+            (self.sink or self.content.text_content.append)(block)
+        self._pending.append((future, extracted_img, block))
+    
+    def __enter__(self) -> "_ImageSaver":
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        for future, extracted_img, block in self._pending:
+            try:
+                extracted_img.width, extracted_img.height = future.result()
+            except _IMAGE_WRITE_ERRORS:
+                self.content.images.remove(extracted_img)
+                if block is not None and self.sink is None:
+                    self.content.text_content.remove(block)
+        self._pending.clear()
+        self._executor.shutdown()
+        # 只统计成功写出的图片（写入失败或无法识别而跳过的不计数）
+        self.content.total_images = len(self.content.images)
+
+
+@_slotted_dataclass
 class OfficeContent:
     """Office文档内容"""
     file_type: str  # docx, pptx, xlsx, doc, ppt, xls
@@ -113,13 +400,55 @@ class OfficeContent:
     total_images: int = 0
     
 
+# Markdown 头部"转换时间"的格式
+_DATETIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+def _format_datetime(value) -> str:
+    """格式化文档属性中的时间（与 str(datetime) 结果一致），为空时返回空字符串"""
+    if not value:
+        return ""
+    if isinstance(value, datetime):
+        return value.isoformat(" ")
+    return str(value)
+
+
 # ========== DOCX 解析 ==========
 
+@functools.lru_cache(maxsize=64)
+def _classify_style(style_name: str) -> str:
+    """根据段落样式名判断块类型（文档通常只用少数几种样式，结果按样式名缓存）"""
+    style_name = style_name.lower()
+    if "heading 1" in style_name or "标题 1" in style_name:
+        return "heading1"
+    if "heading 2" in style_name or "标题 2" in style_name:
+        return "heading2"
+    if "heading 3" in style_name or "标题 3" in style_name:
+        return "heading3"
+    if "list" in style_name or "bullet" in style_name:
+        return "list_item"
+    return "paragraph"
+
+
+# 图片部件内容类型 -> 文件扩展名（文件头无法识别时使用，未列出的类型按 png 保存）
+_DOCX_IMAGE_EXTS = {
+    "image/png": "png",
+    "image/jpeg": "jpg",
+    "image/jpg": "jpg",
+    "image/gif": "gif",
+    "image/tiff": "tiff",
+    "image/bmp": "bmp",
+}
+
+
+@_gc_paused()
 def extract_docx_content(
     file_path: Path,
     output_dir: Path,
     images_subdir: str = "images",
-    extract_images: bool = True
+    extract_images: bool = True,
+    extract_metadata: bool = True,
+    sink: Optional[Callable[[Dict[str, Any]], None]] = None
 ) -> OfficeContent:
     """
     提取DOCX文件内容
@@ -129,383 +458,564 @@ def extract_docx_content(
         output_dir: 输出目录
         images_subdir: 图片子目录名
         extract_images: 是否提取图片
+        extract_metadata: 是否提取文档属性（作者、时间等）
+        sink: 文本块接收函数；传入时块直接交给 sink（流式输出），
+              不再保存到 text_content / tables
     
     Returns:
         OfficeContent: 提取的内容
     """
-    if not HAS_DOCX:
+    if not _init_docx():
         raise ImportError("需要安装 python-docx: pip install python-docx")
     
     content = OfficeContent(file_type="docx")
+    emit = content.text_content.append if sink is None else sink
     doc = DocxDocument(str(file_path))
     
-    # 提取元数据
+    # 提取元数据（属性每次访问都会查找XML元素，只读取一次）
     core_props = doc.core_properties
-    content.metadata = {
-        "title": core_props.title or "",
-        "author": core_props.author or "",
-        "subject": core_props.subject or "",
-        "created": str(core_props.created) if core_props.created else "",
-        "modified": str(core_props.modified) if core_props.modified else "",
-    }
-    content.title = core_props.title or file_path.stem
+    title = core_props.title
+    if extract_metadata:
+        content.metadata = {
+            "title": title or "",
+            "author": core_props.author or "",
+            "subject": core_props.subject or "",
+            "created": _format_datetime(core_props.created),
+            "modified": _format_datetime(core_props.modified),
+        }
+    content.title = title or file_path.stem
     
     # 创建图片目录
     if extract_images:
         images_dir = output_dir / images_subdir
         images_dir.mkdir(parents=True, exist_ok=True)
+    stem = file_path.stem  # 图片文件名前缀（循环中不再重复计算）
     
     image_counter = 0
     
+    # 样式ID -> 块类型：para.style 每次都要在样式表中按ID查找样式，
+    # 同一ID只查找一次（ID为 None 时对应默认段落样式）
+    style_types: Dict[Optional[str], str] = {}
+    
     # 提取段落内容
     for para in doc.paragraphs:
-        if not para.text.strip():
+        # para.text 每次访问都会遍历XML，只取一次
+        text = para.text.strip()
+        if not text:
             continue
         
         # 判断段落类型
-        block_type = "paragraph"
-        if para.style and para.style.name:
-            style_name = para.style.name.lower()
-            if "heading 1" in style_name or "标题 1" in style_name:
-                block_type = "heading1"
-            elif "heading 2" in style_name or "标题 2" in style_name:
-                block_type = "heading2"
-            elif "heading 3" in style_name or "标题 3" in style_name:
-                block_type = "heading3"
-            elif "list" in style_name or "bullet" in style_name:
-                block_type = "list_item"
+        style_id = para._p.style
+        block_type = style_types.get(style_id)
+        if block_type is None:
+            style = para.style
+            block_type = _classify_style(style.name) if style and style.name else "paragraph"
+            style_types[style_id] = block_type
         
-        content.text_content.append({
+        emit({
             "type": block_type,
-            "content": para.text.strip()
+            "content": text
         })
     
     # 提取表格
     for table in doc.tables:
         table_data = []
         for row in table.rows:
-            row_data = []
-            for cell in row.cells:
-                row_data.append(cell.text.strip())
-            table_data.append(row_data)
-        content.tables.append(table_data)
-        content.text_content.append({
+            table_data.append([cell.text.strip() for cell in row.cells])
+        if sink is None:
+            content.tables.append(table_data)
+        emit({
             "type": "table",
             "content": table_data
         })
     
     # 提取图片
     if extract_images:
-        for rel in doc.part.rels.values():
-            if "image" in rel.target_ref:
+        with _ImageSaver(content, sink=sink) as saver:
+            for rel in doc.part.rels.values():
+                # 只处理内嵌图片关系（按关系类型比较，跳过样式、字体、超链接等）
+                if rel.reltype != DOCX_RT.IMAGE or rel.is_external:
+                    continue
                 try:
                     image_counter += 1
-                    image_data = rel.target_part.blob
+                    part = rel.target_part
+                    image_data = part.blob
                     
                     # 确定图片格式
-                    content_type = rel.target_part.content_type
-                    if "png" in content_type:
-                        ext = "png"
-                    elif "jpeg" in content_type or "jpg" in content_type:
-                        ext = "jpg"
-                    elif "gif" in content_type:
-                        ext = "gif"
-                    else:
-                        ext = "png"
-                    
-                    # 获取图片尺寸
-                    width, height = 0, 0
-                    if HAS_PIL:
-                        try:
-                            img = Image.open(io.BytesIO(image_data))
-                            width, height = img.size
-                        except:
-                            pass
+                    ext = _sniff_image_ext(image_data) or _DOCX_IMAGE_EXTS.get(part.content_type, "png")
                     
-                    extracted_img = ExtractedImage(
-                        image_data=image_data,
-                        image_ext=ext,
-                        index=image_counter,
-                        width=width,
-                        height=height
-                    )
-                    
-                    # 保存图片
-                    img_filename = extracted_img.get_filename(file_path.stem)
-                    img_path = images_dir / img_filename
-                    img_path.write_bytes(image_data)
-                    
-                    extracted_img.image_data = b""  # 清空数据节省内存
-                    content.images.append(extracted_img)
-                except Exception as e:
+                    # 保存图片（结果中不保留图片数据，节省内存）
+                    extracted_img = ExtractedImage(image_ext=ext, index=image_counter)
+                    img_path = images_dir / extracted_img.get_filename(stem)
+                    extracted_img.image_path = img_path
+                    saver.submit(extracted_img, image_data, img_path)
+                    image_data = None
+                except (KeyError, AttributeError):
+                    # 关系目标部件缺失
                     continue
-    
-    content.total_images = image_counter
+        
     return content
 
 
 # ========== PPTX 解析 ==========
 
+# 每个进程至少分到的幻灯片数；幻灯片更少时串行解析（进程启动和重新打开文件的开销更大）
+PPTX_SLIDES_PER_WORKER = 100
+# 并行解析幻灯片的最大进程数
+PPTX_MAX_WORKERS = min(4, os.cpu_count() or 1)
+
+# 子进程中打开的演示文稿（由 _init_pptx_worker 设置）
+_worker_presentation = None
+
+
+@functools.lru_cache(maxsize=64)
+def _heading_type_for_size(size_emu: int) -> str:
+    """根据首个文本段的字号（EMU）判断块类型（演示文稿通常只用少数几种字号，按字号缓存）"""
+    font_size = size_emu / 12700  # 1pt = 12700 EMU
+    if font_size >= 24:
+        return "heading1"
+    if font_size >= 18:
+        return "heading2"
+    if font_size >= 14:
+        return "heading3"
+    return "paragraph"
+
+
+def _pptx_slide_events(slide, slide_num: int, extract_images: bool) -> Iterator[tuple]:
+    """
+    按文档顺序产生一张幻灯片的解析事件
+    
+    事件（均可跨进程传递）：
+        ("block", 文本块)
+        ("table", 表格数据)
+        ("image", 扩展名, 图片数据) —— 图片无法读取时扩展名和数据为 None（仍占用编号）
+    """
+    yield ("block", {
+        "type": "slide_marker",
+        "content": f"--- 幻灯片 {slide_num} ---",
+        "slide_num": slide_num
+    })
+    
+    for shape in slide.shapes:
+        # 提取文本
+        if shape.has_text_frame:
+            for para in shape.text_frame.paragraphs:
+                text = para.text.strip()
+                if not text:
+                    continue
+                
+                # 根据字体大小判断标题级别
+                runs = para.runs  # 每次访问都会新建 run 列表，只取一次
+                size = runs[0].font.size if runs else None
+                block_type = _heading_type_for_size(int(size)) if size else "paragraph"
+                
+                yield ("block", {
+                    "type": block_type,
+                    "content": text,
+                    "slide_num": slide_num
+                })
+        
+        # 提取表格
+        if shape.has_table:
+            yield ("table", [[cell.text.strip() for cell in row.cells] for row in shape.table.rows])
+        
+        # 提取图片 - 使用hasattr检查而非硬编码shape_type
+        if extract_images:
+            # 检查是否为图片形状：优先使用 MSO_SHAPE_TYPE.PICTURE，否则用 hasattr
+            is_picture = False
+            if MSO_SHAPE_TYPE is not None:
+                try:
+                    is_picture = shape.shape_type == MSO_SHAPE_TYPE.PICTURE
+                except NotImplementedError:  # 部分图形框架不支持 shape_type
+                    is_picture = hasattr(shape, 'image')
+            else:
+                is_picture = hasattr(shape, 'image')
+            
+            if is_picture and hasattr(shape, 'image'):
+                try:
+                    image = shape.image
+                    blob = image.blob
+                    # image.ext 需要用 PIL 打开图片识别格式，先按文件头判断
+                    yield ("image", _sniff_image_ext(blob) or image.ext, blob)
+                except (KeyError, AttributeError, ValueError, OSError):
+                    # 链接图片没有嵌入数据，或图片格式无法识别（PIL 的 UnidentifiedImageError 属于 OSError）
+                    yield ("image", None, None)
+
+
+def _init_pptx_worker(pptx_path: str):
+    """进程池初始化：每个子进程只打开一次演示文稿"""
+    global _worker_presentation
+    _init_pptx()
+    _worker_presentation = Presentation(pptx_path)
+
+
+def _pptx_slide_range_events(start: int, stop: int, extract_images: bool) -> List[tuple]:
+    """在子进程中解析 [start, stop) 范围内的幻灯片，返回按顺序排列的事件"""
+    slides = _worker_presentation.slides
+    events = []
+    for index in range(start, stop):
+        events.extend(_pptx_slide_events(slides[index], index + 1, extract_images))
+    return events
+
+
+def _pptx_worker_count(slide_count: int, max_workers: Optional[int]) -> int:
+    """决定并行解析幻灯片的进程数（1 表示串行）"""
+    if max_workers is None:
+        # 已在子进程中（如批量转换的进程池按文件并行）时不再嵌套进程池
+        if multiprocessing.parent_process() is not None:
+            return 1
+        max_workers = PPTX_MAX_WORKERS
+    return max(1, min(max_workers, slide_count // PPTX_SLIDES_PER_WORKER))
+
+
+def _iter_pptx_events(prs, file_path: Path, extract_images: bool,
+                      max_workers: Optional[int]) -> Iterator[tuple]:
+    """按幻灯片顺序产生全部解析事件；幻灯片较多时分段交给多个进程并行解析"""
+    slides = prs.slides
+    slide_count = len(slides)
+    workers = _pptx_worker_count(slide_count, max_workers)
+    
+    if workers <= 1:
+        for slide_num, slide in enumerate(slides, 1):
+            yield from _pptx_slide_events(slide, slide_num, extract_images)
+        return
+    
+    # 连续分段，map 按提交顺序返回结果，前面的段解析完即可开始处理
+    step = -(-slide_count // workers)
+    starts = range(0, slide_count, step)
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_pptx_worker,
+        initargs=(str(file_path),)
+    ) as executor:
+        for events in executor.map(
+            _pptx_slide_range_events,
+            starts,
+            [min(start + step, slide_count) for start in starts],
+            [extract_images] * len(starts)
+        ):
+            yield from events
+
+
+@_gc_paused()
 def extract_pptx_content(
     file_path: Path,
     output_dir: Path,
     images_subdir: str = "images",
-    extract_images: bool = True
+    extract_images: bool = True,
+    extract_metadata: bool = True,
+    sink: Optional[Callable[[Dict[str, Any]], None]] = None,
+    max_workers: Optional[int] = None
 ) -> OfficeContent:
     """
     提取PPTX文件内容
+    
+    幻灯片较多时按顺序分段交给多个进程解析（max_workers 为最大进程数，
+    默认在主进程中最多 PPTX_MAX_WORKERS 个、在子进程中串行），
+    结果按幻灯片顺序合并，图片编号与串行解析一致
     """
-    if not HAS_PPTX:
+    if not _init_pptx():
         raise ImportError("需要安装 python-pptx: pip install python-pptx")
     
     content = OfficeContent(file_type="pptx")
+    emit = content.text_content.append if sink is None else sink
     prs = Presentation(str(file_path))
     
     # 提取元数据
     core_props = prs.core_properties
-    content.metadata = {
-        "title": core_props.title or "",
-        "author": core_props.author or "",
-        "subject": core_props.subject or "",
-        "created": str(core_props.created) if core_props.created else "",
-    }
-    content.title = core_props.title or file_path.stem
+    title = core_props.title
+    if extract_metadata:
+        content.metadata = {
+            "title": title or "",
+            "author": core_props.author or "",
+            "subject": core_props.subject or "",
+            "created": _format_datetime(core_props.created),
+        }
+    content.title = title or file_path.stem
     
     # 创建图片目录
     if extract_images:
         images_dir = output_dir / images_subdir
         images_dir.mkdir(parents=True, exist_ok=True)
+    stem = file_path.stem
     
     image_counter = 0
+    slide_num = 0
     
-    # 遍历幻灯片
-    for slide_num, slide in enumerate(prs.slides, 1):
-        content.text_content.append({
-            "type": "slide_marker",
-            "content": f"--- 幻灯片 {slide_num} ---",
-            "slide_num": slide_num
-        })
-        
-        for shape in slide.shapes:
-            # 提取文本
-            if shape.has_text_frame:
-                for para in shape.text_frame.paragraphs:
-                    text = para.text.strip()
-                    if not text:
-                        continue
-                    
-                    # 根据字体大小判断标题级别
-                    block_type = "paragraph"
-                    if para.runs and para.runs[0].font.size:
-                        font_size = para.runs[0].font.size.pt if para.runs[0].font.size else 12
-                        if font_size >= 24:
-                            block_type = "heading1"
-                        elif font_size >= 18:
-                            block_type = "heading2"
-                        elif font_size >= 14:
-                            block_type = "heading3"
-                    
-                    content.text_content.append({
-                        "type": block_type,
-                        "content": text,
-                        "slide_num": slide_num
-                    })
-            
-            # 提取表格
-            if shape.has_table:
-                table_data = []
-                for row in shape.table.rows:
-                    row_data = []
-                    for cell in row.cells:
-                        row_data.append(cell.text.strip())
-                    table_data.append(row_data)
-                content.tables.append(table_data)
-                content.text_content.append({
+    # 按顺序处理幻灯片事件（图片在后台线程写入）
+    with _ImageSaver(content, sink=sink) as saver:
+        for event in _iter_pptx_events(prs, file_path, extract_images, max_workers):
+            kind = event[0]
+            if kind == "block":
+                block = event[1]
+                slide_num = block["slide_num"]
+                emit(block)
+            elif kind == "table":
+                table_data = event[1]
+                if sink is None:
+                    content.tables.append(table_data)
+                emit({
                     "type": "table",
                     "content": table_data,
                     "slide_num": slide_num
                 })
-            
-            # 提取图片 - 使用hasattr检查而非硬编码shape_type
-            if extract_images:
-                # 检查是否为图片形状：优先使用 MSO_SHAPE_TYPE.PICTURE，否则用 hasattr
-                is_picture = False
-                if MSO_SHAPE_TYPE is not None:
-                    try:
-                        is_picture = shape.shape_type == MSO_SHAPE_TYPE.PICTURE
-                    except:
-                        is_picture = hasattr(shape, 'image')
-                else:
-                    is_picture = hasattr(shape, 'image')
-                
-                if is_picture and hasattr(shape, 'image'):
-                    try:
-                        image_counter += 1
-                        image = shape.image
-                        image_data = image.blob
-                        ext = image.ext
-                        
-                        width, height = 0, 0
-                        if HAS_PIL:
-                            try:
-                                img = Image.open(io.BytesIO(image_data))
-                                width, height = img.size
-                            except:
-                                pass
-                        
-                        extracted_img = ExtractedImage(
-                            image_data=image_data,
-                            image_ext=ext,
-                            index=image_counter,
-                            width=width,
-                            height=height
-                        )
-                        
-                        img_filename = extracted_img.get_filename(file_path.stem)
-                        img_path = images_dir / img_filename
-                        img_path.write_bytes(image_data)
-                        
-                        extracted_img.image_data = b""
-                        content.images.append(extracted_img)
-                        
-                        content.text_content.append({
-                            "type": "image",
-                            "content": f"[图片 {image_counter}]",
-                            "image_index": image_counter,
-                            "image_ext": ext,
-                            "slide_num": slide_num
-                        })
-                    except Exception as e:
-                        continue
-    
-    content.total_images = image_counter
+            else:
+                image_counter += 1
+                ext, image_data = event[1], event[2]
+                if image_data is None:
+                    continue
+                extracted_img = ExtractedImage(image_ext=ext, index=image_counter)
+                img_path = images_dir / extracted_img.get_filename(stem)
+                extracted_img.image_path = img_path
+                saver.submit(extracted_img, image_data, img_path, block={
+                    "type": "image",
+                    "content": f"[图片 {image_counter}]",
+                    "image_index": image_counter,
+                    "image_ext": ext,
+                    "slide_num": slide_num
+                })
+                image_data = None
+        
     return content
 
 
 # ========== XLSX 解析 ==========
 
+# 图片文件后缀 -> 扩展名（与 PIL 识别的格式名一致）
+_XLSX_IMAGE_EXTS = {"jpg": "jpeg", "tif": "tiff"}
+# 无法作为图片保存的矢量格式（与 openpyxl 的处理一致，直接跳过）
+_XLSX_SKIP_EXTS = {"wmf", "emf"}
+
+
+# OOXML 包中用到的命名空间和关系类型
+_PKG_REL_NS = "http://schemas.openxmlformats.org/package/2006/relationships"
+_OFFICE_REL_NS = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+_SHEET_MAIN_NS = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+_XDR_NS = "http://schemas.openxmlformats.org/drawingml/2006/spreadsheetDrawing"
+_DRAWINGML_NS = "http://schemas.openxmlformats.org/drawingml/2006/main"
+_REL_OFFICE_DOCUMENT = _OFFICE_REL_NS + "/officeDocument"
+_REL_WORKSHEET = _OFFICE_REL_NS + "/worksheet"
+_REL_DRAWING = _OFFICE_REL_NS + "/drawing"
+_REL_IMAGE = _OFFICE_REL_NS + "/image"
+# 绘图中各类锚点的读取顺序（与 openpyxl 加载 sheet._images 的顺序一致）
+_XDR_ANCHORS = tuple(f"{{{_XDR_NS}}}{tag}" for tag in ("absoluteAnchor", "oneCellAnchor", "twoCellAnchor"))
+
+
+def _read_package_xml(archive: zipfile.ZipFile, names: set, part: str) -> Optional[ElementTree.Element]:
+    """读取并解析包内XML部件（不存在或无法解析时返回 None）"""
+    if part not in names:
+        return None
+    try:
+        return ElementTree.fromstring(archive.read(part))
+    except ElementTree.ParseError:
+        return None
+
+
+def _read_part_rels(archive: zipfile.ZipFile, names: set, part: str) -> Dict[str, Tuple[str, str]]:
+    """
+    读取部件的关系文件（part 为空字符串时读取包根关系）
+    
+    Returns:
+        {关系ID: (关系类型, 包内目标路径)}，外部链接不包含在内
+    """
+    folder, base = part.rpartition("/")[::2]
+    rels_path = f"{folder}/_rels/{base}.rels" if folder else f"_rels/{base}.rels"
+    root = _read_package_xml(archive, names, rels_path)
+    if root is None:
+        return {}
+    rels = {}
+    for rel in root.iter(f"{{{_PKG_REL_NS}}}Relationship"):
+        target = rel.get("Target", "")
+        if rel.get("TargetMode") == "External" or not target:
+            continue
+        # 以 / 开头为包内绝对路径，否则相对于部件所在目录
+        if target.startswith("/"):
+            target = target[1:]
+        else:
+            target = posixpath.normpath(posixpath.join(folder, target))
+        rels[rel.get("Id")] = (rel.get("Type"), target)
+    return rels
+
+
+def _find_xlsx_images(archive: zipfile.ZipFile) -> Dict[str, List[Tuple[str, str]]]:
+    """
+    从xlsx包中按工作表查找图片（只读模式下openpyxl不会加载图片）
+    
+    直接按 工作簿 → 工作表 → 绘图 → 图片 的关系XML依次查找，顺序与完整加载时的
+    sheet._images 一致；只解析关系和绘图XML，不读取图片数据
+    
+    Returns:
+        {工作表名: [(压缩包内路径, 扩展名), ...]}
+    """
+    names = set(archive.namelist())
+    workbook_part = next((target for rel_type, target in _read_part_rels(archive, names, "").values()
+                          if rel_type == _REL_OFFICE_DOCUMENT), None)
+    workbook = _read_package_xml(archive, names, workbook_part)
+    if workbook is None:
+        return {}
+    workbook_rels = _read_part_rels(archive, names, workbook_part)
+    
+    sheet_images = {}
+    for sheet in workbook.iter(f"{{{_SHEET_MAIN_NS}}}sheet"):
+        rel_type, sheet_part = workbook_rels.get(sheet.get(f"{{{_OFFICE_REL_NS}}}id"), (None, None))
+        if rel_type != _REL_WORKSHEET or sheet_part not in names:
+            continue  # 图表工作表不含图片
+        images = []
+        for rel_type, drawing_part in _read_part_rels(archive, names, sheet_part).values():
+            if rel_type != _REL_DRAWING:
+                continue
+            drawing = _read_package_xml(archive, names, drawing_part)
+            if drawing is None:
+                continue
+            drawing_rels = _read_part_rels(archive, names, drawing_part)
+            for anchor_tag in _XDR_ANCHORS:
+                for anchor in drawing.iterfind(anchor_tag):
+                    # 锚点下的图片，或组合形状中的图片
+                    pic = anchor.find(f"{{{_XDR_NS}}}pic")
+                    if pic is None:
+                        pic = anchor.find(f"{{{_XDR_NS}}}grpSp/{{{_XDR_NS}}}pic")
+                    if pic is None:
+                        continue
+                    blip = pic.find(f"{{{_XDR_NS}}}blipFill/{{{_DRAWINGML_NS}}}blip")
+                    if blip is None:
+                        continue
+                    rel_type, target = drawing_rels.get(blip.get(f"{{{_OFFICE_REL_NS}}}embed"), (None, None))
+                    if rel_type != _REL_IMAGE or target not in names:
+                        continue
+                    suffix = Path(target).suffix.lstrip(".").lower() or "png"
+                    if suffix in _XLSX_SKIP_EXTS:
+                        continue
+                    images.append((target, _XLSX_IMAGE_EXTS.get(suffix, suffix)))
+        if images:
+            sheet_images[sheet.get("name")] = images
+    return sheet_images
+
+
+@_gc_paused()
 def extract_xlsx_content(
     file_path: Path,
     output_dir: Path,
     images_subdir: str = "images",
-    extract_images: bool = True
+    extract_images: bool = True,
+    extract_metadata: bool = True,
+    sink: Optional[Callable[[Dict[str, Any]], None]] = None
 ) -> OfficeContent:
     """
     提取XLSX文件内容
     """
-    if not HAS_OPENPYXL:
+    if not _init_openpyxl():
         raise ImportError("需要安装 openpyxl: pip install openpyxl")
     
     content = OfficeContent(file_type="xlsx")
-    wb = load_workbook(str(file_path), data_only=True)
-    
-    # 提取元数据
-    content.metadata = {
-        "title": wb.properties.title or "",
-        "author": wb.properties.creator or "",
-        "created": str(wb.properties.created) if wb.properties.created else "",
-    }
-    content.title = wb.properties.title or file_path.stem
-    
-    # 创建图片目录
-    if extract_images:
-        images_dir = output_dir / images_subdir
-        images_dir.mkdir(parents=True, exist_ok=True)
-    
-    image_counter = 0
-    
-    # 遍历工作表
-    for sheet_name in wb.sheetnames:
-        sheet = wb[sheet_name]
+    emit = content.text_content.append if sink is None else sink
+    # 只读模式下压缩包在解析期间一直打开；源文件由这里打开和关闭，
+    # 解析中途出错时也不会留下句柄（Windows 上未关闭会锁住源文件）
+    with contextlib.ExitStack() as stack:
+        source = stack.enter_context(open(file_path, "rb"))
+        # 只读模式流式解析单元格，不构建完整的单元格和样式对象
+        wb = load_workbook(source, read_only=True, data_only=True, keep_links=False)
+        stack.callback(wb.close)
         
-        content.text_content.append({
-            "type": "sheet_marker",
-            "content": f"## 工作表: {sheet_name}",
-            "sheet_name": sheet_name
-        })
+        # 提取元数据
+        props = wb.properties
+        if extract_metadata:
+            content.metadata = {
+                "title": props.title or "",
+                "author": props.creator or "",
+                "created": _format_datetime(props.created),
+            }
+        content.title = props.title or file_path.stem
         
-        # 提取数据作为表格
-        table_data = []
-        for row in sheet.iter_rows(values_only=True):
-            # 过滤全空行
-            if all(cell is None for cell in row):
-                continue
-            row_data = [str(cell) if cell is not None else "" for cell in row]
-            table_data.append(row_data)
-        
-        if table_data:
-            content.tables.append(table_data)
-            content.text_content.append({
-                "type": "table",
-                "content": table_data,
-                "sheet_name": sheet_name
-            })
+        # 创建图片目录
+        if extract_images:
+            images_dir = output_dir / images_subdir
+            images_dir.mkdir(parents=True, exist_ok=True)
+        stem = file_path.stem
         
-        # 提取图片 - openpyxl通过 drawing.image 访问
+        image_counter = 0
+        sheet_images = {}
         if extract_images:
-            try:
-                # openpyxl 3.0+ 使用 sheet._images 或遍历 drawing
-                images_list = []
+            # 图片由后台线程从压缩包解压，使用单独打开的压缩包，不与 openpyxl 共用文件位置
+            archive = stack.enter_context(zipfile.ZipFile(file_path))
+            sheet_images = _find_xlsx_images(archive)
+        
+        # 遍历工作表（图片在后台线程写入）
+        with _ImageSaver(content, measure=False, sink=sink) as saver:
+            for sheet_name in wb.sheetnames:
+                sheet = wb[sheet_name]
                 
-                # 方法1: 尝试 _images 属性 (openpyxl 内部)
-                if hasattr(sheet, '_images') and sheet._images:
-                    images_list = list(sheet._images)
+                emit({
+                    "type": "sheet_marker",
+                    "content": f"## 工作表: {sheet_name}",
+                    "sheet_name": sheet_name
+                })
                 
-                # 方法2: 尝试遍历 _drawing (更可靠)
-                if not images_list and hasattr(sheet, '_drawing') and sheet._drawing:
-                    for chart_or_image in sheet._drawing:
-                        if hasattr(chart_or_image, '_data'):
-                            images_list.append(chart_or_image)
+                # 提取数据作为表格
+                # 其他工具生成的文件常带有过期的 <dimension> 标记，只读模式按它截断行列，
+                # 因此忽略该标记，与完整加载一样从第1行第1列起读取全部单元格
+                sheet.reset_dimensions()
+                table_data = []
+                width = 0
+                min_width = None
+                for row in sheet.iter_rows(min_row=1, min_col=1, values_only=True):
+                    # 过滤全空行（tuple.count 在C层完成计数）
+                    if row.count(None) == len(row):
+                        continue
+                    # 文本单元格无需再调用 str()
+                    table_data.append([
+                        "" if cell is None else cell if type(cell) is str else str(cell)
+                        for cell in row
+                    ])
+                    row_len = len(row)
+                    if row_len > width:
+                        width = row_len
+                    if min_width is None or row_len < min_width:
+                        min_width = row_len
+                
+                # 只读模式下各行长度取决于各行最后一个单元格，补齐到同一列数（各行等宽时无需逐行检查）
+                if min_width is not None and min_width < width:
+                    for row_data in table_data:
+                        if len(row_data) < width:
+                            row_data.extend([""] * (width - len(row_data)))
+                
+                if table_data:
+                    if sink is None:
+                        content.tables.append(table_data)
+                    emit({
+                        "type": "table",
+                        "content": table_data,
+                        "sheet_name": sheet_name
+                    })
                 
-                for img_obj in images_list:
-                    try:
+                # 提取图片 - 已由 _find_xlsx_images 从包中读出
+                if extract_images:
+                    for member, ext in sheet_images.get(sheet_name, []):
                         image_counter += 1
-                        # 获取图片数据
-                        if hasattr(img_obj, '_data'):
-                            if callable(img_obj._data):
-                                image_data = img_obj._data()
-                            else:
-                                image_data = img_obj._data
-                        elif hasattr(img_obj, 'ref') and hasattr(img_obj.ref, 'blob'):
-                            image_data = img_obj.ref.blob
-                        else:
-                            continue
-                        
-                        # 确定扩展名
-                        ext = "png"
-                        if hasattr(img_obj, 'format'):
-                            ext = img_obj.format or "png"
-                        
-                        extracted_img = ExtractedImage(
-                            image_data=image_data,
-                            image_ext=ext,
-                            index=image_counter
-                        )
-                        
-                        img_filename = extracted_img.get_filename(file_path.stem)
-                        img_path = images_dir / img_filename
-                        img_path.write_bytes(image_data)
-                        
-                        extracted_img.image_data = b""
-                        content.images.append(extracted_img)
-                    except Exception as e:
-                        image_counter -= 1  # 恢复计数器
-                        continue
-            except Exception as e:
-                pass  # 图片提取失败不影响主流程
+                        extracted_img = ExtractedImage(image_ext=ext, index=image_counter)
+                        img_path = images_dir / extracted_img.get_filename(stem)
+                        extracted_img.image_path = img_path
+                        # 从压缩包直接解压到文件（失败在 saver 退出时统计）
+                        saver.submit_member(extracted_img, archive, member, img_path)
     
-    wb.close()
-    content.total_images = image_counter
     return content
 
 
 # ========== RTF 解析 ==========
 
+# RTF 列表项：项目符号加空格，或单个数字加 . ） )，其后为列表内容
+_RTF_LIST_RE = re.compile(r"(?:[•\-*·] |\d[.）)])(.+)")
+# 段落以这些标点结尾时不视为标题
+_RTF_SENTENCE_END = frozenset(".。!！?？,")
+
+
+@_gc_paused()
 def extract_rtf_content(
     file_path: Path,
     output_dir: Path,
     images_subdir: str = "images",
-    extract_images: bool = True
+    extract_images: bool = True,
+    extract_metadata: bool = True,
+    sink: Optional[Callable[[Dict[str, Any]], None]] = None
 ) -> OfficeContent:
     """
     提取RTF文件内容
@@ -515,14 +1025,17 @@ def extract_rtf_content(
         output_dir: 输出目录
         images_subdir: 图片子目录名
         extract_images: 是否提取图片（RTF中嵌入的图片支持有限）
+        extract_metadata: 是否填充元数据（RTF 只有文件名可用）
+        sink: 文本块接收函数（流式输出），见 extract_docx_content
     
     Returns:
         OfficeContent: 提取的内容
     """
-    if not HAS_RTF:
+    if not _init_rtf():
         raise ImportError("需要安装 striprtf: pip install striprtf")
     
     content = OfficeContent(file_type="rtf")
+    emit = content.text_content.append if sink is None else sink
     
     # 读取RTF文件
     try:
@@ -551,18 +1064,20 @@ def extract_rtf_content(
         raise ValueError(f"无法读取RTF文件: {e}")
     
     # 设置元数据
-    content.metadata = {
-        "title": file_path.stem,
-        "author": "",
-        "created": "",
-    }
+    if extract_metadata:
+        content.metadata = {
+            "title": file_path.stem,
+            "author": "",
+            "created": "",
+        }
     content.title = file_path.stem
     
-    # 解析文本内容
-    lines = plain_text.split('\n')
+    # 解析文本内容（逐行循环是热点：正则匹配函数和追加方法绑定为局部变量）
     current_paragraph = []
+    add_line = current_paragraph.append
+    match_list_item = _RTF_LIST_RE.match
     
-    for line in lines:
+    for line in plain_text.split('\n'):
         line = line.strip()
         
         if not line:
@@ -570,48 +1085,37 @@ def extract_rtf_content(
             if current_paragraph:
                 para_text = ' '.join(current_paragraph)
                 # 判断是否为标题（简单启发式：短行且不以标点结尾）
-                if len(para_text) < 50 and not para_text.endswith(('.', '。', '!', '！', '?', '？', ',')):
-                    content.text_content.append({
+                if len(para_text) < 50 and para_text[-1] not in _RTF_SENTENCE_END:
+                    emit({
                         "type": "heading1",
                         "content": para_text
                     })
                 else:
-                    content.text_content.append({
+                    emit({
                         "type": "paragraph",
                         "content": para_text
                     })
-                current_paragraph = []
+                current_paragraph.clear()
         else:
-            # 检测列表项
-            if line.startswith(('• ', '- ', '* ', '· ')):
-                if current_paragraph:
-                    content.text_content.append({
-                        "type": "paragraph",
-                        "content": ' '.join(current_paragraph)
-                    })
-                    current_paragraph = []
-                content.text_content.append({
-                    "type": "list_item",
-                    "content": line[2:].strip()
-                })
-            elif len(line) > 2 and line[0].isdigit() and line[1] in '.）)':
-                # 数字列表
+            # 检测列表项（项目符号或数字编号）
+            m = match_list_item(line)
+            if m:
                 if current_paragraph:
-                    content.text_content.append({
+                    emit({
                         "type": "paragraph",
                         "content": ' '.join(current_paragraph)
                     })
-                    current_paragraph = []
-                content.text_content.append({
+                    current_paragraph.clear()
+                emit({
                     "type": "list_item",
-                    "content": line[2:].strip()
+                    "content": m.group(1).lstrip()
                 })
             else:
-                current_paragraph.append(line)
+                add_line(line)
     
     # 处理最后一个段落
     if current_paragraph:
-        content.text_content.append({
+        emit({
             "type": "paragraph",
             "content": ' '.join(current_paragraph)
         })
@@ -623,163 +1127,352 @@ def extract_rtf_content(
     return content
 
 
+# ========== 旧格式转换 ==========
 
-def convert_old_format_to_new(file_path: Path, temp_dir: Path) -> Optional[Path]:
+class OfficeConverter:
     """
-    将旧格式Office文件转换为新格式
-    
-    Args:
-        file_path: 旧格式文件路径 (.doc, .ppt, .xls)
-        temp_dir: 临时目录
+    旧格式Office文件转换器（.doc/.ppt/.xls → 新格式）
     
-    Returns:
-        转换后的新格式文件路径，失败返回None
+    首次转换某种格式时才启动对应的 Office COM 应用，之后在同一线程内复用，
+    避免每个文件都付出数秒的 Word/Excel/PowerPoint 启动开销。
+    COM 对象属于单线程套间，实例只能在创建它的线程中使用。
     """
-    # 延迟初始化 win32com
-    if not _init_win32com():
-        return None
     
-    suffix = file_path.suffix.lower()
-    format_map = {
-        ".doc": ".docx",
-        ".ppt": ".pptx", 
-        ".xls": ".xlsx"
+    # 旧格式后缀 -> (新格式后缀, SaveAs 文件格式代码)
+    FORMATS = {
+        ".doc": (".docx", 16),
+        ".ppt": (".pptx", 24),
+        ".xls": (".xlsx", 51),
     }
     
-    if suffix not in format_map:
-        return None
+    def __init__(self):
+        self.thread_id = threading.get_ident()
+        self._word = None
+        self._excel = None
+        self._ppt = None
+        self._com_initialized = False
     
-    new_path = temp_dir / (file_path.stem + format_map[suffix])
-    app = None
-    doc = None
+    def __enter__(self) -> "OfficeConverter":
+        return self
     
-    try:
-        pythoncom.CoInitialize()
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+    
+    def _get_app(self, suffix: str):
+        """获取（必要时启动）对应格式的 COM 应用"""
+        if not self._com_initialized:
+            pythoncom.CoInitialize()
+            self._com_initialized = True
         
         if suffix == ".doc":
-            app = win32com.Dispatch("Word.Application")
-            app.Visible = False
-            app.DisplayAlerts = False  # 禁止弹窗
-            try:
-                doc = app.Documents.Open(
-                    str(file_path.absolute()),
-                    ReadOnly=True,
-                    AddToRecentFiles=False
-                )
-                doc.SaveAs2(str(new_path.absolute()), FileFormat=16)  # docx format
-            finally:
-                if doc:
-                    try:
-                        doc.Close(SaveChanges=False)
-                    except:
-                        pass
-                if app:
-                    try:
-                        app.Quit()
-                    except:
-                        pass
-            
+            if self._word is None:
+                app = win32com.Dispatch("Word.Application")
+                app.Visible = False
+                app.DisplayAlerts = False  # 禁止弹窗
+                self._word = app
+            return self._word
         elif suffix == ".ppt":
-            app = win32com.Dispatch("PowerPoint.Application")
-            # PowerPoint Visible 必须设为 True 或使用 msoFalse
+            if self._ppt is None:
+                # PowerPoint Visible 必须设为 True 或使用 msoFalse，这里不设置
+                self._ppt = win32com.Dispatch("PowerPoint.Application")
+            return self._ppt
+        else:
+            if self._excel is None:
+                app = win32com.Dispatch("Excel.Application")
+                app.Visible = False
+                app.DisplayAlerts = False  # 禁止弹窗
+                self._excel = app
+            return self._excel
+    
+    def _discard_app(self, suffix: str):
+        """退出并丢弃对应格式的 COM 应用（下次使用时重新启动）"""
+        attr = {".doc": "_word", ".ppt": "_ppt", ".xls": "_excel"}[suffix]
+        app = getattr(self, attr)
+        setattr(self, attr, None)
+        if app is not None:
             try:
-                doc = app.Presentations.Open(
-                    str(file_path.absolute()),
-                    ReadOnly=True,
-                    WithWindow=False
-                )
-                doc.SaveAs(str(new_path.absolute()), FileFormat=24)  # pptx format
-            finally:
-                if doc:
-                    try:
+                app.Quit()
+            except:
+                pass
+    
+    def _save_as(self, app, suffix: str, file_path: Path, new_path: Path, file_format: int):
+        """用 COM 应用打开旧格式文件并另存为新格式"""
+        src = str(file_path.absolute())
+        dst = str(new_path.absolute())
+        doc = None
+        try:
+            if suffix == ".doc":
+                doc = app.Documents.Open(src, ReadOnly=True, AddToRecentFiles=False)
+                doc.SaveAs2(dst, FileFormat=file_format)
+            elif suffix == ".ppt":
+                doc = app.Presentations.Open(src, ReadOnly=True, WithWindow=False)
+                doc.SaveAs(dst, FileFormat=file_format)
+            else:
+                doc = app.Workbooks.Open(src, ReadOnly=True, UpdateLinks=False)
+                doc.SaveAs(dst, FileFormat=file_format)
+        finally:
+            if doc:
+                try:
+                    if suffix == ".ppt":
                         doc.Close()
-                    except:
-                        pass
-                if app:
-                    try:
-                        app.Quit()
-                    except:
-                        pass
-            
-        elif suffix == ".xls":
-            app = win32com.Dispatch("Excel.Application")
-            app.Visible = False
-            app.DisplayAlerts = False  # 禁止弹窗
-            try:
-                doc = app.Workbooks.Open(
-                    str(file_path.absolute()),
-                    ReadOnly=True,
-                    UpdateLinks=False
-                )
-                doc.SaveAs(str(new_path.absolute()), FileFormat=51)  # xlsx format
-            finally:
-                if doc:
-                    try:
+                    else:
                         doc.Close(SaveChanges=False)
-                    except:
-                        pass
-                if app:
-                    try:
-                        app.Quit()
-                    except:
-                        pass
+                except:
+                    pass
+    
+    def convert(self, file_path: Path, temp_dir: Path) -> Optional[Path]:
+        """
+        将旧格式Office文件转换为新格式
         
-        return new_path if new_path.exists() else None
+        Args:
+            file_path: 旧格式文件路径 (.doc, .ppt, .xls)
+            temp_dir: 临时目录
         
-    except Exception as e:
-        # 确保清理COM对象
-        if doc:
+        Returns:
+            转换后的新格式文件路径，失败返回None
+        """
+        # 延迟初始化 win32com
+        if not _init_win32com():
+            return None
+        
+        suffix = file_path.suffix.lower()
+        if suffix not in self.FORMATS:
+            return None
+        
+        new_ext, file_format = self.FORMATS[suffix]
+        new_path = temp_dir / (file_path.stem + new_ext)
+        
+        # 复用的应用可能已被用户关闭或崩溃：失败时丢弃实例，用新启动的应用重试一次
+        for _ in range(2):
             try:
-                doc.Close()
+                self._save_as(self._get_app(suffix), suffix, file_path, new_path, file_format)
+                break
+            except Exception:
+                self._discard_app(suffix)
+        
+        return new_path if new_path.exists() else None
+    
+    def close(self):
+        """退出所有已启动的 COM 应用"""
+        for suffix in (".doc", ".ppt", ".xls"):
+            self._discard_app(suffix)
+        if self._com_initialized:
+            self._com_initialized = False
+            try:
+                pythoncom.CoUninitialize()
             except:
                 pass
-        if app:
+
+
+_CONVERTER: Optional[OfficeConverter] = None
+
+
+def get_converter() -> OfficeConverter:
+    """获取进程级共享的转换器（首次调用时创建，进程退出时自动关闭 Office 应用）"""
+    global _CONVERTER
+    if _CONVERTER is None:
+        _CONVERTER = OfficeConverter()
+        atexit.register(_CONVERTER.close)
+    return _CONVERTER
+
+
+def convert_old_format_to_new(file_path: Path, temp_dir: Path) -> Optional[Path]:
+    """
+    将旧格式Office文件转换为新格式
+    
+    Args:
+        file_path: 旧格式文件路径 (.doc, .ppt, .xls)
+        temp_dir: 临时目录
+    
+    Returns:
+        转换后的新格式文件路径，失败返回None
+    """
+    converter = get_converter()
+    if converter.thread_id == threading.get_ident():
+        return converter.convert(file_path, temp_dir)
+    
+    # 共享转换器属于其他线程，使用一次性转换器
+    with OfficeConverter() as one_shot:
+        return one_shot.convert(file_path, temp_dir)
+
+
+# ========== 通用接口 ==========
+
+def _user_cache_dir() -> Path:
+    """当前用户的缓存目录（Windows 为 LOCALAPPDATA，其他系统为 XDG_CACHE_HOME 或 ~/.cache）"""
+    if sys.platform == "win32" and os.environ.get("LOCALAPPDATA"):
+        base = Path(os.environ["LOCALAPPDATA"])
+    elif os.environ.get("XDG_CACHE_HOME"):
+        base = Path(os.environ["XDG_CACHE_HOME"])
+    else:
+        base = Path(os.path.expanduser("~")) / ".cache"
+    return base / "pdf-md-tools" / "office"
+
+
+# 解析结果缓存目录：位于当前用户的缓存目录下，不写入源文件或输出目录，
+# 避免从他人可写的共享目录加载 pickle 文件
+OFFICE_CACHE_DIR = _user_cache_dir()
+# 缓存版本：解析逻辑或 OfficeContent 结构变化时递增，使已有缓存全部失效
+_CACHE_VERSION = 1
+
+
+def _cache_path(file_path: Path, output_dir: Path, images_subdir: str,
+                extract_images: bool, extract_metadata: bool) -> Optional[Path]:
+    """
+    根据文件元数据指纹（缓存版本、路径、大小、修改时间、输出位置）生成缓存文件路径
+    
+    文件未变化时指纹不变，文件被修改后自然失效；无法访问文件时返回 None。
+    缓存文件名为 "源文件名.位置.指纹.pkl"，位置由源文件和输出目录决定，
+    同一源文件的旧缓存可按文件名找到并清理，不影响其他目录中的同名文件
+    """
+    try:
+        st = file_path.stat()
+    except OSError:
+        return None
+    location = f"{file_path.absolute()}|{output_dir.absolute()}"
+    fingerprint = (f"{_CACHE_VERSION}|{st.st_size}|{st.st_mtime_ns}|{images_subdir}"
+                   f"|{int(extract_images)}{int(extract_metadata)}")
+    location_digest = hashlib.blake2b(location.encode("utf-8"), digest_size=8).hexdigest()
+    digest = hashlib.blake2b(f"{location}|{fingerprint}".encode("utf-8"), digest_size=8).hexdigest()
+    return OFFICE_CACHE_DIR / f"{file_path.name}.{location_digest}.{digest}.pkl"
+
+
+def _remove_stale_caches(cache_path: Path):
+    """删除同一源文件、同一输出位置的其他缓存（源文件修改前的旧指纹、旧版本的缓存）"""
+    # "源文件名.位置." 相同、指纹不同的缓存
+    prefix = cache_path.name.rsplit(".", 2)[0]
+    stale_re = re.compile(rf"{re.escape(prefix)}\.[0-9a-f]{{16}}\.pkl")
+    try:
+        entries = list(os.scandir(cache_path.parent))
+    except OSError:
+        return
+    for entry in entries:
+        if entry.name != cache_path.name and stale_re.fullmatch(entry.name):
             try:
-                app.Quit()
-            except:
+                os.unlink(entry.path)
+            except OSError:
                 pass
+
+
+def _load_cached_content(cache_path: Path, file_path: Path, output_dir: Path, images_subdir: str) -> Optional[OfficeContent]:
+    """读取缓存的解析结果；缓存损坏或引用的图片已不存在时返回 None"""
+    try:
+        with open(cache_path, "rb") as f:
+            content = pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
         return None
-    finally:
-        try:
-            pythoncom.CoUninitialize()
-        except:
-            pass
+    if not isinstance(content, OfficeContent):
+        return None
+    
+    # 输出目录中的图片被删除时需要重新解析
+    images_dir = output_dir / images_subdir
+    stem = file_path.stem
+    for img in content.images:
+        if not (images_dir / img.get_filename(stem)).exists():
+            return None
+    return content
 
 
-# ========== 通用接口 ==========
+def _save_cached_content(cache_path: Path, content: OfficeContent):
+    """原子写入解析结果缓存并清理该文件的旧缓存，写入失败时忽略"""
+    try:
+        cache_path.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=str(cache_path.parent), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump(content, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_name, cache_path)
+        except BaseException:
+            os.unlink(tmp_name)
+            raise
+    except OSError:
+        return
+    # 每次修改源文件都会生成新指纹，清理旧缓存，避免缓存目录无限增长
+    _remove_stale_caches(cache_path)
+
 
 def extract_office_content(
     file_path: Path,
     output_dir: Path,
     images_subdir: str = "images",
-    extract_images: bool = True
+    extract_images: bool = True,
+    use_cache: bool = False,
+    extract_metadata: bool = True
 ) -> OfficeContent:
     """
     提取Office文档内容（通用接口）
     
+    use_cache=True 时解析结果按文件元数据指纹缓存在当前用户的缓存目录（OFFICE_CACHE_DIR）中，
+    文件未修改时直接复用
+    
     Args:
         file_path: Office文档路径
         output_dir: 输出目录
         images_subdir: 图片子目录名
         extract_images: 是否提取图片
+        use_cache: 是否使用解析结果缓存（默认不使用）
+        extract_metadata: 是否提取文档属性（作者、时间等）
     
     Returns:
         OfficeContent: 提取的内容
     """
+    cache_path = None
+    if use_cache:
+        cache_path = _cache_path(file_path, output_dir, images_subdir, extract_images, extract_metadata)
+    if cache_path is not None:
+        content = _load_cached_content(cache_path, file_path, output_dir, images_subdir)
+        if content is not None:
+            return content
+    
+    content = _extract_office_content(file_path, output_dir, images_subdir, extract_images, extract_metadata)
+    
+    if cache_path is not None:
+        _save_cached_content(cache_path, content)
+    return content
+
+
+if sys.version_info >= (3, 10):
+    def _temporary_directory() -> tempfile.TemporaryDirectory:
+        """创建清理时忽略错误的临时目录"""
+        return tempfile.TemporaryDirectory(ignore_cleanup_errors=True)
+else:
+    class _temporary_directory(tempfile.TemporaryDirectory):
+        """创建清理时忽略错误的临时目录（Python 3.9 没有 ignore_cleanup_errors 参数）"""
+        def cleanup(self):
+            if self._finalizer.detach():
+                shutil.rmtree(self.name, ignore_errors=True)
+
+
+# 可直接解析的格式 -> 解析函数（参数签名一致，新增格式只需在此登记）
+_EXTRACTORS: Dict[str, Callable[..., OfficeContent]] = {
+    ".docx": extract_docx_content,
+    ".pptx": extract_pptx_content,
+    ".xlsx": extract_xlsx_content,
+    ".rtf": extract_rtf_content,
+}
+
+# 需要先经 Office 转换为新格式的旧格式
+_LEGACY_SUFFIXES = frozenset(OfficeConverter.FORMATS)
+
+
+def _extract_office_content(
+    file_path: Path,
+    output_dir: Path,
+    images_subdir: str,
+    extract_images: bool,
+    extract_metadata: bool = True,
+    sink: Optional[Callable[[Dict[str, Any]], None]] = None
+) -> OfficeContent:
+    """按文件格式分发到对应的解析函数（sink 见 extract_docx_content）"""
     suffix = file_path.suffix.lower()
     
     # 新格式直接解析
-    if suffix == ".docx":
-        return extract_docx_content(file_path, output_dir, images_subdir, extract_images)
-    elif suffix == ".pptx":
-        return extract_pptx_content(file_path, output_dir, images_subdir, extract_images)
-    elif suffix == ".xlsx":
-        return extract_xlsx_content(file_path, output_dir, images_subdir, extract_images)
-    elif suffix == ".rtf":
-        return extract_rtf_content(file_path, output_dir, images_subdir, extract_images)
+    extractor = _EXTRACTORS.get(suffix)
+    if extractor is not None:
+        return extractor(file_path, output_dir, images_subdir, extract_images, extract_metadata, sink)
     
     # 旧格式需要转换
-    elif suffix in [".doc", ".ppt", ".xls"]:
+    elif suffix in _LEGACY_SUFFIXES:
         # 尝试初始化 win32com
         if not _init_win32com():
             raise ImportError(
@@ -788,158 +1481,287 @@ def extract_office_content(
                 f"或者将文件另存为新格式 ({suffix}x)"
             )
         
-        # 创建临时目录
-        temp_dir = Path(tempfile.mkdtemp())
-        try:
-            new_path = convert_old_format_to_new(file_path, temp_dir)
+        # 临时目录退出时自动清理（Office 进程可能仍占用文件，忽略清理错误）
+        with _temporary_directory() as tmp:
+            new_path = convert_old_format_to_new(file_path, Path(tmp))
             if not new_path:
                 raise Exception(f"无法转换 {suffix} 格式，请确保安装了对应的 Office 软件")
             
             # 递归调用处理新格式
-            content = extract_office_content(new_path, output_dir, images_subdir, extract_images)
+            content = _extract_office_content(new_path, output_dir, images_subdir, extract_images, extract_metadata, sink)
             content.file_type = suffix[1:]  # 记录原始格式
             return content
-        finally:
-            # 清理临时文件
-            try:
-                shutil.rmtree(temp_dir, ignore_errors=True)
-            except:
-                pass
     
     else:
         raise ValueError(f"不支持的文件格式: {suffix}")
 
 
-def office_content_to_markdown(
-    content: OfficeContent,
-    file_path: Path,
-    images_subdir: str = "images"
-) -> str:
-    """
-    将Office内容转换为Markdown
+def _markdown_header(content: OfficeContent, file_path: Path, conversion_time: Optional[str] = None) -> str:
+    """生成文档头（标题和元信息），以分隔线结尾"""
+    buf = io.StringIO()
+    w = buf.write
     
-    Args:
-        content: Office文档内容
-        file_path: 原文件路径
-        images_subdir: 图片子目录
-    
-    Returns:
-        Markdown文本
-    """
-    from urllib.parse import quote
-    
-    lines = []
-    
-    # 文档头
     title = content.title or file_path.stem
-    lines.append(f"# {title}")
-    lines.append("")
+    w(f"# {title}\n\n")
     
     # 元信息
-    lines.append(f"> **源文件名**: {file_path.name}")
-    lines.append(f"> **源文件绝对路径**: `{file_path.absolute()}`")
-    lines.append(f"> **文件类型**: {content.file_type.upper()}")
+    w(f"> **源文件名**: {file_path.name}\n")
+    w(f"> **源文件绝对路径**: `{file_path.absolute()}`\n")
+    w(f"> **文件类型**: {content.file_type.upper()}\n")
     if content.metadata.get("author"):
-        lines.append(f"> **作者**: {content.metadata['author']}")
+        w(f"> **作者**: {content.metadata['author']}\n")
     if content.metadata.get("created"):
-        lines.append(f"> **创建时间**: {content.metadata['created']}")
+        w(f"> **创建时间**: {content.metadata['created']}\n")
     try:
-        file_size = file_path.stat().st_size / 1024
-        lines.append(f"> **文件大小**: {file_size:.1f} KB")
-    except:
+        size_kb = file_path.stat().st_size / 1024
+        w(f"> **文件大小**: {size_kb:.1f} KB\n")
+    except OSError:
         pass
-    lines.append(f"> **转换时间**: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    w(f"> **转换时间**: {conversion_time or time.strftime(_DATETIME_FORMAT)}\n")
     if content.total_images > 0:
-        lines.append(f"> **提取图片**: {content.total_images} 张")
-    lines.append("")
-    lines.append("---")
-    lines.append("")
+        w(f"> **提取图片**: {content.total_images} 张\n")
+    w("\n---\n\n")
+    return buf.getvalue()
+
+
+# 表格单元格转义：竖线会被当作列分隔符，换行会截断表格行
+_MD_CELL_TRANS = str.maketrans({"|": "\\|", "\n": " ", "\r": ""})
+
+
+class _MarkdownBlockWriter:
+    """
+    将文本块逐个转换为Markdown并写出
     
-    # 转换内容
-    image_counter = 0
-    for block in content.text_content:
+    既用于 office_content_to_markdown 遍历 text_content，
+    也可直接作为解析函数的 sink，边解析边输出
+    """
+    
+    def __init__(self, write: Callable[[str], Any], file_path: Path, images_subdir: str,
+                 image_links: Optional[Dict[int, str]] = None):
+        self.write = write
+        self.stem = file_path.stem
+        self.images_subdir = images_subdir
+        # 图片编号 -> 已转义的链接路径（包含实际扩展名）；流式输出时为空，使用块中的扩展名
+        self.image_links = image_links or {}
+        self.image_counter = 0
+        self.referenced_indices = set()
+    
+    def __call__(self, block: Dict[str, Any]):
+        w = self.write
         block_type = block.get("type", "paragraph")
         block_content = block.get("content", "")
         
         if block_type == "heading1":
-            lines.append(f"## {block_content}")
-            lines.append("")
+            w(f"## {block_content}\n\n")
         elif block_type == "heading2":
-            lines.append(f"### {block_content}")
-            lines.append("")
+            w(f"### {block_content}\n\n")
         elif block_type == "heading3":
-            lines.append(f"#### {block_content}")
-            lines.append("")
+            w(f"#### {block_content}\n\n")
         elif block_type == "list_item":
-            lines.append(f"- {block_content}")
+            w(f"- {block_content}\n")
         elif block_type == "slide_marker":
-            lines.append("")
-            lines.append(f"---")
-            lines.append("")
-            lines.append(f"### {block_content}")
-            lines.append("")
+            w(f"\n---\n\n### {block_content}\n\n")
         elif block_type == "sheet_marker":
-            lines.append("")
-            lines.append(f"{block_content}")
-            lines.append("")
+            w(f"\n{block_content}\n\n")
         elif block_type == "table":
             table_data = block_content
             if isinstance(table_data, list) and table_data:
-                # 生成Markdown表格
-                lines.append("")
-                # 表头
-                header = table_data[0]
-                lines.append("| " + " | ".join(str(cell) for cell in header) + " |")
-                lines.append("| " + " | ".join("---" for _ in header) + " |")
-                # 数据行
-                for row in table_data[1:]:
-                    lines.append("| " + " | ".join(str(cell) for cell in row) + " |")
-                lines.append("")
+                # 生成Markdown表格：先拼好每行的单元格，再一次性 join 整张表
+                trans = _MD_CELL_TRANS
+                lines = [
+                    " | ".join([(c if type(c) is str else str(c)).translate(trans) for c in row])
+                    for row in table_data
+                ]
+                # 表头之后插入分隔行
+                lines.insert(1, " | ".join(["---"] * len(table_data[0])))
+                w("\n| ")
+                w(" |\n| ".join(lines))
+                w(" |\n\n")
         elif block_type == "image":
-            image_counter += 1
-            img_index = block.get("image_index", image_counter)
-            # 从 content.images 获取正确的文件名（包含实际扩展名）
-            img_filename = None
-            for img in content.images:
-                if img.index == img_index:
-                    img_filename = img.get_filename(file_path.stem)
-                    break
+            self.image_counter += 1
+            self.referenced_indices.add(block.get("image_index"))
+            img_index = block.get("image_index", self.image_counter)
+            img_link = self.image_links.get(img_index)
             # 如果找不到，使用 block 中的扩展名，否则默认 png
-            if not img_filename:
+            if not img_link:
                 img_ext = block.get("image_ext", "png")
-                img_filename = f"{file_path.stem}_img{img_index}.{img_ext}"
-            img_path = f"{images_subdir}/{quote(img_filename)}"
-            lines.append(f"![图片{img_index}]({img_path})")
-            lines.append("")
+                img_link = f"{self.images_subdir}/{quote(f'{self.stem}_img{img_index}.{img_ext}')}"
+            w(f"![图片{img_index}]({img_link})\n\n")
         else:
             # 普通段落
-            lines.append(block_content)
-            lines.append("")
-    
-    # 添加未在 text_content 中引用的图片（DOCX/XLSX 的图片）
-    referenced_indices = {
-        block.get("image_index") 
-        for block in content.text_content 
-        if block.get("type") == "image"
-    }
-    unreferenced_images = [img for img in content.images if img.index not in referenced_indices]
-    
-    if unreferenced_images:
-        lines.append("")
-        lines.append("---")
-        lines.append("")
-        lines.append("## 文档图片")
-        lines.append("")
+            w(f"{block_content}\n\n")
+    
+    def write_unreferenced_images(self, images: List[ExtractedImage]):
+        """添加未在文本块中引用的图片（DOCX/XLSX 的图片）"""
+        unreferenced_images = [img for img in images if img.index not in self.referenced_indices]
+        if not unreferenced_images:
+            return
+        
+        w = self.write
+        w("\n---\n\n## 文档图片\n\n")
         for img in unreferenced_images:
-            img_filename = img.get_filename(file_path.stem)
-            img_path = f"{images_subdir}/{quote(img_filename)}"
+            img_filename = img.get_filename(self.stem)
             alt_text = f"图片{img.index}"
             if img.width and img.height:
                 alt_text += f" ({img.width}x{img.height})"
-            lines.append(f"![{alt_text}]({img_path})")
-            lines.append("")
+            w(f"![{alt_text}]({self.images_subdir}/{quote(img_filename)})\n\n")
+
+
+def office_content_to_markdown(
+    content: OfficeContent,
+    file_path: Path,
+    images_subdir: str = "images",
+    conversion_time: Optional[str] = None,
+    *,
+    out: Optional[IO[str]] = None
+) -> Optional[str]:
+    """
+    将Office内容转换为Markdown
     
-    return "\n".join(lines)
+    Args:
+        content: Office文档内容
+        file_path: 原文件路径
+        images_subdir: 图片子目录
+        conversion_time: 转换时间文本（批量转换时共用，默认取当前时间）
+        out: 文本输出流；提供时直接写入（不在内存中拼出完整文本）
+    
+    Returns:
+        Markdown文本；提供 out 时返回 None
+    """
+    if out is not None:
+        trim = _TrimLastWriter(out.write)
+        _write_office_markdown(trim.write, content, file_path, images_subdir, conversion_time)
+        trim.finish()
+        return None
+    
+    buf = io.StringIO()
+    _write_office_markdown(buf.write, content, file_path, images_subdir, conversion_time)
+    return buf.getvalue()[:-1]
+
+
+class _TrimLastWriter:
+    """转发写入，但始终暂存最后一段，结束时去掉末尾一个字符（末尾换行）"""
+    
+    def __init__(self, write: Callable[[str], Any]):
+        self._write = write
+        self._last = ""
+    
+    def write(self, text: str):
+        if text:
+            if self._last:
+                self._write(self._last)
+            self._last = text
+    
+    def finish(self):
+        self._write(self._last[:-1])
+        self._last = ""
+
+
+def _write_office_markdown(
+    w: Callable[[str], Any],
+    content: OfficeContent,
+    file_path: Path,
+    images_subdir: str,
+    conversion_time: Optional[str]
+):
+    """依次写出文档头、正文和未引用的图片（每段以换行结尾，由调用方去掉末尾换行）"""
+    w(_markdown_header(content, file_path, conversion_time))
+    
+    # 图片编号 -> 链接路径（包含实际扩展名，只转义一次），同编号取第一个
+    image_links = {}
+    stem = file_path.stem
+    for img in content.images:
+        if img.index not in image_links:
+            image_links[img.index] = f"{images_subdir}/{quote(img.get_filename(stem))}"
+    
+    # 转换内容
+    writer = _MarkdownBlockWriter(w, file_path, images_subdir, image_links)
+    for block in content.text_content:
+        writer(block)
+    writer.write_unreferenced_images(content.images)
+
+
+# 流式输出时正文在内存中缓冲的上限，超过后转存到临时文件
+STREAM_SPOOL_SIZE = 8 * 1024 * 1024
+# 从临时文件读回正文的块大小（字符数）
+STREAM_READ_CHUNK = 1024 * 1024
+
+
+def stream_office_markdown(
+    file_path: Path,
+    output_dir: Path,
+    images_subdir: str = "images",
+    extract_images: bool = True,
+    conversion_time: Optional[str] = None
+) -> Tuple[OfficeContent, Iterator[str]]:
+    """
+    解析Office文档并流式生成Markdown（不在内存中保存全部文本块）
+    
+    解析时每个文本块立即转换为Markdown写入临时缓冲（超过 STREAM_SPOOL_SIZE 时落盘），
+    文档头依赖解析完才知道的图片数量，所以在解析完成后生成，再与正文依次输出。
+    适合行数巨大的表格等文档；输出与 office_content_to_markdown 一致，
+    但不使用解析结果缓存，返回的 content 不包含 text_content / tables。
+    
+    Returns:
+        (content, chunks): 解析结果和Markdown文本块迭代器（依次写入文件即可）
+    """
+    spool = tempfile.SpooledTemporaryFile(
+        max_size=STREAM_SPOOL_SIZE, mode="w+", encoding="utf-8", newline=""
+    )
+    try:
+        writer = _MarkdownBlockWriter(spool.write, file_path, images_subdir)
+        content = _extract_office_content(file_path, output_dir, images_subdir, extract_images, sink=writer)
+        writer.write_unreferenced_images(content.images)
+        header = _markdown_header(content, file_path, conversion_time)
+    except BaseException:
+        spool.close()
+        raise
+    
+    def chunks() -> Iterator[str]:
+        try:
+            spool.seek(0)
+            body = iter(lambda: spool.read(STREAM_READ_CHUNK), "")
+            # 与 office_content_to_markdown 一致去掉末尾换行：始终保留最后一块，结束时截去一个字符
+            last = header
+            for piece in body:
+                yield last
+                last = piece
+            yield last[:-1]
+        finally:
+            spool.close()
+    
+    return content, chunks()
+
+
+def extract_and_write_markdown(
+    file_path: Path,
+    output_md_path: Path,
+    output_dir: Optional[Path] = None,
+    images_subdir: str = "images",
+    extract_images: bool = True,
+    conversion_time: Optional[str] = None
+) -> OfficeContent:
+    """
+    解析Office文档并直接写出Markdown文件（流式，见 stream_office_markdown）
+    
+    Args:
+        file_path: Office文档路径
+        output_md_path: 输出的Markdown文件路径
+        output_dir: 图片输出目录，默认与Markdown文件同目录
+        images_subdir: 图片子目录名
+        extract_images: 是否提取图片
+        conversion_time: 转换时间文本
+    
+    Returns:
+        OfficeContent: 解析结果（不包含 text_content / tables）
+    """
+    output_md_path = Path(output_md_path)
+    if output_dir is None:
+        output_dir = output_md_path.parent
+    content, chunks = stream_office_markdown(file_path, output_dir, images_subdir, extract_images, conversion_time)
+    with open(output_md_path, "w", encoding="utf-8", buffering=1024 * 1024) as f:
+        f.writelines(chunks)
+    return content
 
 
 # 检查依赖状态
@@ -2,7 +2,7 @@
 📖 PDF解析模块
 """
 
-from .extractor import extract_text, extract_pages
+from .extractor import extract_text, extract_pages, iter_pages
 from .layout import analyze_layout
 
-__all__ = ["extract_text", "extract_pages", "analyze_layout"]
+__all__ = ["extract_text", "extract_pages", "iter_pages", "analyze_layout"]
@@ -8,10 +8,15 @@
 """
 
 import os
+import sys
 import io
+import re
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from pathlib import Path
-from typing import List, Dict, Any, Optional, Tuple
-from dataclasses import dataclass, field
+from typing import List, Dict, Any, Optional, Tuple, Iterator
+from collections import Counter
+from dataclasses import dataclass, field, fields
 
 try:
     import fitz  # PyMuPDF
@@ -21,7 +26,23 @@ except ImportError:
     fitz = None
 
 
-@dataclass
+def _slotted_dataclass(cls):
+    """
+    生成带 __slots__ 的 dataclass（每页、每张图片一个实例，不必各带一个 __dict__）
+    
+    Python 3.10+ 直接使用 dataclass(slots=True)；3.9 上在生成 dataclass 后以 __slots__ 重建类
+    """
+    if sys.version_info >= (3, 10):
+        return dataclass(slots=True)(cls)
+    cls = dataclass(cls)
+    names = tuple(f.name for f in fields(cls))
+    namespace = {k: v for k, v in cls.__dict__.items()
+                 if k not in names and k not in ("__dict__", "__weakref__")}
+    namespace["__slots__"] = names
+    return type(cls)(cls.__name__, cls.__bases__, namespace)
+
+
+@_slotted_dataclass
 class ExtractedImage:
     """提取的图片"""
     image_data: bytes
@@ -36,7 +57,7 @@ class ExtractedImage:
         return f"{base_name}_p{self.page_num}_img{self.image_index}.{self.image_ext}"
 
 
-@dataclass
+@_slotted_dataclass
 class PageContent:
     """页面内容"""
     page_num: int
@@ -46,7 +67,7 @@ class PageContent:
     page_image: Optional[bytes] = None  # 整页渲染图片
 
 
-@dataclass
+@_slotted_dataclass
 class PDFContent:
     """PDF全部内容"""
     pages: List[PageContent] = field(default_factory=list)
@@ -54,22 +75,93 @@ class PDFContent:
     total_images: int = 0
 
 
+# 每处理这么多页清空一次 MuPDF 缓存（字体、解码后的图片），扫描版长文档的内存不会随页数增长
+STORE_SHRINK_PAGES = 10
+
+# 每个进程至少分到的页数；页数更少时串行解析（进程启动和重新打开PDF的开销更大）
+PDF_PAGES_PER_WORKER = 50
+# 并行解析页面的最大进程数
+PDF_MAX_WORKERS = min(4, os.cpu_count() or 1)
+
+# 子进程中打开的PDF文档（由 _init_page_worker 设置）
+_worker_doc = None
+
+
+def _shrink_store(page_num: int):
+    """页码到达 STORE_SHRINK_PAGES 的整数倍时清空 MuPDF 缓存"""
+    if page_num % STORE_SHRINK_PAGES == 0:
+        fitz.TOOLS.store_shrink(100)
+
+
+def _init_page_worker(pdf_path: str):
+    """进程池初始化：每个子进程只打开一次PDF"""
+    global _worker_doc
+    _worker_doc = fitz.open(pdf_path)
+
+
+def _extract_page(page, page_num: int, base_name: str, images_dir: Path,
+                  extract_images: bool, writer: Optional["_ImageWriter"] = None,
+                  xref_cache: Optional["_XrefCache"] = None) -> PageContent:
+    """提取单页的文本块和嵌入图片（图片写入 images_dir，传入 writer 时在后台写入）"""
+    page_content = PageContent(page_num=page_num)
+    
+    # 1. 提取文本块（保留位置信息，支持多栏布局）
+    text_dict = page.get_text("dict", flags=fitz.TEXT_PRESERVE_WHITESPACE)
+    page_content.text_blocks = _parse_text_blocks(text_dict)
+    
+    # 2. 提取嵌入图片（只提取PDF中本身就是图片的元素）
+    if extract_images:
+        page_content.images = _extract_page_images(page, page_num, base_name, images_dir,
+                                                   writer, xref_cache)
+    
+    _shrink_store(page_num)
+    return page_content
+
+
+def _extract_page_range(start: int, stop: int, base_name: str, images_dir: Path,
+                        extract_images: bool) -> List[PageContent]:
+    """在子进程中提取 [start, stop) 范围内的页面（图片在子进程中写盘，只回传文件信息）"""
+    xref_cache = _XrefCache(_worker_doc, range(start, stop)) if extract_images else None
+    with _ImageWriter() as writer:
+        return [
+            _extract_page(_worker_doc[index], index + 1, base_name, images_dir, extract_images,
+                          writer, xref_cache)
+            for index in range(start, stop)
+        ]
+
+
+def _page_worker_count(page_count: int, max_workers: Optional[int]) -> int:
+    """决定并行解析页面的进程数（1 表示串行）"""
+    if max_workers is None:
+        # 已在子进程中（如批量转换的进程池按文件并行）时不再嵌套进程池
+        if multiprocessing.parent_process() is not None:
+            return 1
+        max_workers = PDF_MAX_WORKERS
+    return max(1, min(max_workers, page_count // PDF_PAGES_PER_WORKER))
+
+
 def extract_pdf_content(
     pdf_path: Path,
     output_dir: Path,
     images_subdir: str = "images",
     extract_images: bool = True,
-    image_dpi: int = 150
+    image_dpi: int = 150,
+    pdf_bytes: Optional[bytes] = None,
+    max_workers: Optional[int] = None
 ) -> PDFContent:
     """
     深度提取PDF内容（只提取嵌入图片，不渲染整页）
     
+    页数较多时把连续的页段分给多个进程并行解析，结果仍按页码顺序排列
+    
     Args:
         pdf_path: PDF文件路径
         output_dir: 输出目录（图片子目录的父目录）
         images_subdir: 图片子目录名（默认"images"）
         extract_images: 是否提取嵌入图片
         image_dpi: 图片DPI
+        pdf_bytes: 已读入内存的PDF数据（提供时不再读取pdf_path，并在当前进程中串行解析）
+        max_workers: 并行解析的最大进程数（默认 PDF_MAX_WORKERS；在子进程中默认串行）
     
     Returns:
         PDFContent: 提取的全部内容
@@ -77,6 +169,34 @@ def extract_pdf_content(
     if not HAS_PYMUPDF:
         raise ImportError("需要安装 PyMuPDF: pip install PyMuPDF")
     
+    doc = _open_pdf(pdf_path, pdf_bytes)
+    return _extract_open_pdf(doc, pdf_path, output_dir, images_subdir, extract_images,
+                             parallel=pdf_bytes is None, max_workers=max_workers)
+
+
+def _open_pdf(pdf_path: Path, pdf_bytes: Optional[bytes] = None):
+    """打开PDF文档（提供 pdf_bytes 时从内存打开）"""
+    if pdf_bytes is not None:
+        return fitz.open(stream=pdf_bytes, filetype="pdf")
+    return fitz.open(pdf_path)
+
+
+def _extract_open_pdf(
+    doc,
+    pdf_path: Path,
+    output_dir: Path,
+    images_subdir: str,
+    extract_images: bool,
+    parallel: bool = True,
+    max_workers: Optional[int] = None
+) -> PDFContent:
+    """
+    从已打开的文档提取PDF内容（见 extract_pdf_content），完成后关闭文档
+    
+    Args:
+        parallel: 是否允许分段并行解析（子进程按 pdf_path 重新打开文档，
+                  文档从内存数据打开时应为 False）
+    """
     # 创建图片目录
     images_dir = output_dir / images_subdir
     images_dir.mkdir(parents=True, exist_ok=True)
@@ -84,8 +204,6 @@ def extract_pdf_content(
     pdf_content = PDFContent()
     base_name = pdf_path.stem
     
-    doc = fitz.open(pdf_path)
-    
     # 提取元数据
     pdf_content.metadata = {
         "title": doc.metadata.get("title", ""),
@@ -96,25 +214,41 @@ def extract_pdf_content(
         "file_name": pdf_path.name,
     }
     
-    image_counter = 0
-    
-    for page_num, page in enumerate(doc, 1):
-        page_content = PageContent(page_num=page_num)
-        
-        # 1. 提取文本块（保留位置信息，支持多栏布局）
-        text_dict = page.get_text("dict", flags=fitz.TEXT_PRESERVE_WHITESPACE)
-        page_content.text_blocks = _parse_text_blocks(text_dict)
-        
-        # 2. 提取嵌入图片（只提取PDF中本身就是图片的元素）
-        if extract_images:
-            page_images = _extract_page_images(page, page_num, base_name, images_dir)
-            page_content.images = page_images
-            image_counter += len(page_images)
-        
-        pdf_content.pages.append(page_content)
+    page_count = len(doc)
+    workers = _page_worker_count(page_count, max_workers) if parallel else 1
     
-    doc.close()
-    pdf_content.total_images = image_counter
+    if workers <= 1:
+        try:
+            xref_cache = _XrefCache(doc, range(page_count)) if extract_images else None
+            with _ImageWriter() as writer:
+                for page_num, page in enumerate(doc, 1):
+                    pdf_content.pages.append(
+                        _extract_page(page, page_num, base_name, images_dir, extract_images,
+                                      writer, xref_cache)
+                    )
+        finally:
+            doc.close()
+    else:
+        doc.close()
+        # 连续分段，map 按提交顺序返回结果，页面顺序与串行解析一致
+        step = -(-page_count // workers)
+        starts = range(0, page_count, step)
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_page_worker,
+            initargs=(str(pdf_path),)
+        ) as executor:
+            for pages in executor.map(
+                _extract_page_range,
+                starts,
+                [min(start + step, page_count) for start in starts],
+                [base_name] * len(starts),
+                [images_dir] * len(starts),
+                [extract_images] * len(starts)
+            ):
+                pdf_content.pages.extend(pages)
+    
+    pdf_content.total_images = sum(len(page.images) for page in pdf_content.pages)
     
     return pdf_content
 
@@ -123,41 +257,40 @@ def _parse_text_blocks(text_dict: Dict) -> List[Dict[str, Any]]:
     """解析文本块，识别标题、段落等，并去除页眉页脚"""
     blocks = []
     page_height = text_dict.get("height", 842)  # A4默认高度
-    page_width = text_dict.get("width", 595)
+    # 去噪：过滤页眉（顶部5%）和页脚（底部8%）
+    header_limit = page_height * 0.05
+    footer_limit = page_height * 0.92
     
     for block in text_dict.get("blocks", []):
         if block.get("type") != 0:  # 不是文本块
             continue
         
         bbox = block.get("bbox", [0, 0, 0, 0])
-        
-        # 去噪：过滤页眉（顶部5%）和页脚（底部8%）
-        if bbox[1] < page_height * 0.05:  # 顶部区域
-            continue
-        if bbox[3] > page_height * 0.92:  # 底部区域
+        if bbox[1] < header_limit or bbox[3] > footer_limit:
             continue
         
-        block_text = ""
+        line_texts = []
         max_font_size = 0
         is_bold = False
         is_mono = False  # 等宽字体（代码）
         
         for line in block.get("lines", []):
-            line_text = ""
-            for span in line.get("spans", []):
-                line_text += span.get("text", "")
+            spans = line.get("spans", [])
+            line_texts.append("".join([span.get("text", "") for span in spans]))
+            for span in spans:
                 font_size = span.get("size", 12)
-                font_name = span.get("font", "").lower()
                 if font_size > max_font_size:
                     max_font_size = font_size
+                # 粗体和等宽都已确定后不再检查字体名
+                if is_bold and is_mono:
+                    continue
+                font_name = span.get("font", "").lower()
                 if "bold" in font_name:
                     is_bold = True
-                if any(mono in font_name for mono in ["mono", "courier", "consolas", "code"]):
+                if not is_mono and any(mono in font_name for mono in _MONO_FONTS):
                     is_mono = True
-            
-            block_text += line_text + "\n"
         
-        block_text = block_text.strip()
+        block_text = "\n".join(line_texts).strip()
         if not block_text:
             continue
         
@@ -184,6 +317,39 @@ def _parse_text_blocks(text_dict: Dict) -> List[Dict[str, Any]]:
     return blocks
 
 
+# 等宽字体名关键字（代码块）
+_MONO_FONTS = ("mono", "courier", "consolas", "code")
+# 按首字符识别的块类型：引用符号在标题判断之前生效，项目符号在标题判断之后生效
+_QUOTE_CHARS = {ch: "blockquote" for ch in (">", "》", "「", "『")}
+_BULLET_CHARS = {ch: "list_item" for ch in ("•", "·", "-", "*", "●")}
+
+# 标题判断表：(字号档位, 是否粗体) -> (块类型, 首行长度上限)
+# 字号档位：3 为 >=18，2 为 >=14，1 为 >=12，0 为更小；首行过长时继续按列表/段落判断
+_HEADING_RULES = {
+    (3, False): ("heading1", 100),
+    (3, True): ("heading1", 100),
+    (2, True): ("heading1", 100),
+    (2, False): ("heading2", 100),
+    (1, True): ("heading2", 100),
+    (0, True): ("heading3", 80),
+}
+
+
+def _font_size_class(font_size: float) -> int:
+    """字号档位（见 _HEADING_RULES）"""
+    if font_size >= 18:
+        return 3
+    if font_size >= 14:
+        return 2
+    if font_size >= 12:
+        return 1
+    return 0
+
+
+# 页码格式："第X页"、"Page X"、"p. X"、"X / Y"
+_RE_PAGE_NUMBER = re.compile(r'^(第\s*\d+\s*页|page\s*\d+|p\.\s*\d+|\d+\s*/\s*\d+)$', re.IGNORECASE)
+
+
 def _is_page_number(text: str) -> bool:
     """检测是否为页码"""
     text = text.strip()
@@ -191,60 +357,134 @@ def _is_page_number(text: str) -> bool:
     if text.isdigit() and len(text) <= 4:
         return True
     # "第X页" 或 "Page X"
-    import re
-    if re.match(r'^(第\s*\d+\s*页|page\s*\d+|p\.\s*\d+|\d+\s*/\s*\d+)$', text, re.IGNORECASE):
-        return True
-    return False
+    return _RE_PAGE_NUMBER.match(text) is not None
 
 
 def _detect_block_type(text: str, font_size: float, is_bold: bool, is_mono: bool = False) -> str:
-    """检测文本块类型"""
-    lines = text.split("\n")
-    first_line = lines[0].strip() if lines else ""
+    """检测文本块类型（按查表判断，每类规则只做一次字典查找）"""
+    first_line, newline, _ = text.partition("\n")
+    first_line = first_line.strip()
     
-    # 代码块检测
-    if is_mono and len(lines) >= 2:
+    # 代码块检测（等宽字体且至少两行）
+    if is_mono and newline:
         return "code_block"
     
+    first_char = first_line[:1]
+    
     # 引用块检测（以引用符号开头）
-    if first_line.startswith((">", "》", "「", "『")):
-        return "blockquote"
+    block_type = _QUOTE_CHARS.get(first_char)
+    if block_type:
+        return block_type
     
     # 根据字体大小判断标题级别
-    if font_size >= 18 or (is_bold and font_size >= 14):
-        if len(first_line) < 100:
-            return "heading1"
-    elif font_size >= 14 or (is_bold and font_size >= 12):
-        if len(first_line) < 100:
-            return "heading2"
-    elif is_bold and len(first_line) < 80:
-        return "heading3"
+    rule = _HEADING_RULES.get((_font_size_class(font_size), is_bold))
+    if rule and len(first_line) < rule[1]:
+        return rule[0]
     
     # 检测列表
-    if first_line.startswith(("•", "·", "-", "*", "●")):
-        return "list_item"
+    block_type = _BULLET_CHARS.get(first_char)
+    if block_type:
+        return block_type
     if len(first_line) > 2 and first_line[0].isdigit() and first_line[1] in ".):":
         return "numbered_list"
     
     return "paragraph"
 
 
+# 后台写图片文件的线程数
+IMAGE_WRITE_WORKERS = 4
+
+
+def _write_bytes_direct(img_path: Path, data: bytes):
+    """不经过缓冲区直接写入整块图片数据（数据已是完整的一块，缓冲只会多复制一次）"""
+    with open(img_path, "wb", buffering=0) as f:
+        view = memoryview(data)
+        while view:
+            view = view[f.write(view):]
+
+
+class _ImageWriter:
+    """
+    在后台线程中写入图片文件
+    
+    页面仍按顺序解析（MuPDF 继续提取下一张图片时磁盘写入并行进行）；
+    退出时等待全部写完，并从所在页面的图片列表中移除写入失败的图片
+    """
+    
+    def __init__(self):
+        self._pending = []
+        self._executor = ThreadPoolExecutor(max_workers=IMAGE_WRITE_WORKERS)
+    
+    def submit(self, images: List[ExtractedImage], extracted_img: ExtractedImage,
+               img_path: Path, image_data: bytes):
+        """登记图片并提交写入"""
+        images.append(extracted_img)
+        self._pending.append((self._executor.submit(_write_bytes_direct, img_path, image_data),
+                              images, extracted_img))
+    
+    def __enter__(self) -> "_ImageWriter":
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        for future, images, extracted_img in self._pending:
+            if future.exception() is not None:
+                images.remove(extracted_img)
+        self._pending.clear()
+        self._executor.shutdown()
+
+
+class _XrefCache:
+    """
+    同一图片对象（xref）在多页重复出现时（如每页的徽标）只解码一次
+    
+    先统计各 xref 在待解析页面中的出现次数，只缓存出现多次的图片，
+    最后一次使用后即释放；每处出现仍各自写出图片文件，输出与逐次提取一致
+    """
+    
+    def __init__(self, doc, page_indices):
+        counts = Counter(info[0] for index in page_indices for info in doc.get_page_images(index))
+        self._remaining = {xref: count for xref, count in counts.items() if count > 1}
+        self._images: Dict[int, Optional[dict]] = {}
+    
+    def extract(self, extract_image, xref: int) -> Optional[dict]:
+        """返回 extract_image(xref) 的结果，重复出现的图片复用首次解码结果"""
+        remaining = self._remaining.get(xref)
+        if remaining is None:
+            return extract_image(xref)
+        if remaining > 1:
+            self._remaining[xref] = remaining - 1
+        else:
+            del self._remaining[xref]
+        if xref in self._images:
+            return self._images[xref] if remaining > 1 else self._images.pop(xref)
+        base_image = extract_image(xref)
+        if remaining > 1:
+            self._images[xref] = base_image
+        return base_image
+
+
 def _extract_page_images(
     page, 
     page_num: int, 
     base_name: str, 
-    images_dir: Path
+    images_dir: Path,
+    writer: Optional[_ImageWriter] = None,
+    xref_cache: Optional[_XrefCache] = None
 ) -> List[ExtractedImage]:
-    """提取页面中的嵌入图片"""
+    """提取页面中的嵌入图片（传入 writer 时图片文件在后台线程写入，传入 xref_cache 时重复图片只解码一次）"""
     images = []
     image_list = page.get_images(full=True)
+    extract_image = page.parent.extract_image
     
     for img_index, img_info in enumerate(image_list):
         try:
             xref = img_info[0]
             
             # 提取图片
-            base_image = page.parent.extract_image(xref)
+            if xref_cache is not None:
+                base_image = xref_cache.extract(extract_image, xref)
+            else:
+                base_image = extract_image(xref)
             if not base_image:
                 continue
             
@@ -269,11 +509,14 @@ def _extract_page_images(
             # 保存图片
             img_filename = extracted_img.get_filename(base_name)
             img_path = images_dir / img_filename
-            img_path.write_bytes(image_data)
             
             # 存储文件名而非数据
             extracted_img.image_data = b""  # 清空数据节省内存
-            images.append(extracted_img)
+            if writer is not None:
+                writer.submit(images, extracted_img, img_path, image_data)
+            else:
+                img_path.write_bytes(image_data)
+                images.append(extracted_img)
             
         except Exception as e:
             # 跳过无法提取的图片
@@ -282,43 +525,6 @@ def _extract_page_images(
     return images
 
 
-def _has_complex_graphics(page) -> bool:
-    """检测页面是否包含复杂图形（矢量图、图表等）"""
-    try:
-        # 获取页面绘图命令
-        drawings = page.get_drawings()
-        
-        # 如果有很多绘图命令，可能是复杂图表
-        if len(drawings) > 20:
-            return True
-        
-        # 检查是否有路径绘制
-        for d in drawings:
-            if d.get("items"):
-                # 包含线条、曲线等
-                return True
-        
-        return False
-    except:
-        return False
-
-
-def _render_page_to_image(page, dpi: int = 150) -> Optional[bytes]:
-    """将页面渲染为PNG图片"""
-    try:
-        # 计算缩放比例
-        zoom = dpi / 72.0
-        mat = fitz.Matrix(zoom, zoom)
-        
-        # 渲染页面
-        pix = page.get_pixmap(matrix=mat, alpha=False)
-        
-        # 转换为PNG
-        return pix.tobytes("png")
-    except Exception as e:
-        return None
-
-
 # 兼容旧API
 def extract_text(pdf_path: Path) -> str:
     """从PDF提取全部文本（兼容旧API）"""
@@ -326,29 +532,36 @@ def extract_text(pdf_path: Path) -> str:
         raise ImportError("需要安装 PyMuPDF: pip install PyMuPDF")
     
     doc = fitz.open(pdf_path)
-    text = ""
-    for page in doc:
-        text += page.get_text()
+    parts = []
+    for page_num, page in enumerate(doc, 1):
+        parts.append(page.get_text())
+        _shrink_store(page_num)
     doc.close()
-    return text
+    return "".join(parts)
 
 
-def extract_pages(pdf_path: Path) -> List[Dict[str, Any]]:
-    """逐页提取PDF内容（兼容旧API）"""
+def iter_pages(pdf_path: Path) -> Iterator[Dict[str, Any]]:
+    """逐页产生PDF内容（调用方处理完一页再提取下一页，不同时持有全部页面文本）"""
     if not HAS_PYMUPDF:
-        return []
+        return
     
-    pages = []
     doc = fitz.open(pdf_path)
-    for page_num, page in enumerate(doc):
-        pages.append({
-            "page_num": page_num + 1,
-            "text": page.get_text(),
-            "width": page.rect.width,
-            "height": page.rect.height,
-        })
-    doc.close()
-    return pages
+    try:
+        for page_num, page in enumerate(doc, 1):
+            yield {
+                "page_num": page_num,
+                "text": page.get_text(),
+                "width": page.rect.width,
+                "height": page.rect.height,
+            }
+            _shrink_store(page_num)
+    finally:
+        doc.close()
+
+
+def extract_pages(pdf_path: Path) -> List[Dict[str, Any]]:
+    """逐页提取PDF内容（兼容旧API）"""
+    return list(iter_pages(pdf_path))
 
 
 # ========== OCR 支持 ==========
@@ -358,7 +571,9 @@ try:
     from ocr_engine import (
         is_ocr_available, 
         is_scanned_pdf, 
+        is_scanned_doc,
         ocr_pdf_page,
+        PdfOcrSession,
         get_ocr_status
     )
     HAS_OCR = True
@@ -366,6 +581,7 @@ except ImportError:
     HAS_OCR = False
     is_ocr_available = lambda: False
     is_scanned_pdf = lambda *args, **kwargs: False
+    is_scanned_doc = lambda *args, **kwargs: False
 
 
 def extract_pdf_content_with_ocr(
@@ -377,7 +593,8 @@ def extract_pdf_content_with_ocr(
     enable_ocr: bool = True,
     ocr_lang: str = "chi_sim+eng",
     ocr_dpi: int = 300,
-    progress_callback: callable = None
+    progress_callback: callable = None,
+    pdf_bytes: Optional[bytes] = None
 ) -> PDFContent:
     """
     提取PDF内容，支持扫描版PDF的OCR识别
@@ -392,6 +609,7 @@ def extract_pdf_content_with_ocr(
         ocr_lang: OCR语言（默认中英文）
         ocr_dpi: OCR渲染DPI（越高越清晰但越慢）
         progress_callback: 进度回调 callback(message, current, total)
+        pdf_bytes: 已读入内存的PDF数据（提供时从内存打开文档，OCR会话复用该文档）
     
     Returns:
         PDFContent: 提取的内容
@@ -399,20 +617,43 @@ def extract_pdf_content_with_ocr(
     if not HAS_PYMUPDF:
         raise ImportError("需要安装 PyMuPDF: pip install PyMuPDF")
     
-    # 检测是否为扫描版PDF
-    use_ocr = False
-    if enable_ocr and HAS_OCR and is_ocr_available():
-        if is_scanned_pdf(pdf_path):
-            use_ocr = True
-            if progress_callback:
-                progress_callback("检测到扫描版PDF，将使用OCR识别...", 0, 0)
-    
-    # 如果不需要OCR，使用普通提取
+    # 文档只打开一次：扫描版检测、普通提取和OCR流程共用
+    doc = _open_pdf(pdf_path, pdf_bytes)
+    try:
+        # 检测是否为扫描版PDF
+        use_ocr = False
+        if enable_ocr and HAS_OCR and is_ocr_available():
+            if is_scanned_doc(doc):
+                use_ocr = True
+                if progress_callback:
+                    progress_callback("检测到扫描版PDF，将使用OCR识别...", 0, 0)
+    except BaseException:
+        doc.close()
+        raise
+    
+    # 如果不需要OCR，使用普通提取（由 _extract_open_pdf 关闭文档）
     if not use_ocr:
-        return extract_pdf_content(
-            pdf_path, output_dir, images_subdir, extract_images, image_dpi
-        )
+        return _extract_open_pdf(doc, pdf_path, output_dir, images_subdir, extract_images,
+                                 parallel=pdf_bytes is None)
     
+    try:
+        return _ocr_open_pdf(doc, pdf_path, output_dir, images_subdir, extract_images,
+                             ocr_lang, ocr_dpi, progress_callback)
+    finally:
+        doc.close()
+
+
+def _ocr_open_pdf(
+    doc,
+    pdf_path: Path,
+    output_dir: Path,
+    images_subdir: str,
+    extract_images: bool,
+    ocr_lang: str,
+    ocr_dpi: int,
+    progress_callback: callable = None
+) -> PDFContent:
+    """对已打开的文档逐页OCR（见 extract_pdf_content_with_ocr），文档由调用方关闭"""
     # OCR 提取流程
     images_dir = output_dir / images_subdir
     images_dir.mkdir(parents=True, exist_ok=True)
@@ -420,7 +661,6 @@ def extract_pdf_content_with_ocr(
     pdf_content = PDFContent()
     base_name = pdf_path.stem
     
-    doc = fitz.open(pdf_path)
     total_pages = len(doc)
     
     # 提取元数据
@@ -436,44 +676,45 @@ def extract_pdf_content_with_ocr(
     }
     
     image_counter = 0
+    # OCR会话直接使用已打开的文档（从内存打开时同样适用），不再按路径打开第二次
+    with PdfOcrSession(pdf_path, doc=doc) as ocr_session:
+        for page_num in range(total_pages):
+            if progress_callback:
+                progress_callback(f"OCR识别第 {page_num+1}/{total_pages} 页...", page_num+1, total_pages)
+            
+            page = doc[page_num]
+            page_content = PageContent(page_num=page_num + 1)
+            
+            # OCR 识别该页
+            ocr_result = ocr_session.ocr_page(page_num, lang=ocr_lang, dpi=ocr_dpi)
+            
+            if ocr_result.text.strip():
+                # 将OCR文本作为段落添加
+                # 简单按段落分割
+                paragraphs = ocr_result.text.split('\n\n')
+                for para in paragraphs:
+                    para = para.strip()
+                    if para:
+                        page_content.text_blocks.append({
+                            "type": "paragraph",
+                            "content": para,
+                            "font_size": 12,
+                            "is_bold": False,
+                            "is_mono": False,
+                            "bbox": [0, 0, 0, 0],
+                            "x": 0,
+                            "ocr_confidence": ocr_result.confidence,
+                        })
+            
+            # 仍然提取嵌入图片
+            if extract_images:
+                page_images = _extract_page_images(page, page_num + 1, base_name, images_dir)
+                page_content.images = page_images
+                image_counter += len(page_images)
+            
+            pdf_content.pages.append(page_content)
+            _shrink_store(page_num + 1)
     
-    for page_num in range(total_pages):
-        if progress_callback:
-            progress_callback(f"OCR识别第 {page_num+1}/{total_pages} 页...", page_num+1, total_pages)
-        
-        page = doc[page_num]
-        page_content = PageContent(page_num=page_num + 1)
-        
-        # OCR 识别该页
-        ocr_result = ocr_pdf_page(pdf_path, page_num, lang=ocr_lang, dpi=ocr_dpi)
-        
-        if ocr_result.text.strip():
-            # 将OCR文本作为段落添加
-            # 简单按段落分割
-            paragraphs = ocr_result.text.split('\n\n')
-            for para in paragraphs:
-                para = para.strip()
-                if para:
-                    page_content.text_blocks.append({
-                        "type": "paragraph",
-                        "content": para,
-                        "font_size": 12,
-                        "is_bold": False,
-                        "is_mono": False,
-                        "bbox": [0, 0, 0, 0],
-                        "x": 0,
-                        "ocr_confidence": ocr_result.confidence,
-                    })
-        
-        # 仍然提取嵌入图片
-        if extract_images:
-            page_images = _extract_page_images(page, page_num + 1, base_name, images_dir)
-            page_content.images = page_images
-            image_counter += len(page_images)
-        
-        pdf_content.pages.append(page_content)
-    
-    doc.close()
     pdf_content.total_images = image_counter
     
     return pdf_content
@@ -38,19 +38,26 @@ def _analyze_page(text: str, page_num: int) -> List[Dict[str, Any]]:
     return blocks
 
 
+# 块类型识别规则（模块加载时编译一次）
+_RE_CHAPTER = re.compile(r"^第[一二三四五六七八九十\d]+[章节]")
+_RE_SECTION = re.compile(r"^[\d一二三四五六七八九十]+[\.、．]")
+_RE_BULLET = re.compile(r"^[•●○◆◇▪▫\-\*]\s")
+_RE_NUMBERED = re.compile(r"^\d+[\.\)）]\s")
+
+
 def _detect_block_type(line: str) -> str:
     """检测内容块类型"""
-    if re.match(r"^第[一二三四五六七八九十\d]+[章节]", line):
+    if _RE_CHAPTER.match(line):
         return "heading1"
     
-    if re.match(r"^[\d一二三四五六七八九十]+[\.、．]", line):
+    if _RE_SECTION.match(line):
         if len(line) < 50:
             return "heading2"
     
-    if re.match(r"^[•●○◆◇▪▫\-\*]\s", line):
+    if _RE_BULLET.match(line):
         return "list_item"
     
-    if re.match(r"^\d+[\.\)）]\s", line):
+    if _RE_NUMBERED.match(line):
         return "numbered_list"
     
     return "paragraph"
@@ -5,4 +5,5 @@
 - test_extractor.py: PDF解析测试
 - test_converter.py: Markdown转换测试
 - test_app.py: 应用逻辑测试
+- test_office_parser.py: Office文档解析测试
 """
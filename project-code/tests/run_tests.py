@@ -4,78 +4,203 @@
 运行所有单元测试并生成详细报告（带进度条和明细）
 """
 
+import os
+import io
 import sys
+import contextlib
+import importlib
 import unittest
 import time
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from datetime import datetime
-from typing import Dict, List
+from typing import Dict, List, Optional
 
-# 添加父目录到路径
-sys.path.insert(0, str(Path(__file__).parent.parent))
+# 测试目录（按 test_*.py 自动发现测试模块）
+TEST_DIR = Path(__file__).parent
+
+# 添加父目录到路径（已在路径中则不重复添加）
+_PROJECT_DIR = str(TEST_DIR.parent)
+if _PROJECT_DIR not in sys.path:
+    sys.path.insert(0, _PROJECT_DIR)
+
+# 报告中的边框和标题行
+_BOX_TOP = "╔" + "═" * 58 + "╗"
+_BOX_SEPARATOR = "╠" + "═" * 58 + "╣"
+_BOX_BOTTOM = "╚" + "═" * 58 + "╝"
+_TITLE_LINE = "║" + "  📋 PDF-MD-TOOLS 测试套件  ".center(58) + "║"
+_SUMMARY_LINE = "║" + "  📊 测试结果总结  ".center(58) + "║"
+_PASSED_LINE = "║" + "  🎉 所有测试通过！  ".center(58) + "║"
+_FAILED_LINE = "║" + "  ⚠️ 存在测试失败或错误  ".center(58) + "║"
+
+
+class _TestRecord:
+    """子进程中单个测试的运行记录（可pickle，在主进程中代替 TestCase 显示进度和汇总）"""
+    
+    def __init__(self, test, status: str, elapsed: float, detail: str = ""):
+        self.status = status
+        self.elapsed = elapsed
+        self.detail = detail  # 失败/错误的堆栈，或跳过原因
+        self.module_name = test.__class__.__module__
+        self._testMethodName = getattr(test, "_testMethodName", str(test))
+        self._testMethodDoc = getattr(test, "_testMethodDoc", None)
+        self._str = str(test)
+    
+    def __str__(self) -> str:
+        return self._str
+
+
+def _subtest_status(test, err, current: Optional[str]) -> str:
+    """合并子测试失败后的测试状态（断言失败为 failed，其他异常为 error，error 优先）"""
+    if current == "error" or not issubclass(err[0], test.failureException):
+        return "error"
+    return "failed"
+
+
+class _RecordingResult(unittest.TestResult):
+    """子进程中使用的测试结果：只记录每个测试的状态和耗时"""
+    
+    def __init__(self):
+        super().__init__()
+        self.buffer = True
+        self.records: List[_TestRecord] = []
+        self._start_time = 0
+        self._subtest_status: Optional[str] = None
+        self._subtest_details: List[str] = []
+    
+    def startTest(self, test):
+        super().startTest(test)
+        self._start_time = time.monotonic()
+        self._subtest_status = None
+        self._subtest_details = []
+    
+    def stopTest(self, test):
+        if self._subtest_status:
+            self._record(test, self._subtest_status, "\n".join(self._subtest_details))
+        super().stopTest(test)
+    
+    def _record(self, test, status: str, detail: str = ""):
+        self.records.append(_TestRecord(test, status, time.monotonic() - self._start_time, detail))
+    
+    def addSuccess(self, test):
+        super().addSuccess(test)
+        self._record(test, "passed")
+    
+    def addFailure(self, test, err):
+        super().addFailure(test, err)
+        self._record(test, "failed", self.failures[-1][1])
+    
+    def addError(self, test, err):
+        super().addError(test, err)
+        self._record(test, "error", self.errors[-1][1])
+    
+    def addSkip(self, test, reason):
+        super().addSkip(test, reason)
+        self._record(test, "skipped", reason)
+    
+    def addSubTest(self, test, subtest, err):
+        super().addSubTest(test, subtest, err)
+        if err is not None:
+            self._subtest_status = _subtest_status(test, err, self._subtest_status)
+            problems = self.failures if issubclass(err[0], test.failureException) else self.errors
+            self._subtest_details.append(problems[-1][1])
+
+
+def _run_module(module_name: str) -> List[_TestRecord]:
+    """在子进程中运行一个测试模块（顶层函数，可被pickle）"""
+    # 失败测试捕获到的输出已包含在堆栈记录中，不再另外回显到子进程的标准输出
+    with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+        result = _RecordingResult()
+        unittest.defaultTestLoader.loadTestsFromName(module_name).run(result)
+    return result.records
 
 
 class ProgressTestResult(unittest.TestResult):
     """带进度显示的测试结果"""
     
+    # 每输出这么多个测试的状态刷新一次标准输出
+    FLUSH_EVERY = 16
+    # 测试状态 -> 模块统计中的计数项
+    STATUS_KEYS = {"passed": "passed", "failed": "failed", "error": "errors", "skipped": "skipped"}
+    
     def __init__(self, total_tests: int):
         super().__init__()
+        # 捕获测试自身的输出，只在失败或出错时显示；进度写入创建时的标准输出（测试期间 sys.stdout 被替换）
+        self.buffer = True
+        self.stream = sys.stdout
         self.total_tests = total_tests
         self.current_test = 0
-        self.test_times: Dict[str, float] = {}
+        self.test_times: Dict[unittest.TestCase, float] = {}
         self.current_start_time = 0
+        self._subtest_status: Optional[str] = None
         self.module_results: Dict[str, Dict] = {}
+        # 各进度条宽度下所有可能的进度条图案（按已填充格数索引）
+        self._bars: Dict[int, List[str]] = {}
         
     def _get_progress_bar(self, width: int = 30) -> str:
         """生成进度条"""
         if self.total_tests == 0:
             return "[" + "=" * width + "]"
         
+        bars = self._bars.get(width)
+        if bars is None:
+            bars = self._bars[width] = ["█" * i + "░" * (width - i) for i in range(width + 1)]
+        
         progress = self.current_test / self.total_tests
-        filled = int(width * progress)
-        bar = "█" * filled + "░" * (width - filled)
         percent = int(progress * 100)
-        return f"[{bar}] {percent}%"
+        return f"[{bars[min(width, int(width * progress))]}] {percent}%"
     
     def _get_module_name(self, test) -> str:
         """获取测试模块名"""
+        if isinstance(test, _TestRecord):
+            return test.module_name
         return test.__class__.__module__
     
-    def _print_status(self, test, status: str, status_icon: str):
-        """打印测试状态"""
+    def _print_status(self, test, status: str, status_icon: str, elapsed: Optional[float] = None):
+        """打印测试状态（elapsed 未提供时按本进程的计时计算）"""
         self.current_test += 1
-        elapsed = time.time() - self.current_start_time
-        self.test_times[str(test)] = elapsed
-        
-        module = self._get_module_name(test)
-        if module not in self.module_results:
-            self.module_results[module] = {"passed": 0, "failed": 0, "errors": 0, "skipped": 0}
+        if elapsed is None:
+            elapsed = time.monotonic() - self.current_start_time
+        self.test_times[test] = elapsed
         
         # 更新模块统计
-        if status == "passed":
-            self.module_results[module]["passed"] += 1
-        elif status == "failed":
-            self.module_results[module]["failed"] += 1
-        elif status == "error":
-            self.module_results[module]["errors"] += 1
-        elif status == "skipped":
-            self.module_results[module]["skipped"] += 1
+        module = self._get_module_name(test)
+        stats = self.module_results.get(module)
+        if stats is None:
+            stats = self.module_results[module] = {
+                "passed": 0, "failed": 0, "errors": 0, "skipped": 0
+            }
+        stats[self.STATUS_KEYS[status]] += 1
         
-        # 打印进度
+        # 打印进度（整块状态一次写出；每 FLUSH_EVERY 个测试或出现失败/错误时才刷新输出）
         progress_bar = self._get_progress_bar()
         test_name = test._testMethodName
         test_doc = test._testMethodDoc or ""
         
-        print(f"\r{progress_bar} ({self.current_test}/{self.total_tests})")
-        print(f"  {status_icon} {test_name}")
+        lines = [
+            f"{progress_bar} ({self.current_test}/{self.total_tests})",
+            f"  {status_icon} {test_name}",
+        ]
         if test_doc:
-            print(f"     └─ {test_doc}")
-        print(f"     ⏱️  {elapsed*1000:.1f}ms")
-        print()
+            lines.append(f"     └─ {test_doc}")
+        lines.append(f"     ⏱️  {elapsed*1000:.1f}ms\n\n")
+        self.stream.write("\n".join(lines))
+        if (status in ("failed", "error") or self.current_test % self.FLUSH_EVERY == 0
+                or self.current_test == self.total_tests):
+            self.stream.flush()
     
     def startTest(self, test):
         super().startTest(test)
-        self.current_start_time = time.time()
+        self.current_start_time = time.monotonic()
+        self._subtest_status = None
+    
+    def stopTest(self, test):
+        # 有子测试失败时 unittest 不会再调用 addSuccess/addFailure，在这里输出该测试的状态
+        if self._subtest_status == "failed":
+            self._print_status(test, "failed", "❌")
+        elif self._subtest_status == "error":
+            self._print_status(test, "error", "💥")
+        super().stopTest(test)
     
     def addSuccess(self, test):
         super().addSuccess(test)
@@ -92,6 +217,27 @@ class ProgressTestResult(unittest.TestResult):
     def addSkip(self, test, reason):
         super().addSkip(test, reason)
         self._print_status(test, "skipped", "⏭️")
+    
+    def addSubTest(self, test, subtest, err):
+        super().addSubTest(test, subtest, err)
+        if err is not None:
+            self._subtest_status = _subtest_status(test, err, self._subtest_status)
+    
+    def add_record(self, record: _TestRecord):
+        """并入子进程中运行的测试记录"""
+        self.testsRun += 1
+        if record.status == "failed":
+            self.failures.append((record, record.detail))
+            icon = "❌"
+        elif record.status == "error":
+            self.errors.append((record, record.detail))
+            icon = "💥"
+        elif record.status == "skipped":
+            self.skipped.append((record, record.detail))
+            icon = "⏭️"
+        else:
+            icon = "✅"
+        self._print_status(record, record.status, icon, record.elapsed)
 
 
 class ProgressTestRunner:
@@ -100,63 +246,117 @@ class ProgressTestRunner:
     def __init__(self):
         self.result = None
     
-    def run(self, suite: unittest.TestSuite) -> ProgressTestResult:
-        """运行测试套件"""
+    def run(self, suite: unittest.TestSuite, total_tests: Optional[int] = None,
+            workers: int = 1) -> ProgressTestResult:
+        """
+        运行测试套件
+        
+        Args:
+            suite: 测试套件
+            total_tests: 已统计的测试总数（未提供时遍历套件统计）
+            workers: 进程数；大于1时各测试模块分别在子进程中运行（同一模块内仍串行，
+                     共用锁文件等资源的测试都在同一模块中）
+        """
         # 计算总测试数
-        total_tests = suite.countTestCases()
+        if total_tests is None:
+            total_tests = suite.countTestCases()
         
         print(f"\n📊 发现 {total_tests} 个测试用例\n")
         print("=" * 60)
         print()
         
         self.result = ProgressTestResult(total_tests)
+        # Ctrl+C 时结束当前测试后停止，而不是直接中断
+        unittest.installHandler()
+        unittest.registerResult(self.result)
         
-        start_time = time.time()
-        suite.run(self.result)
-        end_time = time.time()
+        start_time = time.monotonic()
+        if workers > 1:
+            self._run_parallel(suite, workers)
+        else:
+            suite.run(self.result)
+        end_time = time.monotonic()
         
         self.result.total_time = end_time - start_time
         
         return self.result
+    
+    def _run_parallel(self, suite: unittest.TestSuite, workers: int):
+        """按模块分发到进程池运行，结果按模块顺序并入进度显示"""
+        module_names: List[str] = []
+        failed_imports = []
+        for test in _iter_tests(suite):
+            if test.__class__.__name__ == "_FailedTest":
+                failed_imports.append(test)
+            elif test.__class__.__module__ not in module_names:
+                module_names.append(test.__class__.__module__)
+        
+        with ProcessPoolExecutor(max_workers=min(workers, len(module_names) or 1)) as executor:
+            for records in executor.map(_run_module, module_names):
+                for record in records:
+                    self.result.add_record(record)
+        
+        # 导入失败的模块在主进程中作为出错的测试运行
+        for test in failed_imports:
+            test.run(self.result)
+
+
+def _iter_tests(suite: unittest.TestSuite):
+    """展开嵌套的测试套件"""
+    for item in suite:
+        if isinstance(item, unittest.TestSuite):
+            yield from _iter_tests(item)
+        else:
+            yield item
 
 
-def run_all_tests():
-    """运行所有测试"""
+def _print_problems(title: str, problems):
+    """汇总输出失败/错误详情（整段一次写出）
+
+    只显示堆栈部分的开头，缓冲捕获的 Stdout/Stderr 输出附在空行之后，不计入摘要
+    """
+    buf = io.StringIO()
+    buf.write(f"{title}\n{'-' * 60}\n")
+    for test, traceback in problems:
+        head = traceback.partition("\n\n")[0][:200]
+        buf.write(f"  🔴 {test}\n     {head}...\n")
+    buf.write("\n")
+    sys.stdout.write(buf.getvalue())
+
+
+def run_all_tests(workers: int = 1):
+    """运行所有测试（workers 大于1时按模块并行运行）"""
     print()
-    print("╔" + "═" * 58 + "╗")
-    print("║" + "  📋 PDF-MD-TOOLS 测试套件  ".center(58) + "║")
-    print("╚" + "═" * 58 + "╝")
+    print(_BOX_TOP)
+    print(_TITLE_LINE)
+    print(_BOX_BOTTOM)
     print()
     print(f"⏰ 开始时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     print()
     
-    # 发现并加载测试
+    # 发现并加载测试（新增的 test_*.py 无需登记）
     loader = unittest.TestLoader()
-    suite = unittest.TestSuite()
-    
-    test_modules = [
-        'test_extractor',
-        'test_converter',
-        'test_app',
-    ]
+    suite = loader.discover(str(TEST_DIR), pattern="test_*.py", top_level_dir=str(TEST_DIR))
     
     print("📦 加载测试模块:")
     print("-" * 40)
     
-    module_test_counts = {}
-    for module_name in test_modules:
-        try:
-            module = __import__(module_name)
-            module_suite = loader.loadTestsFromModule(module)
-            count = module_suite.countTestCases()
-            module_test_counts[module_name] = count
-            suite.addTests(module_suite)
-            print(f"  ✅ {module_name}: {count} 个测试")
-        except ImportError as e:
-            print(f"  ❌ {module_name}: 加载失败 - {e}")
+    # 遍历一次套件，同时得到各模块测试数和总数（导入失败的模块也作为一个出错的测试运行）
+    module_test_counts: Dict[str, int] = {}
+    total_tests = 0
+    for test in _iter_tests(suite):
+        total_tests += 1
+        if test.__class__.__name__ == "_FailedTest":  # 导入失败的模块（见 loader.errors）
+            continue
+        module_name = test.__class__.__module__
+        module_test_counts[module_name] = module_test_counts.get(module_name, 0) + 1
+    for module_name, count in module_test_counts.items():
+        print(f"  ✅ {module_name}: {count} 个测试")
+    for error in loader.errors:
+        print(f"  ❌ 加载失败 - {error.strip().splitlines()[-1]}")
     
     print("-" * 40)
-    print(f"  📊 总计: {suite.countTestCases()} 个测试")
+    print(f"  📊 总计: {total_tests} 个测试")
     print()
     
     # 运行测试
@@ -164,7 +364,7 @@ def run_all_tests():
     print("=" * 60)
     
     runner = ProgressTestRunner()
-    result = runner.run(suite)
+    result = runner.run(suite, total_tests, workers)
     
     # 打印模块统计
     print("=" * 60)
@@ -182,14 +382,15 @@ def run_all_tests():
     
     # 打印总结
     print()
-    print("╔" + "═" * 58 + "╗")
-    print("║" + "  📊 测试结果总结  ".center(58) + "║")
-    print("╠" + "═" * 58 + "╣")
+    print(_BOX_TOP)
+    print(_SUMMARY_LINE)
+    print(_BOX_SEPARATOR)
     
+    # 按测试计数（同一测试的多个子测试失败只算一次，与模块统计一致）
     total = result.testsRun
-    failures = len(result.failures)
-    errors = len(result.errors)
-    skipped = len(result.skipped)
+    failures = sum(stats["failed"] for stats in result.module_results.values())
+    errors = sum(stats["errors"] for stats in result.module_results.values())
+    skipped = sum(stats["skipped"] for stats in result.module_results.values())
     passed = total - failures - errors - skipped
     
     pass_rate = (passed / total * 100) if total > 0 else 0
@@ -200,36 +401,26 @@ def run_all_tests():
     print(f"║  💥 错误:  {errors:<10}                                  ║")
     print(f"║  ⏭️ 跳过:  {skipped:<10}                                  ║")
     print(f"║  ⏱️ 耗时:  {result.total_time:.2f} 秒                                ║")
-    print("╚" + "═" * 58 + "╝")
+    print(_BOX_BOTTOM)
     print()
     
     # 显示失败和错误详情
     if failures > 0:
-        print("❌ 失败的测试详情:")
-        print("-" * 60)
-        for test, traceback in result.failures:
-            print(f"  🔴 {test}")
-            print(f"     {traceback[:200]}...")
-        print()
+        _print_problems("❌ 失败的测试详情:", result.failures)
     
     if errors > 0:
-        print("💥 出错的测试详情:")
-        print("-" * 60)
-        for test, traceback in result.errors:
-            print(f"  🔴 {test}")
-            print(f"     {traceback[:200]}...")
-        print()
+        _print_problems("💥 出错的测试详情:", result.errors)
     
     # 最终结果
     if result.wasSuccessful():
-        print("╔" + "═" * 58 + "╗")
-        print("║" + "  🎉 所有测试通过！  ".center(58) + "║")
-        print("╚" + "═" * 58 + "╝")
+        print(_BOX_TOP)
+        print(_PASSED_LINE)
+        print(_BOX_BOTTOM)
         return 0
     else:
-        print("╔" + "═" * 58 + "╗")
-        print("║" + "  ⚠️ 存在测试失败或错误  ".center(58) + "║")
-        print("╚" + "═" * 58 + "╝")
+        print(_BOX_TOP)
+        print(_FAILED_LINE)
+        print(_BOX_BOTTOM)
         return 1
 
 
@@ -241,10 +432,10 @@ def run_specific_test(test_name: str):
     try:
         if '.' in test_name:
             # 运行特定测试方法
-            suite.addTest(unittest.TestLoader().loadTestsFromName(test_name))
+            suite.addTest(loader.loadTestsFromName(test_name))
         else:
-            # 运行整个测试模块
-            module = __import__(test_name)
+            # 运行整个测试模块（已导入的模块直接从 sys.modules 取用）
+            module = sys.modules.get(test_name) or importlib.import_module(test_name)
             suite.addTests(loader.loadTestsFromModule(module))
         
         runner = unittest.TextTestRunner(verbosity=2)
@@ -256,7 +447,11 @@ def run_specific_test(test_name: str):
 
 
 if __name__ == "__main__":
-    if len(sys.argv) > 1:
+    if len(sys.argv) > 1 and sys.argv[1] in ("-j", "--jobs"):
+        # 按模块并行运行所有测试：-j [进程数]（默认CPU核心数）
+        jobs = int(sys.argv[2]) if len(sys.argv) > 2 else (os.cpu_count() or 1)
+        exit_code = run_all_tests(workers=jobs)
+    elif len(sys.argv) > 1:
         # 运行特定测试
         exit_code = run_specific_test(sys.argv[1])
     else:
@@ -10,10 +10,12 @@ import json
 import tempfile
 import unittest
 from pathlib import Path
-from unittest.mock import Mock, patch
+from unittest.mock import patch
 
-# 添加父目录到路径
-sys.path.insert(0, str(Path(__file__).parent.parent))
+# 添加父目录到路径（已在路径中则不重复添加）
+_PROJECT_DIR = str(Path(__file__).parent.parent)
+if _PROJECT_DIR not in sys.path:
+    sys.path.insert(0, _PROJECT_DIR)
 
 # 导入版本信息
 from app import APP_VERSION, APP_BUILD_DATE
@@ -24,12 +26,22 @@ from app import (
     kill_existing_process,
     create_lock_file,
     remove_lock_file,
+    _is_pid_alive,
     LOCK_FILE,
 )
 
 # 导入数据类
 from app import FileItem, ConversionState, ConvertStatus
 
+# 导入转换和扫描函数
+from app import convert_one, _walk_files
+
+try:
+    import fitz
+    HAS_PYMUPDF = True
+except ImportError:
+    HAS_PYMUPDF = False
+
 
 class TestVersionInfo(unittest.TestCase):
     """版本信息测试"""
@@ -79,8 +91,8 @@ class TestFileItem(unittest.TestCase):
         )
         hash1 = item.get_hash()
         
-        # 哈希应该是16字符
-        self.assertEqual(len(hash1), 16)
+        # 标识键由路径和大小组成
+        self.assertEqual(hash1, "test.pdf|1024")
         
         # 相同文件应该产生相同哈希
         item2 = FileItem(
@@ -112,16 +124,20 @@ class TestFileItem(unittest.TestCase):
 class TestConversionState(unittest.TestCase):
     """ConversionState状态管理测试"""
     
-    def setUp(self):
-        """创建临时目录"""
-        self.temp_dir = tempfile.mkdtemp()
-        self.state_file = Path(self.temp_dir) / ".conversion_state.json"
+    @classmethod
+    def setUpClass(cls):
+        """整个测试类共用一个临时目录"""
+        cls._temp = tempfile.TemporaryDirectory()
+        cls.temp_dir = cls._temp.name
     
-    def tearDown(self):
-        """清理临时文件"""
-        if self.state_file.exists():
-            self.state_file.unlink()
-        os.rmdir(self.temp_dir)
+    @classmethod
+    def tearDownClass(cls):
+        """清理临时目录"""
+        cls._temp.cleanup()
+    
+    def setUp(self):
+        """每个测试使用各自的状态文件"""
+        self.state_file = Path(self.temp_dir) / f".conversion_state_{self._testMethodName}.json"
     
     def test_new_state_is_empty(self):
         """新状态文件为空"""
@@ -142,6 +158,7 @@ class TestConversionState(unittest.TestCase):
         state1 = ConversionState(self.state_file)
         state1.mark_converted("hash1", "/path/1.md")
         state1.mark_converted("hash2", "/path/2.md")
+        state1.flush(force=True)
         
         # 重新加载状态
         state2 = ConversionState(self.state_file)
@@ -150,10 +167,65 @@ class TestConversionState(unittest.TestCase):
         self.assertTrue(state2.is_converted("hash2"))
         self.assertFalse(state2.is_converted("hash3"))
     
+    def test_flush_is_debounced(self):
+        """非强制flush在间隔内不落盘"""
+        state = ConversionState(self.state_file)
+        state.mark_converted("hash1", "/path/1.md")
+        state.flush()
+        self.assertFalse(self.state_file.exists())
+        
+        state.flush(force=True)
+        self.assertTrue(self.state_file.exists())
+    
+    def test_flush_failure_is_logged_and_retried(self):
+        """落盘失败时记录日志而不抛出，下次flush重试"""
+        logged = []
+        state = ConversionState(self.state_file, log=lambda message, level: logged.append(level))
+        state.mark_converted("hash1", "/path/1.md")
+        with patch("app.os.replace", side_effect=PermissionError("file in use")):
+            self.assertFalse(state.flush(force=True))
+        self.assertEqual(logged, ["WARNING"])
+        self.assertFalse(self.state_file.exists())
+        self.assertEqual(list(Path(self.temp_dir).glob(".state_*.tmp")), [])
+        
+        self.assertTrue(state.flush(force=True))
+        self.assertTrue(ConversionState(self.state_file).is_converted("hash1"))
+    
+    def test_converted_size_lookup(self):
+        """按路径查询已转换文件的记录大小"""
+        state = ConversionState(self.state_file)
+        item = FileItem(pdf_path=Path("/docs/a.pdf"), pdf_name="a.pdf", md_name="a.md", size=4096)
+        state.mark_converted(item.get_hash(), "/output/a.md")
+        
+        self.assertEqual(state.converted_size(Path("/docs/a.pdf")), 4096)
+        self.assertIsNone(state.converted_size(Path("/docs/b.pdf")))
+    
+    def test_legacy_hash_migration(self):
+        """旧版MD5键可被识别并迁移"""
+        import hashlib
+        pdf_path = Path(self.temp_dir) / "old.pdf"
+        md5 = hashlib.md5()
+        md5.update(str(pdf_path).encode())
+        md5.update(b"2048")
+        with open(self.state_file, 'w', encoding='utf-8') as f:
+            json.dump({md5.hexdigest()[:16]: "/output/old.md"}, f)
+        
+        state = ConversionState(self.state_file)
+        item = FileItem(pdf_path=pdf_path, pdf_name="old.pdf", md_name="old.md", size=2048)
+        self.assertTrue(state.is_converted(item.get_hash()))
+        self.assertEqual(state.converted[item.get_hash()], "/output/old.md")
+    
+    def test_corrupt_state_file(self):
+        """状态文件损坏时从空状态开始"""
+        self.state_file.write_text("{broken", encoding='utf-8')
+        state = ConversionState(self.state_file)
+        self.assertEqual(state.converted, {})
+    
     def test_state_file_format(self):
         """状态文件格式"""
         state = ConversionState(self.state_file)
         state.mark_converted("test_hash", "/output/test.md")
+        state.flush(force=True)
         
         # 读取文件内容
         with open(self.state_file, 'r', encoding='utf-8') as f:
@@ -183,25 +255,23 @@ class TestConvertStatus(unittest.TestCase):
 class TestLockFile(unittest.TestCase):
     """锁文件测试"""
     
+    def setUp(self):
+        """确保每个测试从无锁文件的干净状态开始"""
+        remove_lock_file()
+    
     def tearDown(self):
         """清理锁文件"""
         remove_lock_file()
     
     def test_create_lock_file(self):
         """创建锁文件"""
-        remove_lock_file()  # 确保干净状态
         create_lock_file()
         self.assertTrue(LOCK_FILE.exists())
     
     def test_lock_file_contains_pid(self):
         """锁文件包含进程ID"""
-        remove_lock_file()
         create_lock_file()
-        
-        with open(LOCK_FILE, 'r') as f:
-            pid = f.read().strip()
-        
-        self.assertEqual(pid, str(os.getpid()))
+        self.assertEqual(LOCK_FILE.read_text().strip(), str(os.getpid()))
     
     def test_remove_lock_file(self):
         """删除锁文件"""
@@ -213,20 +283,22 @@ class TestLockFile(unittest.TestCase):
     
     def test_remove_nonexistent_lock_file(self):
         """删除不存在的锁文件不报错"""
-        remove_lock_file()  # 确保不存在
-        remove_lock_file()  # 再次删除不应报错
+        remove_lock_file()  # setUp 已删除，再次删除不应报错
 
 
 class TestProcessCheck(unittest.TestCase):
     """进程检查测试"""
     
+    def setUp(self):
+        """确保每个测试从无锁文件的干净状态开始"""
+        remove_lock_file()
+    
     def tearDown(self):
         """清理"""
         remove_lock_file()
     
     def test_no_existing_process_when_no_lock(self):
         """无锁文件时无老进程"""
-        remove_lock_file()
         result = check_existing_process()
         self.assertFalse(result)
     
@@ -239,6 +311,135 @@ class TestProcessCheck(unittest.TestCase):
         result = check_existing_process()
         # 应该返回False（进程不存在）
         self.assertFalse(result)
+    
+    def test_corrupt_lock_file(self):
+        """锁文件内容损坏时返回False并清理"""
+        with open(LOCK_FILE, 'w') as f:
+            f.write("not-a-pid")
+        
+        self.assertFalse(check_existing_process())
+        self.assertFalse(LOCK_FILE.exists())
+    
+    def test_stale_lock_file_removed(self):
+        """老进程不存在时清理锁文件"""
+        with open(LOCK_FILE, 'w') as f:
+            f.write("99999999")
+        
+        check_existing_process()
+        self.assertFalse(LOCK_FILE.exists())
+    
+    def test_current_pid_is_alive(self):
+        """当前进程PID检测为存活"""
+        self.assertTrue(_is_pid_alive(os.getpid()))
+
+
+class TestWalkFiles(unittest.TestCase):
+    """目录遍历测试"""
+    
+    def test_walk_nested_and_case_insensitive(self):
+        """递归查找子目录，扩展名不区分大小写"""
+        import shutil
+        temp_dir = Path(tempfile.mkdtemp())
+        try:
+            (temp_dir / "sub").mkdir()
+            (temp_dir / "a.pdf").write_bytes(b"")
+            (temp_dir / "sub" / "B.PDF").write_bytes(b"")
+            (temp_dir / "sub" / "c.docx").write_bytes(b"")
+            (temp_dir / "sub" / "d.txt").write_bytes(b"")
+            
+            found = {(entry.name, t) for entry, t in _walk_files(temp_dir, {".pdf": "pdf", ".docx": "docx"})}
+            self.assertEqual(found, {("a.pdf", "pdf"), ("B.PDF", "pdf"), ("c.docx", "docx")})
+        finally:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+class TestConvertOne(unittest.TestCase):
+    """单文件转换函数测试"""
+    
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp())
+    
+    def tearDown(self):
+        import shutil
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+    
+    @unittest.skipUnless(HAS_PYMUPDF, "未安装PyMuPDF")
+    def test_convert_pdf_success(self):
+        """转换成功返回MD路径"""
+        pdf_path = self.temp_dir / "sample.pdf"
+        doc = fitz.open()
+        page = doc.new_page()
+        page.insert_text((72, 200), "Hello PDF", fontsize=12)
+        doc.save(str(pdf_path))
+        doc.close()
+        
+        md_path, images_count, error = convert_one(
+            pdf_path, "pdf", "sample.md", self.temp_dir, "images",
+            enable_ocr=False
+        )
+        self.assertIsNone(error)
+        self.assertEqual(images_count, 0)
+        self.assertTrue(Path(md_path).exists())
+        self.assertIn("Hello PDF", Path(md_path).read_text(encoding="utf-8"))
+    
+    @unittest.skipUnless(HAS_PYMUPDF, "未安装PyMuPDF")
+    def test_convert_without_overwrite_adds_suffix(self):
+        """非覆盖模式下同名MD文件存在时追加序号"""
+        pdf_path = self.temp_dir / "sample.pdf"
+        doc = fitz.open()
+        doc.new_page().insert_text((72, 200), "Hello PDF", fontsize=12)
+        doc.save(str(pdf_path))
+        doc.close()
+        (self.temp_dir / "sample.md").write_text("old", encoding="utf-8")
+        (self.temp_dir / "sample_1.md").write_text("old", encoding="utf-8")
+        
+        md_path, _, error = convert_one(
+            pdf_path, "pdf", "sample.md", self.temp_dir, "images",
+            overwrite=False, enable_ocr=False
+        )
+        self.assertIsNone(error)
+        self.assertEqual(Path(md_path).name, "sample_2.md")
+        self.assertEqual((self.temp_dir / "sample.md").read_text(encoding="utf-8"), "old")
+    
+    @unittest.skipUnless(HAS_PYMUPDF, "未安装PyMuPDF")
+    def test_failed_write_keeps_previous_output(self):
+        """生成Markdown中途出错时保留原MD文件，不留下临时文件或半截文件"""
+        pdf_path = self.temp_dir / "sample.pdf"
+        doc = fitz.open()
+        doc.new_page().insert_text((72, 200), "Hello PDF", fontsize=12)
+        doc.save(str(pdf_path))
+        doc.close()
+        (self.temp_dir / "sample.md").write_text("old", encoding="utf-8")
+        
+        def failing_stream(*args, **kwargs):
+            yield "partial"
+            raise RuntimeError("render failed")
+        
+        for overwrite in (True, False):
+            with self.subTest(overwrite=overwrite):
+                with patch("app.convert_to_markdown_stream", failing_stream):
+                    md_path, _, error = convert_one(
+                        pdf_path, "pdf", "sample.md", self.temp_dir, "images",
+                        overwrite=overwrite, enable_ocr=False
+                    )
+                self.assertIsNone(md_path)
+                self.assertIn("render failed", error)
+                self.assertEqual(sorted(p.name for p in self.temp_dir.iterdir()),
+                                 ["images", "sample.md", "sample.pdf"])
+                self.assertEqual((self.temp_dir / "sample.md").read_text(encoding="utf-8"), "old")
+    
+    def test_convert_invalid_file_returns_error(self):
+        """无效文件返回错误信息而不抛异常"""
+        pdf_path = self.temp_dir / "broken.pdf"
+        pdf_path.write_bytes(b"not a pdf")
+        
+        md_path, images_count, error = convert_one(
+            pdf_path, "pdf", "broken.md", self.temp_dir, "images",
+            enable_ocr=False
+        )
+        self.assertIsNone(md_path)
+        self.assertEqual(images_count, 0)
+        self.assertTrue(error)
 
 
 if __name__ == "__main__":
@@ -7,10 +7,11 @@
 import sys
 import unittest
 from pathlib import Path
-from unittest.mock import Mock
 
-# 添加父目录到路径
-sys.path.insert(0, str(Path(__file__).parent.parent))
+# 添加父目录到路径（已在路径中则不重复添加）
+_PROJECT_DIR = str(Path(__file__).parent.parent)
+if _PROJECT_DIR not in sys.path:
+    sys.path.insert(0, _PROJECT_DIR)
 
 from md_generator.converter import (
     _convert_text_block,
@@ -80,9 +81,9 @@ class TestListConversion(unittest.TestCase):
         """各种项目符号"""
         content = "· First\n- Second\n* Third\n● Fourth"
         result = _convert_list_items(content)
-        lines = result.split("\n")
-        for line in lines:
-            self.assertTrue(line.startswith("- "))
+        lines = result.splitlines()
+        self.assertEqual(len(lines), 4)
+        self.assertTrue(all(line.startswith("- ") for line in lines))
     
     def test_numbered_list_conversion(self):
         """编号列表转换"""
@@ -143,10 +144,9 @@ class TestBlockquoteConversion(unittest.TestCase):
         """多行引用"""
         content = "> Line 1\n> Line 2"
         result = _convert_blockquote(content)
-        lines = result.split("\n")
+        lines = result.splitlines()
         self.assertEqual(len(lines), 2)
-        for line in lines:
-            self.assertTrue(line.startswith("> "))
+        self.assertTrue(all(line.startswith("> ") for line in lines))
 
 
 class TestParagraphConversion(unittest.TestCase):
@@ -191,9 +191,7 @@ class TestContentCleaning(unittest.TestCase):
         """去除行尾空白"""
         content = "Line 1   \nLine 2  "
         result = _clean_content(content)
-        lines = result.split("\n")
-        for line in lines:
-            self.assertEqual(line, line.rstrip())
+        self.assertTrue(all(line == line.rstrip() for line in result.splitlines()))
 
 
 class TestGetFirstLine(unittest.TestCase):
@@ -223,9 +221,10 @@ class TestGetFirstLine(unittest.TestCase):
 class TestFullMarkdownConversion(unittest.TestCase):
     """完整Markdown转换测试"""
     
-    def test_basic_conversion(self):
-        """基本转换"""
-        pdf_content = PDFContent(
+    @classmethod
+    def setUpClass(cls):
+        """每个文档只转换一次，供本类各测试共用"""
+        basic_content = PDFContent(
             pages=[
                 PageContent(
                     page_num=1,
@@ -242,9 +241,22 @@ class TestFullMarkdownConversion(unittest.TestCase):
             },
             total_images=0
         )
+        cls.basic_result = convert_to_markdown(basic_content, Path("test.pdf"), "images")
         
-        pdf_path = Path("test.pdf")
-        result = convert_to_markdown(pdf_content, pdf_path, "images")
+        metadata_content = PDFContent(
+            pages=[],
+            metadata={
+                "title": "My Document",
+                "author": "John Doe",
+                "page_count": 5,
+            },
+            total_images=3
+        )
+        cls.metadata_result = convert_to_markdown(metadata_content, Path("document.pdf"), "images")
+    
+    def test_basic_conversion(self):
+        """基本转换"""
+        result = self.basic_result
         
         # 检查基本结构
         self.assertIn("# Test Document", result)
@@ -255,18 +267,7 @@ class TestFullMarkdownConversion(unittest.TestCase):
     
     def test_metadata_included(self):
         """元数据包含在输出中"""
-        pdf_content = PDFContent(
-            pages=[],
-            metadata={
-                "title": "My Document",
-                "author": "John Doe",
-                "page_count": 5,
-            },
-            total_images=3
-        )
-        
-        pdf_path = Path("document.pdf")
-        result = convert_to_markdown(pdf_content, pdf_path, "images")
+        result = self.metadata_result
         
         self.assertIn("John Doe", result)
         self.assertIn("5", result)
@@ -276,8 +277,9 @@ class TestFullMarkdownConversion(unittest.TestCase):
 class TestIntegration(unittest.TestCase):
     """集成测试"""
     
-    def test_full_document_conversion(self):
-        """完整文档转换"""
+    @classmethod
+    def setUpClass(cls):
+        """完整文档只转换一次，各测试分别检查不同元素"""
         pdf_content = PDFContent(
             pages=[
                 PageContent(
@@ -305,16 +307,22 @@ class TestIntegration(unittest.TestCase):
             total_images=0
         )
         
-        pdf_path = Path("complete.pdf")
-        result = convert_to_markdown(pdf_content, pdf_path, "images")
-        
-        # 检查所有元素都被转换
-        self.assertIn("## Introduction", result)
-        self.assertIn("Welcome to this document.", result)
-        self.assertIn("- Point 1", result)
-        self.assertIn("### Details", result)
-        self.assertIn("```", result)
-        self.assertIn("> Important note", result)
+        cls.result = convert_to_markdown(pdf_content, Path("complete.pdf"), "images")
+    
+    def test_full_document_conversion(self):
+        """完整文档转换：标题与段落"""
+        self.assertIn("## Introduction", self.result)
+        self.assertIn("Welcome to this document.", self.result)
+        self.assertIn("### Details", self.result)
+    
+    def test_list_converted(self):
+        """列表项被转换"""
+        self.assertIn("- Point 1", self.result)
+    
+    def test_code_and_quote_converted(self):
+        """代码块与引用被转换"""
+        self.assertIn("```", self.result)
+        self.assertIn("> Important note", self.result)
 
 
 if __name__ == "__main__":
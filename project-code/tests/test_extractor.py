@@ -5,14 +5,22 @@
 """
 
 import sys
+import shutil
+import tempfile
 import unittest
 from pathlib import Path
-from unittest.mock import Mock, patch, MagicMock
+from unittest.mock import patch
 
-# 添加父目录到路径
-sys.path.insert(0, str(Path(__file__).parent.parent))
+# 添加父目录到路径（已在路径中则不重复添加）
+_PROJECT_DIR = str(Path(__file__).parent.parent)
+if _PROJECT_DIR not in sys.path:
+    sys.path.insert(0, _PROJECT_DIR)
 
+import pdf_parser.extractor as extractor
 from pdf_parser.extractor import (
+    HAS_OCR,
+    HAS_PYMUPDF,
+    extract_pdf_content_with_ocr,
     _parse_text_blocks,
     _detect_block_type,
     _is_page_number,
@@ -21,44 +29,51 @@ from pdf_parser.extractor import (
     PDFContent,
 )
 
+if HAS_PYMUPDF:
+    import fitz
+
+if HAS_OCR:
+    from ocr_engine import OCRResult
+
 
 class TestPageNumberDetection(unittest.TestCase):
     """页码检测测试"""
     
     def test_pure_number_is_page_number(self):
         """纯数字应识别为页码"""
-        self.assertTrue(_is_page_number("1"))
-        self.assertTrue(_is_page_number("42"))
-        self.assertTrue(_is_page_number("100"))
-        self.assertTrue(_is_page_number("999"))
+        for text in ("1", "42", "100", "999"):
+            with self.subTest(text=text):
+                self.assertTrue(_is_page_number(text))
     
     def test_long_number_is_not_page_number(self):
         """超过4位数字不是页码"""
-        self.assertFalse(_is_page_number("12345"))
-        self.assertFalse(_is_page_number("123456"))
+        for text in ("12345", "123456"):
+            with self.subTest(text=text):
+                self.assertFalse(_is_page_number(text))
     
     def test_chinese_page_format(self):
         """中文页码格式"""
-        self.assertTrue(_is_page_number("第1页"))
-        self.assertTrue(_is_page_number("第 10 页"))
-        self.assertTrue(_is_page_number("第100页"))
+        for text in ("第1页", "第 10 页", "第100页"):
+            with self.subTest(text=text):
+                self.assertTrue(_is_page_number(text))
     
     def test_english_page_format(self):
         """英文页码格式"""
-        self.assertTrue(_is_page_number("Page 1"))
-        self.assertTrue(_is_page_number("page 42"))
-        self.assertTrue(_is_page_number("P. 10"))
+        for text in ("Page 1", "page 42", "P. 10"):
+            with self.subTest(text=text):
+                self.assertTrue(_is_page_number(text))
     
     def test_fraction_page_format(self):
         """分数页码格式"""
-        self.assertTrue(_is_page_number("1/10"))
-        self.assertTrue(_is_page_number("5 / 20"))
+        for text in ("1/10", "5 / 20"):
+            with self.subTest(text=text):
+                self.assertTrue(_is_page_number(text))
     
     def test_normal_text_is_not_page_number(self):
         """普通文本不应识别为页码"""
-        self.assertFalse(_is_page_number("Hello World"))
-        self.assertFalse(_is_page_number("第一章 简介"))
-        self.assertFalse(_is_page_number("这是一段文字"))
+        for text in ("Hello World", "第一章 简介", "这是一段文字"):
+            with self.subTest(text=text):
+                self.assertFalse(_is_page_number(text))
 
 
 class TestBlockTypeDetection(unittest.TestCase):
@@ -91,17 +106,32 @@ class TestBlockTypeDetection(unittest.TestCase):
         result = _detect_block_type(long_text, font_size=18, is_bold=True)
         self.assertEqual(result, "paragraph")
     
+    def test_heading_font_size_boundaries(self):
+        """字号档位边界：12/14/18 及粗体组合"""
+        self.assertEqual(_detect_block_type("Title", 18, False), "heading1")
+        self.assertEqual(_detect_block_type("Title", 17.9, False), "heading2")
+        self.assertEqual(_detect_block_type("Title", 14, False), "heading2")
+        self.assertEqual(_detect_block_type("Title", 13.9, True), "heading2")
+        self.assertEqual(_detect_block_type("Title", 13.9, False), "paragraph")
+        self.assertEqual(_detect_block_type("Title", 12, True), "heading2")
+        self.assertEqual(_detect_block_type("Title", 11.9, True), "heading3")
+    
+    def test_long_heading_falls_back_to_list(self):
+        """首行过长的大字号块继续按列表判断"""
+        self.assertEqual(_detect_block_type("• " + "x" * 120, 20, False), "list_item")
+        self.assertEqual(_detect_block_type("• " + "x" * 90, 11, True), "list_item")
+    
     def test_list_item_bullet(self):
         """项目符号列表"""
-        self.assertEqual(_detect_block_type("• Item 1", 12, False), "list_item")
-        self.assertEqual(_detect_block_type("· Item 2", 12, False), "list_item")
-        self.assertEqual(_detect_block_type("- Item 3", 12, False), "list_item")
-        self.assertEqual(_detect_block_type("* Item 4", 12, False), "list_item")
+        for text in ("• Item 1", "· Item 2", "- Item 3", "* Item 4"):
+            with self.subTest(text=text):
+                self.assertEqual(_detect_block_type(text, 12, False), "list_item")
     
     def test_numbered_list(self):
         """编号列表"""
-        self.assertEqual(_detect_block_type("1. First item", 12, False), "numbered_list")
-        self.assertEqual(_detect_block_type("2) Second item", 12, False), "numbered_list")
+        for text in ("1. First item", "2) Second item"):
+            with self.subTest(text=text):
+                self.assertEqual(_detect_block_type(text, 12, False), "numbered_list")
     
     def test_code_block(self):
         """代码块（等宽字体）"""
@@ -119,6 +149,67 @@ class TestBlockTypeDetection(unittest.TestCase):
         self.assertEqual(result, "paragraph")
 
 
+# 文本块解析测试用的页面字典（_parse_text_blocks 不修改输入，各测试直接共用）
+# 页眉、正文、页脚各一块
+_FIXTURE_HEADER_FOOTER = {
+    "height": 842,
+    "width": 595,
+    "blocks": [
+        # 页眉区域（顶部5%以内）
+        {
+            "type": 0,
+            "bbox": [0, 10, 100, 30],  # y=10 < 42.1
+            "lines": [{"spans": [{"text": "Header", "size": 10, "font": "Arial"}]}]
+        },
+        # 正文区域
+        {
+            "type": 0,
+            "bbox": [0, 100, 500, 150],  # 正常位置
+            "lines": [{"spans": [{"text": "Normal content", "size": 12, "font": "Arial"}]}]
+        },
+        # 页脚区域（底部8%以外）
+        {
+            "type": 0,
+            "bbox": [0, 800, 100, 830],  # y=830 > 775
+            "lines": [{"spans": [{"text": "Footer", "size": 10, "font": "Arial"}]}]
+        },
+    ]
+}
+
+# 页面中间的纯页码
+_FIXTURE_PAGE_NUMBER = {
+    "height": 842,
+    "width": 595,
+    "blocks": [
+        {
+            "type": 0,
+            "bbox": [0, 400, 50, 420],  # 中间位置
+            "lines": [{"spans": [{"text": "42", "size": 10, "font": "Arial"}]}]
+        },
+    ]
+}
+
+# 同一行的左右两栏
+_FIXTURE_TWO_COLUMNS = {
+    "height": 842,
+    "width": 595,
+    "blocks": [
+        # 右栏
+        {
+            "type": 0,
+            "bbox": [300, 100, 500, 150],
+            "lines": [{"spans": [{"text": "Right column", "size": 12, "font": "Arial"}]}]
+        },
+        # 左栏（应该先读）
+        {
+            "type": 0,
+            "bbox": [50, 100, 250, 150],
+            "lines": [{"spans": [{"text": "Left column", "size": 12, "font": "Arial"}]}]
+        },
+    ]
+}
+
+
 class TestTextBlockParsing(unittest.TestCase):
     """文本块解析测试"""
     
@@ -140,31 +231,7 @@ class TestTextBlockParsing(unittest.TestCase):
     
     def test_header_footer_filtered(self):
         """页眉页脚被过滤"""
-        text_dict = {
-            "height": 842,
-            "width": 595,
-            "blocks": [
-                # 页眉区域（顶部5%以内）
-                {
-                    "type": 0,
-                    "bbox": [0, 10, 100, 30],  # y=10 < 42.1
-                    "lines": [{"spans": [{"text": "Header", "size": 10, "font": "Arial"}]}]
-                },
-                # 正文区域
-                {
-                    "type": 0,
-                    "bbox": [0, 100, 500, 150],  # 正常位置
-                    "lines": [{"spans": [{"text": "Normal content", "size": 12, "font": "Arial"}]}]
-                },
-                # 页脚区域（底部8%以外）
-                {
-                    "type": 0,
-                    "bbox": [0, 800, 100, 830],  # y=830 > 775
-                    "lines": [{"spans": [{"text": "Footer", "size": 10, "font": "Arial"}]}]
-                },
-            ]
-        }
-        result = _parse_text_blocks(text_dict)
+        result = _parse_text_blocks(_FIXTURE_HEADER_FOOTER)
         
         # 只应保留正文
         self.assertEqual(len(result), 1)
@@ -172,43 +239,14 @@ class TestTextBlockParsing(unittest.TestCase):
     
     def test_page_number_filtered(self):
         """页码被过滤"""
-        text_dict = {
-            "height": 842,
-            "width": 595,
-            "blocks": [
-                {
-                    "type": 0,
-                    "bbox": [0, 400, 50, 420],  # 中间位置
-                    "lines": [{"spans": [{"text": "42", "size": 10, "font": "Arial"}]}]
-                },
-            ]
-        }
-        result = _parse_text_blocks(text_dict)
+        result = _parse_text_blocks(_FIXTURE_PAGE_NUMBER)
         
         # 页码应被过滤
         self.assertEqual(len(result), 0)
     
     def test_blocks_sorted_by_reading_order(self):
         """文本块按阅读顺序排序"""
-        text_dict = {
-            "height": 842,
-            "width": 595,
-            "blocks": [
-                # 右栏
-                {
-                    "type": 0,
-                    "bbox": [300, 100, 500, 150],
-                    "lines": [{"spans": [{"text": "Right column", "size": 12, "font": "Arial"}]}]
-                },
-                # 左栏（应该先读）
-                {
-                    "type": 0,
-                    "bbox": [50, 100, 250, 150],
-                    "lines": [{"spans": [{"text": "Left column", "size": 12, "font": "Arial"}]}]
-                },
-            ]
-        }
-        result = _parse_text_blocks(text_dict)
+        result = _parse_text_blocks(_FIXTURE_TWO_COLUMNS)
         
         # 左栏应该在右栏之前
         self.assertEqual(len(result), 2)
@@ -249,5 +287,59 @@ class TestDataClasses(unittest.TestCase):
         self.assertEqual(content.total_images, 0)
 
 
+@unittest.skipUnless(HAS_PYMUPDF and HAS_OCR, "未安装PyMuPDF或OCR模块")
+class TestOcrExtraction(unittest.TestCase):
+    """扫描版PDF的OCR提取测试（OCR识别以桩函数代替）"""
+    
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp())
+        doc = fitz.open()
+        for _ in range(2):
+            doc.new_page()
+        self.pdf_bytes = doc.tobytes()
+        doc.close()
+        # 视为扫描版并启用OCR
+        for name, value in [("is_ocr_available", lambda: True), ("is_scanned_doc", lambda doc: True)]:
+            patch.object(extractor, name, value).start()
+        self.addCleanup(patch.stopall)
+        self.opened = []
+        real_open = extractor._open_pdf
+        
+        def tracking_open(*args, **kwargs):
+            doc = real_open(*args, **kwargs)
+            self.opened.append(doc)
+            return doc
+        
+        patch.object(extractor, "_open_pdf", tracking_open).start()
+    
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+    
+    def test_ocr_uses_bytes_without_reopening(self):
+        """从内存打开的文档直接用于OCR，不按路径再次打开"""
+        missing_path = self.temp_dir / "not_on_disk.pdf"
+        with patch.object(extractor.PdfOcrSession, "ocr_page",
+                          lambda session, page_num, **kwargs: OCRResult(text=f"page {page_num}",
+                                                                       page_num=page_num)):
+            content = extract_pdf_content_with_ocr(missing_path, self.temp_dir, extract_images=False,
+                                                   pdf_bytes=self.pdf_bytes)
+        texts = [block["content"] for page in content.pages for block in page.text_blocks]
+        self.assertEqual(texts, ["page 0", "page 1"])
+        self.assertTrue(content.metadata["ocr_processed"])
+        self.assertTrue(self.opened[0].is_closed)
+    
+    def test_document_closed_when_page_fails(self):
+        """某页识别抛出异常时仍关闭文档"""
+        def failing_ocr(session, page_num, **kwargs):
+            raise RuntimeError("ocr failed")
+        
+        with patch.object(extractor.PdfOcrSession, "ocr_page", failing_ocr):
+            with self.assertRaises(RuntimeError):
+                extract_pdf_content_with_ocr(self.temp_dir / "scan.pdf", self.temp_dir,
+                                             extract_images=False, pdf_bytes=self.pdf_bytes)
+        self.assertEqual(len(self.opened), 1)
+        self.assertTrue(self.opened[0].is_closed)
+
+
 if __name__ == "__main__":
     unittest.main(verbosity=2)
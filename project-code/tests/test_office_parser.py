@@ -0,0 +1,418 @@
+"""
+📄 Office文档解析测试
+
+测试 office_parser 模块的功能
+"""
+
+import io
+import os
+import re
+import sys
+import shutil
+import tempfile
+import unittest
+import zipfile
+from pathlib import Path
+from unittest.mock import patch
+
+# 添加父目录到路径（已在路径中则不重复添加）
+_PROJECT_DIR = str(Path(__file__).parent.parent)
+if _PROJECT_DIR not in sys.path:
+    sys.path.insert(0, _PROJECT_DIR)
+
+import office_parser
+from office_parser import (
+    HAS_DOCX, HAS_OPENPYXL, HAS_PPTX, HAS_PIL, HAS_RTF,
+    extract_docx_content, extract_xlsx_content, extract_pptx_content, extract_office_content,
+    office_content_to_markdown, stream_office_markdown,
+)
+
+if HAS_DOCX:
+    from docx import Document
+
+if HAS_OPENPYXL:
+    from openpyxl import Workbook, load_workbook
+
+if HAS_PPTX:
+    from pptx import Presentation
+    from pptx.util import Inches
+
+if HAS_PIL:
+    from PIL import Image as PILImage
+
+if HAS_OPENPYXL and HAS_PIL:
+    from openpyxl.drawing.image import Image as XlsxImage
+
+
+def _set_xlsx_dimension(src: Path, dst: Path, ref: str):
+    """复制xlsx并把各工作表的 <dimension> 标记改为指定范围（模拟其他工具写入的过期标记）"""
+    with zipfile.ZipFile(src) as zin, zipfile.ZipFile(dst, "w", zipfile.ZIP_DEFLATED) as zout:
+        for info in zin.infolist():
+            data = zin.read(info.filename)
+            if info.filename.startswith("xl/worksheets/sheet"):
+                data = re.sub(rb'<dimension ref="[^"]*"/>', f'<dimension ref="{ref}"/>'.encode(), data)
+            zout.writestr(info, data)
+
+
+def _open_files() -> set:
+    """当前进程打开的文件路径（仅Linux，通过 /proc/self/fd 获取）"""
+    paths = set()
+    for fd in os.listdir("/proc/self/fd"):
+        try:
+            paths.add(os.readlink(f"/proc/self/fd/{fd}"))
+        except OSError:
+            continue
+    return paths
+
+
+@unittest.skipUnless(HAS_OPENPYXL, "未安装openpyxl")
+class TestXlsxExtraction(unittest.TestCase):
+    """XLSX表格提取测试"""
+    
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.xlsx_path = self.temp_dir / "sheet.xlsx"
+        wb = Workbook()
+        ws = wb.active
+        for row in range(1, 6):
+            for col in range(1, 4):
+                ws.cell(row, col, f"r{row}c{col}")
+        wb.save(self.xlsx_path)
+    
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+    
+    def _expected_table(self):
+        return [[f"r{row}c{col}" for col in range(1, 4)] for row in range(1, 6)]
+    
+    def test_all_cells_extracted(self):
+        """提取全部单元格"""
+        content = extract_xlsx_content(self.xlsx_path, self.temp_dir, extract_images=False)
+        self.assertEqual(content.tables, [self._expected_table()])
+    
+    def test_stale_dimension_ignored(self):
+        """过期的 <dimension> 标记不截断行列"""
+        stale_path = self.temp_dir / "stale.xlsx"
+        _set_xlsx_dimension(self.xlsx_path, stale_path, "A1")
+        content = extract_xlsx_content(stale_path, self.temp_dir, extract_images=False)
+        self.assertEqual(content.tables, [self._expected_table()])
+    
+    def test_dimension_not_starting_at_a1(self):
+        """标记的起始单元格偏后时不丢失前面的行列"""
+        stale_path = self.temp_dir / "offset.xlsx"
+        _set_xlsx_dimension(self.xlsx_path, stale_path, "B2:C3")
+        content = extract_xlsx_content(stale_path, self.temp_dir, extract_images=False)
+        self.assertEqual(content.tables, [self._expected_table()])
+    
+    def test_rows_padded_to_widest_row(self):
+        """各行补齐到最宽行的列数"""
+        wb = Workbook()
+        ws = wb.active
+        ws["A1"] = "a"
+        ws["C2"] = 3
+        wb.save(self.xlsx_path)
+        _set_xlsx_dimension(self.xlsx_path, self.xlsx_path.with_name("padded.xlsx"), "A1")
+        content = extract_xlsx_content(self.xlsx_path.with_name("padded.xlsx"), self.temp_dir,
+                                       extract_images=False)
+        self.assertEqual(content.tables, [[["a", "", ""], ["", "", "3"]]])
+    
+    @unittest.skipUnless(os.path.isdir("/proc/self/fd"), "需要 /proc/self/fd")
+    def test_file_closed_on_error(self):
+        """解析出错时也关闭源文件"""
+        def failing_sink(item):
+            raise RuntimeError("sink failed")
+        
+        with self.assertRaises(RuntimeError):
+            extract_xlsx_content(self.xlsx_path, self.temp_dir, extract_images=False, sink=failing_sink)
+        self.assertNotIn(str(self.xlsx_path), _open_files())
+
+
+
+@unittest.skipUnless(HAS_OPENPYXL and HAS_PIL, "未安装openpyxl或Pillow")
+class TestXlsxImages(unittest.TestCase):
+    """XLSX图片提取测试"""
+    
+    @classmethod
+    def setUpClass(cls):
+        cls.temp_dir = Path(tempfile.mkdtemp())
+        cls.xlsx_path = cls.temp_dir / "images.xlsx"
+        wb = Workbook()
+        first = wb.active
+        first.title = "First"
+        first["A1"] = "text"
+        second = wb.create_sheet("Second")
+        wb.create_sheet("NoImages")["A1"] = 1
+        for sheet, anchor, color, fmt in [(first, "B2", "red", "PNG"), (first, "D8", "blue", "JPEG"),
+                                          (second, "A1", "green", "PNG")]:
+            buf = io.BytesIO()
+            PILImage.new("RGB", (8, 6), color).save(buf, fmt)
+            image = XlsxImage(io.BytesIO(buf.getvalue()))
+            image.anchor = anchor
+            sheet.add_image(image)
+        wb.save(cls.xlsx_path)
+    
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.temp_dir, ignore_errors=True)
+    
+    def test_images_match_full_load(self):
+        """提取的图片与完整加载时的 sheet._images 一致（顺序、格式、数据）"""
+        out_dir = self.temp_dir / "out"
+        content = extract_xlsx_content(self.xlsx_path, out_dir)
+        
+        wb = load_workbook(self.xlsx_path)
+        expected = [(image.format.lower(), image._data()) for sheet in wb for image in sheet._images]
+        actual = [(image.image_ext, image.image_path.read_bytes()) for image in content.images]
+        self.assertEqual(actual, expected)
+        self.assertEqual(content.total_images, 3)
+
+
+
+@unittest.skipUnless(HAS_OPENPYXL and HAS_PIL, "未安装openpyxl或Pillow")
+class TestOfficeCache(unittest.TestCase):
+    """解析结果缓存测试"""
+    
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.xlsx_path = self.temp_dir / "cached.xlsx"
+        self.out_dir = self.temp_dir / "out"
+        self.cache_dir = self.temp_dir / "cache"
+        self._save_workbook("first")
+        patch.object(office_parser, "OFFICE_CACHE_DIR", self.cache_dir).start()
+        # 记录真正解析的次数（缓存命中时不解析）
+        self.parse = patch.object(office_parser, "_extract_office_content",
+                                  wraps=office_parser._extract_office_content).start()
+        self.addCleanup(patch.stopall)
+    
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+    
+    def _save_workbook(self, text: str):
+        wb = Workbook()
+        wb.active["A1"] = text
+        buf = io.BytesIO()
+        PILImage.new("RGB", (8, 6), "red").save(buf, "PNG")
+        image = XlsxImage(io.BytesIO(buf.getvalue()))
+        image.anchor = "C3"
+        wb.active.add_image(image)
+        wb.save(self.xlsx_path)
+    
+    def _cache_files(self):
+        return sorted(p.name for p in self.cache_dir.glob("*.pkl"))
+    
+    def _extract(self, file_path=None, out_dir=None):
+        return extract_office_content(file_path or self.xlsx_path, out_dir or self.out_dir, use_cache=True)
+    
+    def test_cache_disabled_by_default(self):
+        """默认不使用缓存，也不写入缓存文件"""
+        extract_office_content(self.xlsx_path, self.out_dir)
+        extract_office_content(self.xlsx_path, self.out_dir)
+        self.assertEqual(self.parse.call_count, 2)
+        self.assertFalse(self.cache_dir.exists())
+        self.assertEqual(sorted(p.name for p in self.out_dir.iterdir()), ["images"])
+    
+    def test_unchanged_file_hits_cache(self):
+        """文件未修改时复用缓存"""
+        first = self._extract()
+        second = self._extract()
+        self.assertEqual(self.parse.call_count, 1)
+        self.assertEqual(second.tables, first.tables)
+        self.assertEqual(second.total_images, 1)
+    
+    def test_modified_file_reparsed_and_old_cache_removed(self):
+        """文件修改后重新解析，并删除旧缓存"""
+        self._extract()
+        old_files = self._cache_files()
+        self._save_workbook("second, longer")
+        content = self._extract()
+        self.assertEqual(self.parse.call_count, 2)
+        self.assertEqual(content.tables, [[["second, longer"]]])
+        new_files = self._cache_files()
+        self.assertEqual(len(new_files), 1)
+        self.assertNotEqual(new_files, old_files)
+    
+    def test_missing_image_invalidates_cache(self):
+        """缓存引用的图片被删除时重新解析"""
+        content = self._extract()
+        image_path = content.images[0].image_path
+        image_path.unlink()
+        self._extract()
+        self.assertEqual(self.parse.call_count, 2)
+        self.assertTrue(image_path.exists())
+    
+    def test_cache_version_change_invalidates_cache(self):
+        """缓存版本变化时重新解析"""
+        self._extract()
+        with patch.object(office_parser, "_CACHE_VERSION", office_parser._CACHE_VERSION + 1):
+            self._extract()
+        self.assertEqual(self.parse.call_count, 2)
+        self.assertEqual(len(self._cache_files()), 1)
+    
+    @unittest.skipUnless(HAS_RTF, "未安装striprtf")
+    def test_other_files_caches_kept(self):
+        """同名不同格式文件的缓存互不清理"""
+        other_path = self.xlsx_path.with_suffix(".rtf")
+        other_path.write_text(r"{\rtf1 hello}", encoding="ascii")
+        self._extract()
+        self._extract(other_path)
+        self._save_workbook("second, longer")
+        self._extract()
+        names = self._cache_files()
+        self.assertEqual(len(names), 2)
+        self.assertTrue(any(name.startswith("cached.rtf.") for name in names))
+    
+    def test_same_name_in_other_folder_kept(self):
+        """其他目录中同名文件的缓存互不清理"""
+        other_dir = self.temp_dir / "other"
+        other_dir.mkdir()
+        other_path = other_dir / self.xlsx_path.name
+        shutil.copy(self.xlsx_path, other_path)
+        self._extract()
+        self._extract(other_path, other_dir / "out")
+        self._save_workbook("second, longer")
+        self._extract()
+        self.assertEqual(len(self._cache_files()), 2)
+        self._extract(other_path, other_dir / "out")
+        self.assertEqual(self.parse.call_count, 3)
+
+
+@unittest.skipUnless(HAS_PPTX and HAS_PIL, "未安装python-pptx或Pillow")
+class TestPptxExtraction(unittest.TestCase):
+    """PPTX提取测试"""
+    
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp())
+    
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+    
+    def test_unreadable_picture_skipped(self):
+        """无法识别的图片只跳过该图片，不影响其他内容"""
+        pptx_path = self.temp_dir / "slides.pptx"
+        prs = Presentation()
+        for num, color in enumerate(("blue", "red"), 1):
+            slide = prs.slides.add_slide(prs.slide_layouts[5])
+            slide.shapes.title.text = f"Slide {num}"
+            buf = io.BytesIO()
+            PILImage.new("RGB", (4, 4), color).save(buf, "PNG")
+            buf.seek(0)
+            slide.shapes.add_picture(buf, Inches(1), Inches(1))
+        prs.save(pptx_path)
+        
+        # 把第一张图片的数据替换为无法识别的内容
+        broken_path = self.temp_dir / "broken.pptx"
+        with zipfile.ZipFile(pptx_path) as zin, zipfile.ZipFile(broken_path, "w") as zout:
+            media = sorted(name for name in zin.namelist() if name.startswith("ppt/media/"))
+            for info in zin.infolist():
+                data = b"not an image" if info.filename == media[0] else zin.read(info.filename)
+                zout.writestr(info, data)
+        
+        content = extract_pptx_content(broken_path, self.temp_dir)
+        texts = [block["content"] for block in content.text_content if block["type"] == "paragraph"
+                 or block["type"].startswith("heading")]
+        self.assertEqual(texts, ["Slide 1", "Slide 2"])
+        self.assertEqual([image.get_filename("slides") for image in content.images], ["slides_img2.png"])
+        self.assertEqual(content.total_images, 1)
+
+
+@unittest.skipUnless(HAS_DOCX and HAS_PIL, "未安装python-docx或Pillow")
+class TestImageCount(unittest.TestCase):
+    """图片计数测试"""
+    
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp())
+    
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+    
+    def test_failed_writes_not_counted(self):
+        """写入失败的图片不计入图片数"""
+        docx_path = self.temp_dir / "doc.docx"
+        document = Document()
+        for color in ("red", "blue"):
+            buf = io.BytesIO()
+            PILImage.new("RGB", (4, 4), color).save(buf, "PNG")
+            buf.seek(0)
+            document.add_picture(buf)
+        document.save(docx_path)
+        
+        real_write = office_parser._write_image_bytes
+        
+        def failing_write(img_path, image_data):
+            if img_path.name.endswith("img1.png"):
+                raise OSError("disk full")
+            real_write(img_path, image_data)
+        
+        with patch.object(office_parser, "_write_image_bytes", failing_write):
+            content = extract_docx_content(docx_path, self.temp_dir)
+        self.assertEqual(content.total_images, 1)
+        self.assertEqual(len(content.images), 1)
+        self.assertIn("> **提取图片**: 1 张\n", office_content_to_markdown(content, docx_path))
+
+
+
+@unittest.skipUnless(HAS_DOCX and HAS_OPENPYXL, "未安装python-docx或openpyxl")
+class TestOfficeMarkdown(unittest.TestCase):
+    """Office内容转Markdown测试（表格单元格含竖线和换行）"""
+    
+    CELL = "a|b\nc"
+    ESCAPED_ROW = "| a\\|b c | 2 |\n"
+    
+    @classmethod
+    def setUpClass(cls):
+        cls.temp_dir = Path(tempfile.mkdtemp())
+        docx_path = cls.temp_dir / "table.docx"
+        document = Document()
+        document.add_paragraph("intro")
+        table = document.add_table(rows=2, cols=2)
+        for (row, col), text in {(0, 0): "name", (0, 1): "value", (1, 0): cls.CELL, (1, 1): "2"}.items():
+            table.cell(row, col).text = text
+        document.save(docx_path)
+        
+        xlsx_path = cls.temp_dir / "table.xlsx"
+        wb = Workbook()
+        wb.active.append(["name", "value"])
+        wb.active.append([cls.CELL, 2])
+        wb.save(xlsx_path)
+        cls.paths = [docx_path, xlsx_path]
+    
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.temp_dir, ignore_errors=True)
+    
+    def _markdown(self, file_path: Path) -> str:
+        content = extract_office_content(file_path, self.temp_dir / "out")
+        return office_content_to_markdown(content, file_path, conversion_time="2026-01-01 00:00:00")
+    
+    def test_table_cell_escaped(self):
+        """单元格中的竖线被转义、换行替换为空格"""
+        for file_path in self.paths:
+            with self.subTest(file=file_path.name):
+                markdown = self._markdown(file_path)
+                self.assertIn("| name | value |\n| --- | --- |\n" + self.ESCAPED_ROW, markdown)
+    
+    def test_write_to_stream_matches_return_value(self):
+        """写入文本流的结果与返回的文本一致"""
+        for file_path in self.paths:
+            with self.subTest(file=file_path.name):
+                content = extract_office_content(file_path, self.temp_dir / "out")
+                out = io.StringIO()
+                self.assertIsNone(office_content_to_markdown(content, file_path, conversion_time="2026-01-01 00:00:00",
+                                                             out=out))
+                self.assertEqual(out.getvalue(), self._markdown(file_path))
+    
+    def test_stream_matches_full_conversion(self):
+        """流式生成的Markdown与 office_content_to_markdown 逐字节一致（正文转存到临时文件、分多块读回）"""
+        for file_path in self.paths:
+            with self.subTest(file=file_path.name), \
+                    patch.object(office_parser, "STREAM_SPOOL_SIZE", 16), \
+                    patch.object(office_parser, "STREAM_READ_CHUNK", 7):
+                _, chunks = stream_office_markdown(file_path, self.temp_dir / "out",
+                                                   conversion_time="2026-01-01 00:00:00")
+                streamed = "".join(chunks).encode("utf-8")
+                self.assertEqual(streamed, self._markdown(file_path).encode("utf-8"))
+                self.assertIn(self.ESCAPED_ROW.encode("utf-8"), streamed)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)